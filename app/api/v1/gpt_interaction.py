@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
-from app.core.gpt_service import get_gpt_response
-from app.db.database import get_singleton_db_connection
+from app.core.gpt_service import get_gpt_client, get_gpt_response
+from app.core.llm_cache import get_llm_cache
+from app.core.llm_scheduler import get_llm_scheduler
+from app.core.services.world_generation_service import room_generations
 
 router = APIRouter()
 
@@ -15,3 +17,14 @@ class GptRequestBody(BaseModel):
 async def gpt_interaction(request_body: GptRequestBody):
     response = await get_gpt_response(request_body.prompt)
     return {"response": response}
+
+
+@router.get("/gpt_stats")
+async def gpt_stats():
+    response_cache = get_llm_cache()
+    return {
+        "client": get_gpt_client().stats(),
+        "cache": response_cache.stats() if response_cache is not None else {"enabled": False},
+        "room_generations": room_generations.stats(),
+        "scheduler": get_llm_scheduler().as_dict(),
+    }
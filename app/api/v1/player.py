@@ -1,12 +1,27 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
-from app.db.models import PlayerModel
+import json
+import os
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Response
+from pydantic import BaseModel, Field
+from app.db.async_repository import AsyncPlayerRepository, run_in_db_executor
+from app.core.batch_handler import BatchHandler, CONTINUE
 from app.core.game_engine import GameEngine
+from app.core.map_view import ENCODINGS, RLE, render_player_viewport
+from app.core.tick_scheduler import TickQueueFull, get_tick_scheduler
+from app.db.occupancy import occupancy
+from app.db.room_identity import room_identity
 from app.db.database import get_connection
 import logging
+import sqlite3
 
 router = APIRouter()
 game_engine = GameEngine()
+batch_handler = BatchHandler(game_engine)
+
+MAX_BATCH_ACTIONS = int(os.getenv("PLAYER_BATCH_MAX_ACTIONS", "1000"))
+MAX_NEARBY_RADIUS = int(os.getenv("PLAYER_NEARBY_MAX_RADIUS", "64"))
+MAX_MAP_VIEWPORT = int(os.getenv("PLAYER_MAP_MAX_VIEWPORT", "256"))
 
 logging.basicConfig(level=logging.DEBUG)  # Set up logging
 
@@ -20,9 +35,33 @@ class PlayerMove(BaseModel):
     direction: str
 
 
+class PlayerTravel(BaseModel):
+    player_name: str
+    destination: str
+
+
+class BatchAction(BaseModel):
+    player_name: str
+    action: Literal["move", "pick_up", "drop", "view_inventory"]
+    direction: Optional[str] = None
+    item_name: Optional[str] = None
+    quantity: Optional[int] = None
+
+
+class PlayerBatch(BaseModel):
+    actions: List[BatchAction] = Field(max_length=MAX_BATCH_ACTIONS)
+    on_error: Literal["continue", "stop", "rollback"] = CONTINUE
+
+
 @router.post("/register")
 async def register_player(player: PlayerRegistration, connection=Depends(get_connection)):
-    PlayerModel.create_player(connection, name=player.name)
+    players = AsyncPlayerRepository(connection)
+    try:
+        await players.create_player(name=player.name)
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=400, detail=f"Player '{player.name}' already exists.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"message": f"Player '{player.name}' has been registered."}
 
 
@@ -30,12 +69,23 @@ async def register_player(player: PlayerRegistration, connection=Depends(get_con
 async def move_player(move: PlayerMove, connection=Depends(get_connection)):
     logging.debug(f"Attempting to move player: {move.player_name} in direction: {move.direction}")
 
-    player = PlayerModel.get_player_by_name(connection, move.player_name)
+    players = AsyncPlayerRepository(connection)
+    player = await players.get_player_by_name(move.player_name)
     if not player:
         logging.error(f"Player '{move.player_name}' not found.")
         raise HTTPException(status_code=400, detail=f"Player '{move.player_name}' not found.")
 
-    result = game_engine.move(connection, move.player_name, move.direction)
+    scheduler = get_tick_scheduler()
+    if scheduler is not None:
+        # Applied with every other action queued for the next tick, in one transaction.
+        try:
+            result = await scheduler.submit(
+                {"player_name": move.player_name, "action": "move", "direction": move.direction}
+            )
+        except TickQueueFull:
+            raise HTTPException(status_code=503, detail="The world is busy; try again shortly.")
+    else:
+        result = await run_in_db_executor(game_engine.move, connection, move.player_name, move.direction)
 
     if result["success"]:
         logging.debug(f"Player '{move.player_name}' moved successfully: {result['message']}")
@@ -43,3 +93,76 @@ async def move_player(move: PlayerMove, connection=Depends(get_connection)):
     else:
         logging.error(f"Failed to move player '{move.player_name}': {result['message']}")
         raise HTTPException(status_code=400, detail=result["message"])
+
+
+@router.post("/travel")
+async def travel_player(travel: PlayerTravel, connection=Depends(get_connection)):
+    logging.debug(f"Attempting to move player: {travel.player_name} to: {travel.destination}")
+
+    result = await run_in_db_executor(game_engine.travel, connection, travel.player_name, travel.destination)
+
+    if result["success"]:
+        logging.debug(f"Player '{travel.player_name}' travelled successfully: {result['message']}")
+        return {"message": result["message"], "path": result["path"]}
+    else:
+        logging.error(f"Failed to move player '{travel.player_name}': {result['message']}")
+        raise HTTPException(status_code=400, detail=result["message"])
+
+
+@router.post("/batch")
+async def run_batch(batch: PlayerBatch, connection=Depends(get_connection)):
+    logging.debug(f"Running a batch of {len(batch.actions)} actions (on_error={batch.on_error})")
+
+    actions = [action.model_dump(exclude_none=True) for action in batch.actions]
+    return await run_in_db_executor(batch_handler.run, connection, actions, batch.on_error)
+
+
+@router.get("/tick_stats")
+async def tick_stats():
+    scheduler = get_tick_scheduler()
+    if scheduler is None:
+        return {"enabled": False}
+    return {"enabled": True, "tick": scheduler.tick, "queue_depth": scheduler.queue_depth, **scheduler.stats.as_dict()}
+
+
+@router.get("/occupants")
+async def room_occupants(room: str, connection=Depends(get_connection)):
+    room_id = await run_in_db_executor(room_identity.id_for_name, connection, room)
+    if room_id is None:
+        raise HTTPException(status_code=404, detail=f"Room '{room}' does not exist.")
+    return {"room": room, "players": await run_in_db_executor(occupancy.occupants, connection, room_id)}
+
+
+def _nearby_players(connection, player_name: str, radius: int):
+    if occupancy.room_of(connection, player_name) is None:
+        return None
+    return [
+        {"name": name, "room": room_identity.name_for_id(connection, room_id), "distance": distance}
+        for distance, name, room_id in occupancy.players_near(connection, player_name, radius)
+    ]
+
+
+@router.get("/nearby")
+async def nearby_players(player_name: str, radius: int = 5, connection=Depends(get_connection)):
+    if not 0 <= radius <= MAX_NEARBY_RADIUS:
+        raise HTTPException(status_code=400, detail=f"Radius must be between 0 and {MAX_NEARBY_RADIUS}.")
+    players = await run_in_db_executor(_nearby_players, connection, player_name, radius)
+    if players is None:
+        raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found.")
+    return {"players": players}
+
+
+@router.get("/map")
+async def player_map(player_name: str, width: int = 64, height: int = 64, encoding: str = RLE,
+                     names: bool = True, connection=Depends(get_connection)):
+    if not (1 <= width <= MAX_MAP_VIEWPORT and 1 <= height <= MAX_MAP_VIEWPORT):
+        raise HTTPException(status_code=400, detail=f"The viewport must be between 1 and {MAX_MAP_VIEWPORT} cells a side.")
+    if encoding not in ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"Encoding must be one of: {', '.join(ENCODINGS)}.")
+    payload = await run_in_db_executor(render_player_viewport, connection, player_name, width, height, encoding, names)
+    if payload is None:
+        raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found.")
+    if "error" in payload:
+        raise HTTPException(status_code=409, detail=payload["error"])
+    # Serialized directly: FastAPI's encoder walks every cell of a large viewport several times slower.
+    return Response(json.dumps(payload, separators=(",", ":")), media_type="application/json")
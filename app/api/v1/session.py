@@ -0,0 +1,113 @@
+import asyncio
+import json
+import logging
+import os
+
+import anyio
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+
+from app.core.game_engine import GameEngine
+from app.core.game_session import (
+    CLOSE_POLICY, CLOSE_REPLACED, CLOSE_TOO_BIG, CLOSE_TRY_LATER, GameSession, SessionLimitReached, sessions,
+)
+from app.core.inventory_handler import InventoryHandler
+from app.db.async_repository import run_in_db_executor
+from app.db.database import get_connection
+from app.db.models import PlayerModel
+
+router = APIRouter()
+game_engine = GameEngine()
+inventory_handler = InventoryHandler()
+
+MAX_MESSAGE_BYTES = int(os.getenv("SESSION_MAX_MESSAGE_BYTES", "4096"))
+HELLO_TIMEOUT = float(os.getenv("SESSION_HELLO_TIMEOUT", "10"))
+
+
+async def _receive_text(websocket: WebSocket):
+    """Return the next message's text, or None once the client has gone."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        return None
+    if message.get("text") is not None:
+        return message["text"]
+    return (message.get("bytes") or b"").decode("utf-8", errors="replace")
+
+
+async def _read_actions(websocket: WebSocket, session: GameSession):
+    # One action at a time: the next message is not read until this one's reply is queued, so a
+    # client that sends faster than it reads is held back by its own outbox.
+    while True:
+        text = await _receive_text(websocket)
+        if text is None:
+            return
+        if len(text) > MAX_MESSAGE_BYTES:
+            session.close(CLOSE_TOO_BIG, f"Messages are limited to {MAX_MESSAGE_BYTES} bytes.")
+            return
+        await session.handle(text)
+
+
+async def _write_messages(websocket: WebSocket, session: GameSession):
+    while True:
+        await websocket.send_text(await session.outbox.get())
+
+
+async def _wait_closed(websocket: WebSocket, session: GameSession):
+    await session.closed.wait()
+
+
+async def _until_done(run, websocket: WebSocket, session: GameSession, cancel_scope):
+    try:
+        await run(websocket, session)
+    except (WebSocketDisconnect, RuntimeError, OSError):
+        # The client went away mid-send or mid-receive.
+        pass
+    finally:
+        cancel_scope.cancel()
+
+
+@router.websocket("/ws")
+async def game_session(websocket: WebSocket, connection=Depends(get_connection)):
+    await websocket.accept()
+    try:
+        hello = json.loads(await asyncio.wait_for(_receive_text(websocket), HELLO_TIMEOUT) or "null")
+    except (asyncio.TimeoutError, ValueError):
+        hello = None
+    player_name = hello.get("player_name") if isinstance(hello, dict) else None
+    if not isinstance(player_name, str):
+        player_name = None
+    player = await run_in_db_executor(PlayerModel.get_player_by_name, connection, player_name) if player_name else None
+    if player is None:
+        await websocket.close(CLOSE_POLICY, "Start with {\"player_name\": ...} naming a registered player.")
+        return
+
+    session = GameSession(connection, player, game_engine, inventory_handler)
+    try:
+        previous = sessions.open(session)
+    except SessionLimitReached:
+        await websocket.close(CLOSE_TRY_LATER, "Too many players are connected; try again shortly.")
+        return
+    if previous is not None:
+        previous.close(CLOSE_REPLACED, "Signed in from another session.")
+    logging.debug(f"Opened a session for '{player_name}' ({len(sessions)} open)")
+
+    try:
+        await session.start()
+        async with anyio.create_task_group() as task_group:
+            # Whichever side finishes first (the client leaves, a send fails, the session is
+            # closed) ends the other two.
+            for run in (_read_actions, _write_messages, _wait_closed):
+                task_group.start_soon(_until_done, run, websocket, session, task_group.cancel_scope)
+    finally:
+        sessions.close(session)
+        logging.debug(f"Closed the session for '{player_name}' after {session.actions} actions")
+    if session.close_code is not None:
+        try:
+            await websocket.close(session.close_code, session.close_reason)
+        except RuntimeError:
+            # The client had already gone.
+            pass
+
+
+@router.get("/stats")
+async def session_stats():
+    return sessions.stats()
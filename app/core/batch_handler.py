@@ -0,0 +1,91 @@
+import logging
+
+from app.core.game_engine import GameEngine
+from app.core.inventory_handler import InventoryHandler
+from app.db.models import PlayerModel
+
+logger = logging.getLogger(__name__)
+
+# What happens to the rest of a batch when an action fails.
+CONTINUE = "continue"  # Run the remaining actions and commit everything that succeeded.
+STOP = "stop"          # Skip the remaining actions and commit what succeeded before the failure.
+ROLLBACK = "rollback"  # Skip the remaining actions and undo the whole batch.
+ON_ERROR_POLICIES = (CONTINUE, STOP, ROLLBACK)
+
+ACTIONS = ("move", "pick_up", "drop", "view_inventory")
+
+
+class _RollBack(Exception):
+    """Raised inside the batch transaction to undo it."""
+
+
+class BatchHandler:
+    def __init__(self, game_engine: GameEngine = None, inventory_handler: InventoryHandler = None):
+        self.game_engine = game_engine or GameEngine()
+        self.inventory_handler = inventory_handler or InventoryHandler()
+
+    def run(self, connection, actions: list, on_error: str = CONTINUE) -> dict:
+        """
+        Runs an ordered list of player actions in a single transaction.
+
+        Every player named in the batch is loaded once up front, moves are applied to those records
+        in memory, and each moved player's final room is written once at the end.
+
+        :param actions: Dicts with ``player_name`` and ``action`` (one of ACTIONS), plus ``direction``
+            for moves and ``item_name`` (and optionally ``quantity``) for pick_up and drop.
+        :param on_error: One of ON_ERROR_POLICIES.
+        :return: ``{"committed": bool, "results": [...]}`` with one result per action, in order.
+        """
+        if on_error not in ON_ERROR_POLICIES:
+            raise ValueError(f"Unknown on_error policy '{on_error}'.")
+        results = []
+        try:
+            with connection:
+                players = PlayerModel.get_players_by_names(connection, [action["player_name"] for action in actions])
+                start_rooms = {name: player.current_room_id for name, player in players.items()}
+                for action in actions:
+                    if results and on_error != CONTINUE and not results[-1]["success"]:
+                        results.append({"success": False, "message": "Skipped after an earlier action failed."})
+                        continue
+                    results.append(self._run_action(connection, players, action))
+                if on_error == ROLLBACK and not all(result["success"] for result in results):
+                    raise _RollBack()
+                for name, player in players.items():
+                    if player.current_room_id != start_rooms[name]:
+                        PlayerModel.update_player_location(connection, name, player.current_room_id)
+        except _RollBack:
+            logger.info(f"Rolled back a batch of {len(actions)} actions after a failure")
+            return {"committed": False, "results": results}
+        return {"committed": True, "results": results}
+
+    def _run_action(self, connection, players: dict, action: dict) -> dict:
+        player_name = action["player_name"]
+        player = players.get(player_name)
+        if player is None:
+            return {"success": False, "message": f"Player '{player_name}' not found."}
+        kind = action["action"]
+        try:
+            if kind == "move":
+                return self.game_engine.step(connection, player, action["direction"])
+            if kind == "pick_up":
+                return self.inventory_handler.pick_up_item(
+                    connection, player_name, action["item_name"], action.get("quantity", 1), player=player
+                )
+            if kind == "drop":
+                return self.inventory_handler.drop_item(
+                    connection, player_name, action["item_name"], action.get("quantity", 1), player=player
+                )
+            if kind == "view_inventory":
+                inventory = self.inventory_handler.view_inventory(connection, player_name)
+                return {"success": True, "message": f"{player_name} is carrying {len(inventory)} items.",
+                        "inventory": inventory}
+        except KeyError as e:
+            return {"success": False, "message": f"Invalid '{kind}' action: missing {e}."}
+        except ValueError as e:
+            return {"success": False, "message": f"Invalid '{kind}' action: {e}"}
+        except Exception:
+            # Malformed input (a list for a direction, say) fails before it writes anything; keep it
+            # from failing the other actions sharing the transaction.
+            logger.exception(f"Action '{kind}' for '{player_name}' failed")
+            return {"success": False, "message": f"Action '{kind}' failed."}
+        return {"success": False, "message": f"Unknown action '{kind}'."}
@@ -0,0 +1,327 @@
+# app/core/fake_llm.py
+#
+# A local stand-in for the LLM provider: an HTTP server speaking enough of the chat-completions
+# protocol (plain and streamed) for the LLM client to be pointed at it through OPENAI_BASE_URL, so
+# world generation can be developed, tested and load-tested without an API key. Answers are seeded
+# by the prompt, so the same prompt always gets the same answer:
+#   - connected-room prompts get schema-valid {"locations": [...]} for the requested cell and its
+#     free neighbors, read from the prompt's origin_coords, direction and existing_neighbors;
+#   - frontier prompts get {"rooms": [...]} with one room per cell of their "Requested cells" line;
+#   - any other prompt gets an object with the keys of the JSON template it contains.
+# Latency, jitter, generation speed and an error rate (429s and 5xx) are configurable. Run it on
+# its own with `python -m app.core.fake_llm --port 8001`, or in the app with FAKE_LLM=1.
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+
+from app.core.grid import DIRECTION_OFFSETS
+
+logger = logging.getLogger(__name__)
+
+_ORIGIN = re.compile(r'"origin_coords":\s*\{\s*"x":\s*(-?\d+),\s*"y":\s*(-?\d+)\s*\}')
+_DIRECTION = re.compile(r'"direction":\s*"(\w+)"')
+_EXISTING = re.compile(r'"existing_neighbors":\s*(\[[^\]]*\])')
+_CELL = re.compile(r"""['"]x['"]:\s*(-?\d+),\s*['"]y['"]:\s*(-?\d+)""")
+_TEMPLATE_KEY = re.compile(r'"(\w+)"\s*:\s*(.)')
+_REQUESTED_CELLS = re.compile(r"Requested cells \(x,y\):((?:\s+-?\d+,-?\d+)+)")
+
+TERRAINS = ("forest", "meadow", "river bank", "hills", "marsh", "ruins", "moor", "lakeshore")
+ADJECTIVES = ("Whispering", "Sunken", "Amber", "Hollow", "Mossy", "Windswept", "Silent", "Crooked", "Gilded", "Misty")
+NOUNS = ("Glade", "Hollow", "Crossing", "Ridge", "Thicket", "Clearing", "Ford", "Barrow", "Meadow", "Outlook")
+DETAILS = (
+    "Old roots twist across the path, slick with moss.",
+    "A cold breeze carries the scent of rain from the west.",
+    "Birdsong drifts down from the canopy overhead.",
+    "Weathered stones lie half-buried in the grass.",
+    "The ground rises gently toward a line of pale birches.",
+    "A narrow stream murmurs somewhere out of sight.",
+    "Faint tracks suggest something passed here not long ago.",
+    "Light falls in long golden bars between the trunks.",
+)
+SOUNDS = ("rustling leaves", "distant thunder", "a woodpecker", "running water", "crickets", "wind in the reeds")
+SMELLS = ("pine resin", "wet earth", "wildflowers", "woodsmoke", "damp moss", "river mud")
+
+
+def prompt_rng(prompt: str, seed: int) -> random.Random:
+    """The random source for answering ``prompt``: the same for the same prompt and seed."""
+    digest = hashlib.sha256(f"{seed}:{' '.join(prompt.split())}".encode()).hexdigest()
+    return random.Random(digest)
+
+
+def fake_location(rng: random.Random, x: int, y: int, sentences: int) -> dict:
+    terrain = rng.choice(TERRAINS)
+    return {
+        "coords": {"x": x, "y": y},
+        "name": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}",
+        "description": f"A stretch of {terrain}. " + " ".join(rng.choice(DETAILS) for _ in range(sentences)),
+        "type": f"outdoor: {terrain}",
+        "features": [{"type": "landmark", "description": rng.choice(DETAILS)}],
+        "sounds": rng.sample(SOUNDS, 2),
+        "smells": rng.sample(SMELLS, 2),
+    }
+
+
+def fake_answer(prompt: str, seed: int = 0, sentences: int = 6) -> dict:
+    """The seeded answer to ``prompt`` (see the module comment)."""
+    rng = prompt_rng(prompt, seed)
+    requested = _REQUESTED_CELLS.search(prompt)
+    if requested:
+        rooms = []
+        for cell in requested.group(1).split():
+            x, y = map(int, cell.split(","))
+            location = fake_location(rng, x, y, sentences)
+            rooms.append({"x": x, "y": y, "name": location["name"], "terrain": location["type"].split(": ")[1],
+                          "description": location["description"]})
+        return {"rooms": rooms}
+    origin, direction = _ORIGIN.search(prompt), _DIRECTION.search(prompt)
+    if origin and direction and direction.group(1) in DIRECTION_OFFSETS:
+        ox, oy = int(origin.group(1)), int(origin.group(2))
+        dx, dy = DIRECTION_OFFSETS[direction.group(1)]
+        existing = _EXISTING.search(prompt)
+        occupied = {(ox, oy)} | {(int(x), int(y)) for x, y in _CELL.findall(existing.group(1) if existing else "")}
+        target = (ox + dx, oy + dy)
+        if target in occupied:
+            return {"error": "Location occupied"}
+        cells = [target] + [(target[0] + nx, target[1] + ny) for nx, ny in DIRECTION_OFFSETS.values()]
+        return {"locations": [fake_location(rng, x, y, sentences) for x, y in cells if (x, y) not in occupied]}
+    answer = {}
+    for key, first in _TEMPLATE_KEY.findall(prompt):
+        if key in ("x", "y") or key in answer:
+            continue
+        if key in ("coordinates", "grid_coordinates", "coords"):
+            answer[key] = {"x": 0, "y": 0}
+        elif first == "[":
+            answer[key] = rng.sample(SOUNDS + SMELLS, 2)
+        elif first != "{":
+            answer[key] = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}" if key == "name" else rng.choice(DETAILS)
+    return answer or {"name": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}", "description": rng.choice(DETAILS)}
+
+
+class FakeLlmServer:
+    def __init__(self, seed: int = 0, latency: float = 0.0, jitter: float = 0.0, tokens_per_second: float = 0.0,
+                 error_rate: float = 0.0, chunk_size: int = 16, sentences: int = 6, content: str = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        """
+        :param seed: Varies every answer; the same seed and prompt always give the same answer.
+        :param latency: Seconds before the first byte of each answer.
+        :param jitter: Up to this many seconds added to or taken from the latency, at random.
+        :param tokens_per_second: Generation speed, at four characters per token (0 = instant).
+        :param error_rate: Fraction of requests answered with a 429, 500 or 503.
+        :param chunk_size: Characters per streamed chunk.
+        :param sentences: Detail sentences per location description.
+        :param content: A fixed answer text instead of the generated ones.
+        """
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.chunk_size = chunk_size
+        self.sentences = sentences
+        self.content = content
+        self.host = host
+        self.port = port
+        # Status codes answered, one per request, before anything else; with retry_after as Retry-After.
+        self.errors = []
+        self.retry_after = None
+        self.requests = []
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.errors_sent = 0
+        self.characters_sent = 0
+        self._rng = random.Random(seed)
+        self._server = None
+        self._handlers = set()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls):
+        """Build a fake provider configured through FAKE_LLM_* environment variables."""
+        return cls(
+            seed=int(os.getenv("FAKE_LLM_SEED", "0")),
+            latency=float(os.getenv("FAKE_LLM_LATENCY", "0.5")),
+            jitter=float(os.getenv("FAKE_LLM_JITTER", "0.2")),
+            tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "200")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/v1"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        logger.info(f"Fake LLM provider listening on {self.base_url}")
+        return self
+
+    async def close(self):
+        self._server.close()
+        for handler in list(self._handlers):
+            handler.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def start_in_thread(self):
+        """Serve from a daemon thread with its own event loop, for callers without a running loop."""
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            started.set()
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-llm", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop_thread(self):
+        loop = self._server.get_loop()
+        asyncio.run_coroutine_threadsafe(self.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+
+    def answer_text(self, request: dict) -> str:
+        if self.content is not None:
+            return self.content
+        prompt = request["messages"][-1]["content"]
+        return json.dumps(fake_answer(prompt, self.seed, self.sentences), indent=2)
+
+    def stats(self) -> dict:
+        return {
+            "requests": len(self.requests),
+            "connections": self.connections,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "errors_sent": self.errors_sent,
+            "completion_tokens": self.characters_sent // 4,
+        }
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        self._handlers.add(asyncio.current_task())
+        try:
+            # Keep-alive: answer requests on this connection until the client closes it.
+            while await reader.readline():
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                request = json.loads(await reader.readexactly(int(headers.get("content-length", 0))))
+                self.requests.append(request)
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    await self._respond(request, writer)
+                finally:
+                    self.in_flight -= 1
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def _respond(self, request: dict, writer):
+        await asyncio.sleep(max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter)))
+        if self.errors:
+            return await self._error(writer, self.errors.pop(0))
+        if self.error_rate and self._rng.random() < self.error_rate:
+            return await self._error(writer, self._rng.choice((429, 429, 500, 503)))
+        text = self.answer_text(request)
+        self.characters_sent += len(text)
+        if request.get("stream"):
+            return await self._stream(request, writer, text)
+        if self.tokens_per_second:
+            await asyncio.sleep(len(text) / 4 / self.tokens_per_second)
+        body = json.dumps(self.completion(request, text)).encode()
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                     b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+        await writer.drain()
+
+    async def _error(self, writer, status: int):
+        self.errors_sent += 1
+        body = json.dumps({"error": {"message": f"Fake error {status}", "type": "fake", "code": None}}).encode()
+        headers = f"Retry-After: {self.retry_after}\r\n" if self.retry_after is not None else ""
+        writer.write(f"HTTP/1.1 {status} Error\r\nContent-Type: application/json\r\n{headers}"
+                     f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    async def _stream(self, request: dict, writer, text: str):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+        chunk_delay = self.chunk_size / 4 / self.tokens_per_second if self.tokens_per_second else 0
+        for start in range(0, len(text), self.chunk_size):
+            await self._event(writer, json.dumps(self.chunk(request, text[start:start + self.chunk_size])))
+            await asyncio.sleep(chunk_delay)
+        await self._event(writer, "[DONE]")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    async def _event(writer, data: str):
+        event = f"data: {data}\n\n".encode()
+        writer.write(b"%x\r\n%s\r\n" % (len(event), event))
+        await writer.drain()
+
+    def chunk(self, request: dict, text: str) -> dict:
+        return {
+            "id": f"chatcmpl-fake-{len(self.requests)}",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": request.get("model") or "fake",
+            "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}],
+        }
+
+    def completion(self, request: dict, text: str) -> dict:
+        prompt_tokens = len(request["messages"][-1]["content"]) // 4
+        return {
+            "id": f"chatcmpl-fake-{len(self.requests)}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": request.get("model") or "fake",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(text) // 4,
+                      "total_tokens": prompt_tokens + len(text) // 4},
+        }
+
+
+async def _serve_forever(server: FakeLlmServer):
+    await server.start()
+    print(f"Fake LLM provider: OPENAI_BASE_URL={server.base_url} OPENAI_API_KEY=fake AI_MODEL=fake")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve seeded fake chat completions for local development.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before the first byte")
+    parser.add_argument("--jitter", type=float, default=0.2, help="+/- seconds of random latency")
+    parser.add_argument("--tokens-per-second", type=float, default=200, help="generation speed (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 429/5xx")
+    args = parser.parse_args()
+    asyncio.run(_serve_forever(FakeLlmServer(
+        seed=args.seed, latency=args.latency, jitter=args.jitter, tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate, host=args.host, port=args.port,
+    )))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import logging
 
 from app.core.movement_handler import MovementHandler
-from app.db.models import PlayerModel
+from app.core.pathfinding import plan_route
+from app.db.models import PlayerModel, NeighborRelationModel
+from app.db.room_graph import room_graph
+from app.db.room_identity import room_identity
 
 
 class GameEngine:
@@ -16,23 +19,70 @@ class GameEngine:
         if not player:
             return {"success": False, "message": f"Player '{player_name}' not found."}
 
-        current_room = player["current_room"]
-        logging.debug(f"Current room for player '{player_name}': {current_room}")
+        logging.debug(f"Current room for player '{player_name}': {player.current_room}")
+        result = self.step(connection, player, direction)
+        if result["success"]:
+            # Update player's location
+            PlayerModel.update_player_location(connection, player_name, player.current_room_id)
+        return result
 
-        # Example updated logic for allowed moves
-        valid_moves = {
-            "start": {"east": "east_room"},
-            "east_room": {"west": "start"}
-        }
+    def step(self, connection, player, direction: str) -> dict:
+        """
+        Moves an already loaded player record one room without saving the new location.
+
+        Batches use this to apply several moves in memory and write each player's final room once.
 
-        # Check if movement is possible
-        if current_room not in valid_moves or direction not in valid_moves[current_room]:
-            logging.error(f"Failed to move player '{player_name}': You can't move in that direction.")
+        :param player: The player's PlayerRecord; updated in place when the move succeeds.
+        """
+        # Check if movement is possible using the cached room graph
+        new_room_id = room_graph.neighbor(connection, player.current_room_id, direction)
+        if new_room_id is None:
+            logging.error(f"Failed to move player '{player.name}': You can't move in that direction.")
             return {"success": False, "message": "You can't move in that direction."}
 
-        # Determine the new room and update player's location
-        new_room = valid_moves[current_room][direction]
-        PlayerModel.update_player_location(connection, player_name, new_room)
-        logging.debug(f"Player '{player_name}' moved to new room: {new_room}")
+        player.current_room_id = new_room_id
+        player.current_room = room_identity.name_for_id(connection, new_room_id)
+        logging.debug(f"Player '{player.name}' moved to new room: {player.current_room}")
+
+        return {"success": True, "message": f"You have moved to {player.current_room}."}
+
+    def travel(self, connection, player_name: str, destination) -> dict:
+        """
+        Moves a player all the way to a destination room along the shortest known route.
+
+        The route is re-validated and applied in one transaction, so the player either arrives or
+        stays where they were.
+
+        :param destination: The destination room's name or id.
+        """
+        player = PlayerModel.get_player_by_name(connection, player_name)
+        if not player:
+            return {"success": False, "message": f"Player '{player_name}' not found."}
+        try:
+            destination_id = room_identity.resolve(connection, destination)
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
 
-        return {"success": True, "message": f"You have moved to {new_room}."}
\ No newline at end of file
+        route = plan_route(connection, player.current_room_id, destination_id)
+        destination_name = room_identity.name_for_id(connection, destination_id)
+        if route is None:
+            return {"success": False, "message": f"There is no known route to {destination_name}."}
+        if not route:
+            return {"success": True, "message": f"You are already in {destination_name}.", "path": []}
+
+        with connection:
+            # Nothing may have moved the player or changed the exits since the route was planned.
+            current = PlayerModel.get_player_by_name(connection, player_name)
+            if current.current_room_id != player.current_room_id:
+                return {"success": False, "message": "You moved before the journey could start."}
+            if not NeighborRelationModel.route_exists(connection, player.current_room_id, route):
+                return {"success": False, "message": f"The way to {destination_name} is no longer open."}
+            PlayerModel.update_player_location(connection, player_name, destination_id)
+
+        path = [room_identity.name_for_id(connection, room_id) for _, room_id in route]
+        logging.debug(f"Player '{player_name}' travelled to {destination_name} via {path}")
+        return {
+            "success": True,
+            "message": f"You have travelled to {destination_name} in {len(route)} steps.",
+            "path": path,
+        }
@@ -0,0 +1,262 @@
+# app/core/game_session.py
+#
+# Persistent player sessions for the WebSocket endpoint. A session identifies its player once,
+# applies each action it is sent through GameEngine and InventoryHandler, and pushes what changed
+# (the room the player entered, their inventory, players arriving or leaving) without the client
+# polling. Every session has a bounded outbox: replies to the session's own actions wait for room
+# in it, which stops the session reading further actions until the client catches up, while pushes
+# caused by other players are dropped when it is full, so a slow client never holds anyone else up.
+
+import asyncio
+import json
+import logging
+import os
+
+from app.core.game_engine import GameEngine
+from app.core.grid import DIRECTIONS
+from app.core.inventory_handler import InventoryHandler
+from app.core.tick_scheduler import TickQueueFull, get_tick_scheduler
+from app.db.async_repository import run_in_db_executor
+from app.db.models import InventoryModel, PlayerModel, RoomModel
+from app.db.occupancy import occupancy
+from app.db.room_graph import room_graph
+from app.db.room_identity import room_identity
+
+logger = logging.getLogger(__name__)
+
+SEND_QUEUE_SIZE = int(os.getenv("SESSION_SEND_QUEUE", "64"))
+MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+
+SESSION_ACTIONS = ("move", "pick_up", "drop", "view_inventory", "look")
+INVENTORY_ACTIONS = ("pick_up", "drop", "view_inventory")
+
+# WebSocket close codes a session ends with.
+CLOSE_NORMAL = 1000
+CLOSE_POLICY = 1008       # The hello was missing or named no player.
+CLOSE_TOO_BIG = 1009      # A message exceeded SESSION_MAX_MESSAGE_BYTES.
+CLOSE_TRY_LATER = 1013    # MAX_SESSIONS sessions are already open.
+CLOSE_REPLACED = 4000     # The same player opened a newer session.
+
+
+class SessionLimitReached(Exception):
+    """Raised by SessionRegistry.open() when max_sessions sessions are already open."""
+
+
+class GameSession:
+    def __init__(self, connection, player, game_engine: GameEngine = None,
+                 inventory_handler: InventoryHandler = None, send_queue_size: int = SEND_QUEUE_SIZE):
+        """
+        :param player: The PlayerRecord of the player the session was opened for.
+        :param send_queue_size: Messages waiting to be sent before pushes are dropped and replies wait.
+        """
+        self.connection = connection
+        self.name = player.name
+        self.player_id = player.id
+        self.game_engine = game_engine or GameEngine()
+        self.inventory_handler = inventory_handler or InventoryHandler()
+        self.outbox = asyncio.Queue(send_queue_size)
+        self.closed = asyncio.Event()
+        self.close_code = None
+        self.close_reason = ""
+        self.actions = 0
+        self.pushes_dropped = 0
+        # The room the client was last shown; a different current room means it needs a new one.
+        self._room_id = None
+
+    def close(self, code: int = CLOSE_NORMAL, reason: str = ""):
+        """Ask the transport to end the session; the first code given wins."""
+        if not self.closed.is_set():
+            self.close_code, self.close_reason = code, reason
+            self.closed.set()
+
+    async def send(self, message: dict):
+        """Queue a message for the client, waiting while the outbox is full."""
+        await self.outbox.put(json.dumps(message))
+
+    def push(self, message: dict) -> bool:
+        """Queue a message for the client unless the outbox is full; returns False if it was dropped."""
+        try:
+            self.outbox.put_nowait(json.dumps(message))
+        except asyncio.QueueFull:
+            self.pushes_dropped += 1
+            return False
+        return True
+
+    async def start(self):
+        """Greet the client with the player's current room and inventory."""
+        await self.send({"type": "welcome", "player": self.name})
+        await self._deliver(await run_in_db_executor(self._updates, True))
+
+    async def handle(self, text: str):
+        """Apply one action message, reply with its result, then send what it changed."""
+        try:
+            action = json.loads(text)
+        except ValueError:
+            await self.send({"type": "error", "message": "Messages must be JSON objects."})
+            return
+        if not isinstance(action, dict):
+            await self.send({"type": "error", "message": "Messages must be JSON objects."})
+            return
+
+        kind = action.get("action")
+        updates = None
+        if kind not in SESSION_ACTIONS:
+            result = {"success": False, "message": f"Unknown action '{kind}'."}
+        elif not isinstance(action.get("quantity", 1), int) or action.get("quantity", 1) < 1:
+            result = {"success": False, "message": "Quantity must be a positive whole number."}
+        elif kind == "move" and not (isinstance(action.get("direction"), str) and action["direction"] in DIRECTIONS):
+            result = {"success": False, "message": f"Direction must be one of {', '.join(DIRECTIONS)}."}
+        elif kind in ("pick_up", "drop") and not (isinstance(action.get("item_name"), str) and action["item_name"]):
+            result = {"success": False, "message": "Item name must be a non-empty string."}
+        elif get_tick_scheduler() is not None and kind in ("move", "pick_up", "drop"):
+            result = await self._submit_to_tick(kind, action)
+            updates = await run_in_db_executor(self._updates, kind in INVENTORY_ACTIONS and result["success"])
+        else:
+            result, updates = await run_in_db_executor(self._apply, kind, action)
+        self.actions += 1
+        await self.send({"type": "result", "id": action.get("id"), "action": kind, **result})
+        await self._deliver(updates)
+
+    async def _submit_to_tick(self, kind: str, action: dict) -> dict:
+        # Applied with every other action queued for the next tick, like the /move endpoint.
+        fields = {key: action[key] for key in ("direction", "item_name", "quantity") if key in action}
+        try:
+            return await get_tick_scheduler().submit({"player_name": self.name, "action": kind, **fields})
+        except TickQueueFull:
+            return {"success": False, "message": "The world is busy; try again shortly."}
+
+    def _apply(self, kind: str, action: dict):
+        """Apply an action (on the database executor); returns its result and the updates to send."""
+        connection = self.connection
+        player = PlayerModel.get_player_by_name(connection, self.name)
+        if player is None:
+            return {"success": False, "message": f"Player '{self.name}' not found."}, None
+        try:
+            if kind == "move":
+                result = self.game_engine.step(connection, player, action["direction"])
+                if result["success"]:
+                    PlayerModel.update_player_location(connection, self.name, player.current_room_id)
+            elif kind == "pick_up":
+                result = self.inventory_handler.pick_up_item(
+                    connection, self.name, action["item_name"], action.get("quantity", 1), player=player
+                )
+            elif kind == "drop":
+                result = self.inventory_handler.drop_item(
+                    connection, self.name, action["item_name"], action.get("quantity", 1), player=player
+                )
+            else:
+                result = {"success": True, "message": f"{self.name} is in {player.current_room}."}
+        except KeyError as e:
+            return {"success": False, "message": f"Invalid '{kind}' action: missing {e}."}, None
+        except ValueError as e:
+            return {"success": False, "message": f"Invalid '{kind}' action: {e}"}, None
+        inventory_changed = kind == "view_inventory" or (kind in INVENTORY_ACTIONS and result["success"])
+        return result, self._updates(inventory_changed, show_room=kind == "look")
+
+    def _updates(self, show_inventory: bool, show_room: bool = False) -> dict:
+        """
+        Work out what the client and the other players need to hear (on the database executor).
+
+        The player is re-read from the player cache rather than kept from the last action, so a move
+        made outside the session (another endpoint, the tick) still shows the client its new room.
+
+        :return: ``{"messages": [...], "presence": [(player names, message), ...]}``
+        """
+        connection = self.connection
+        updates = {"messages": [], "presence": []}
+        player = PlayerModel.get_player_by_name(connection, self.name)
+        if player is None:
+            return updates
+        room_id = player.current_room_id
+        if room_id != self._room_id or show_room:
+            room = RoomModel.get_room_by_id(connection, room_id)
+            room_name = room.name if room else player.current_room
+            occupants = [name for name in occupancy.occupants(connection, room_id) if name != self.name]
+            updates["messages"].append({
+                "type": "room",
+                "room": room_name,
+                "description": room.description if room else None,
+                "exits": [DIRECTIONS[code] for code, neighbor_id in enumerate(room_graph.neighbors(connection, room_id))
+                          if neighbor_id is not None],
+                "players": occupants,
+            })
+            if self._room_id is not None and room_id != self._room_id:
+                # Other players only hear about moves, not about a session being opened.
+                left = [name for name in occupancy.occupants(connection, self._room_id) if name != self.name]
+                left_name = room_identity.name_for_id(connection, self._room_id)
+                updates["presence"].append((left, {
+                    "type": "presence", "event": "left", "player": self.name, "room": left_name, "to": room_name,
+                }))
+                updates["presence"].append((occupants, {
+                    "type": "presence", "event": "entered", "player": self.name, "room": room_name, "from": left_name,
+                }))
+            self._room_id = room_id
+        if show_inventory:
+            updates["messages"].append({
+                "type": "inventory",
+                "items": [{"item_name": entry.item_name, "quantity": entry.quantity}
+                          for entry in InventoryModel.get_player_inventory_entries(connection, self.name)],
+            })
+        return updates
+
+    async def _deliver(self, updates: dict):
+        if not updates:
+            return
+        for message in updates["messages"]:
+            await self.send(message)
+        for names, message in updates["presence"]:
+            sessions.push(names, message)
+
+
+class SessionRegistry:
+    def __init__(self, max_sessions: int = 10000):
+        """:param max_sessions: Sessions open at once before open() refuses more."""
+        self.max_sessions = max_sessions
+        self.opened = 0
+        self._sessions = {}
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, name: str):
+        return self._sessions.get(name)
+
+    def open(self, session: GameSession):
+        """
+        Register a session as its player's live session.
+
+        :return: The player's previous session, which the caller should close, or None.
+        :raises SessionLimitReached: If max_sessions other players' sessions are open.
+        """
+        previous = self._sessions.get(session.name)
+        if previous is None and len(self._sessions) >= self.max_sessions:
+            raise SessionLimitReached(f"{len(self._sessions)} sessions are already open.")
+        self._sessions[session.name] = session
+        self.opened += 1
+        return previous
+
+    def close(self, session: GameSession):
+        """Forget a session that has ended, unless a newer one for the same player replaced it."""
+        if self._sessions.get(session.name) is session:
+            del self._sessions[session.name]
+
+    def push(self, names, message: dict) -> int:
+        """Push a message to the live sessions of the named players; returns how many accepted it."""
+        delivered = 0
+        for name in names:
+            session = self._sessions.get(name)
+            if session is not None and session.push(message):
+                delivered += 1
+        return delivered
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "opened": self.opened,
+            "max_sessions": self.max_sessions,
+            "queued": sum(session.outbox.qsize() for session in self._sessions.values()),
+            "pushes_dropped": sum(session.pushes_dropped for session in self._sessions.values()),
+        }
+
+
+sessions = SessionRegistry(MAX_SESSIONS)
@@ -1,42 +1,289 @@
+# app/core/gpt_service.py
+#
+# The chat-completion client everything that talks to the LLM goes through. One AsyncOpenAI
+# client, and so one keep-alive connection pool, is shared for the life of the app: started and
+# closed by its lifespan, or created on first use. A semaphore caps the completions in flight.
+# Long multi-location answers can also be streamed and parsed location by location. Calls go out
+# through the LLM scheduler (app.core.llm_scheduler), which rate-limits, prioritizes and retries them.
+
+import asyncio
 import json
 
 import logging
 import os
+import time
+
+from app.core.json_stream import LocationStreamParser
+from app.core.llm_cache import cache_key, get_llm_cache
+from app.core.llm_scheduler import INTERACTIVE, get_llm_scheduler
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def get_gpt_response(prompt: str, api_key: str = None, model: str = None):
-    """Helper function to get a response from GPT using the updated client."""
-    from openai import OpenAI
-    try:
-        # Use environment variable if API key is not provided
-        if api_key is None:
-            api_key = os.getenv("OPENAI_API_KEY")
+class GptClient:
+    def __init__(self, api_key: str = None, model: str = None, base_url: str = None,
+                 max_concurrency: int = None, timeout: float = None, max_retries: int = None):
+        """
+        Unset options come from the environment: OPENAI_API_KEY, AI_MODEL, OPENAI_BASE_URL,
+        GPT_MAX_CONCURRENCY (default 8), GPT_TIMEOUT (seconds per call, default 60) and
+        GPT_MAX_RETRIES (default 0: the LLM scheduler retries, with backoff shared across calls).
+        """
+        self.api_key = api_key
+        self.model = model or os.getenv("AI_MODEL")
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        self.max_concurrency = max_concurrency or int(os.getenv("GPT_MAX_CONCURRENCY", "8"))
+        self.timeout = timeout or float(os.getenv("GPT_TIMEOUT", "60"))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("GPT_MAX_RETRIES", "0"))
+        self.calls = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.loop = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._client = None
 
-        if model is None:
-            model = os.getenv("AI_MODEL")
+    def _openai(self):
+        if self._client is None:
+            from openai import AsyncOpenAI
+            self.loop = asyncio.get_running_loop()
+            self._client = AsyncOpenAI(
+                api_key=self.api_key, base_url=self.base_url, timeout=self.timeout, max_retries=self.max_retries
+            )
+        return self._client
 
-        # Set up the OpenAI client with the provided API key
-        client = OpenAI()
-        client.api_key = api_key
+    async def complete_json(self, prompt: str, model: str = None, api_key: str = None, timeout: float = None) -> dict:
+        """
+        Ask for a JSON object answering ``prompt``.
 
-        # Prepare and send the request to OpenAI
-        completion = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": f"{prompt}: respond in json"}],
-            stream=False,
-            response_format={ "type": "json_object" }
-        )
+        :param api_key: Overrides the client's key for this call, still on the shared connections.
+        :param timeout: Seconds allowed for this call, instead of the client's timeout.
+        :raises: Whatever the API or json.loads raises.
+        """
+        response, _ = await self.complete_json_with_usage(prompt, model, api_key, timeout)
+        return response
 
+    async def complete_json_with_usage(self, prompt: str, model: str = None, api_key: str = None,
+                                       timeout: float = None) -> tuple:
+        """Like complete_json, also returning ``{"prompt_tokens", "completion_tokens"}`` as the API reported them."""
+        client = self._openai()
+        if api_key is not None:
+            client = client.with_options(api_key=api_key)
+        async with self._semaphore:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                completion = await client.chat.completions.create(
+                    model=model or self.model,
+                    messages=[{"role": "user", "content": f"{prompt}: respond in json"}],
+                    stream=False,
+                    response_format={"type": "json_object"},
+                    timeout=timeout or self.timeout,
+                )
+            except Exception:
+                self.failures += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+        usage = {
+            "prompt_tokens": completion.usage.prompt_tokens if completion.usage else 0,
+            "completion_tokens": completion.usage.completion_tokens if completion.usage else 0,
+        }
+        self.prompt_tokens += usage["prompt_tokens"]
+        self.completion_tokens += usage["completion_tokens"]
         response_content = completion.choices[0].message.content
 
         # Remove newlines from the response JSON
         response_content = response_content.replace("\n", "")
-        return json.loads(response_content)
+        return json.loads(response_content), usage
+
+    async def stream_text(self, prompt: str, model: str = None, api_key: str = None, timeout: float = None):
+        """
+        Ask for a JSON object answering ``prompt`` and yield its text as the tokens arrive.
+
+        The call holds its concurrency slot until the stream ends or the generator is closed.
+
+        :param timeout: Seconds allowed between chunks, instead of the client's timeout.
+        """
+        client = self._openai()
+        if api_key is not None:
+            client = client.with_options(api_key=api_key)
+        async with self._semaphore:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                stream = await client.chat.completions.create(
+                    model=model or self.model,
+                    messages=[{"role": "user", "content": f"{prompt}: respond in json"}],
+                    stream=True,
+                    response_format={"type": "json_object"},
+                    timeout=timeout or self.timeout,
+                )
+                try:
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                finally:
+                    await stream.close()
+            except Exception:
+                self.failures += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+    async def close(self):
+        """Close the pooled connections; calls made afterwards open a new pool."""
+        client, self._client = self._client, None
+        if client is not None:
+            await client.close()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "max_concurrency": self.max_concurrency,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+_client = None
+
+
+def get_gpt_client() -> GptClient:
+    """Return the shared client, creating one from the environment if the app has not started one."""
+    global _client
+    # Connections belong to the event loop that opened them, so a new loop needs a new client.
+    if _client is None or (_client.loop is not None and _client.loop is not asyncio.get_running_loop()):
+        _client = GptClient()
+    return _client
+
+
+def set_gpt_client(client):
+    """Replace the shared client without closing the old one (None builds one from the environment on next use)."""
+    global _client
+    _client = client
+
+
+async def start_gpt_client(**options) -> GptClient:
+    """Replace the shared client with one built from ``options`` (see GptClient)."""
+    global _client
+    await close_gpt_client()
+    _client = GptClient(**options)
+    return _client
+
+
+async def close_gpt_client():
+    """Close the shared client's connections."""
+    global _client
+    client, _client = _client, None
+    if client is not None and client.loop in (None, asyncio.get_running_loop()):
+        await client.close()
+
+
+async def get_gpt_completion(prompt: str, api_key: str = None, model: str = None, cache: bool = True,
+                             priority: int = INTERACTIVE, max_wait: float = None) -> tuple:
+    """
+    Return the answer to ``prompt`` with the tokens it took (none when it came from the cache).
+
+    Takes the same options as get_gpt_response, but raises errors instead of returning them.
+
+    :return: ``(answer, {"prompt_tokens", "completion_tokens", "cached"})``
+    """
+    client = get_gpt_client()
+    model = model or client.model
+    response_cache = get_llm_cache() if cache else None
+    key = cache_key(model, prompt)
+    response = await response_cache.get_async(key) if response_cache is not None else None
+    if response is not None:
+        return response, {"prompt_tokens": 0, "completion_tokens": 0, "cached": True}
+    started = time.perf_counter()
+    response, usage = await get_llm_scheduler().run(
+        lambda: client.complete_json_with_usage(prompt, model=model, api_key=api_key), prompt, priority, max_wait
+    )
+    if response_cache is not None:
+        await response_cache.put_async(key, response, time.perf_counter() - started, model)
+    return response, {**usage, "cached": False}
+
+
+def completion_cost(usage: dict) -> float:
+    """
+    Dollar cost of ``usage`` at LLM_PROMPT_COST_PER_MILLION and LLM_COMPLETION_COST_PER_MILLION
+    (defaults: 0.15 and 0.60 dollars per million tokens).
+    """
+    return (usage["prompt_tokens"] * float(os.getenv("LLM_PROMPT_COST_PER_MILLION", "0.15"))
+            + usage["completion_tokens"] * float(os.getenv("LLM_COMPLETION_COST_PER_MILLION", "0.60"))) / 1e6
+
+
+async def get_gpt_response(prompt: str, api_key: str = None, model: str = None, cache: bool = True,
+                           priority: int = INTERACTIVE, max_wait: float = None):
+    """
+    Helper function to get a response from GPT using the shared client.
+
+    :param cache: False to always ask the model, neither reading nor storing a cached response
+        (see app.core.llm_cache). Errors are never cached.
+    :param priority: Scheduler queue: INTERACTIVE, PREFETCH or BULK (see app.core.llm_scheduler).
+    :param max_wait: Seconds the call may wait for the scheduler before it is dropped.
+    """
+    try:
+        response, _ = await get_gpt_completion(prompt, api_key, model, cache, priority, max_wait)
+        return response
     except Exception as e:
         return f"Error while getting response from GPT: {str(e)}"
 
 
+async def stream_locations(prompt: str, api_key: str = None, model: str = None, cache: bool = True,
+                           priority: int = INTERACTIVE, max_wait: float = None):
+    """
+    Yield each object of the ``{"locations": [...]}`` answer to ``prompt`` as soon as it is complete.
 
+    A cached answer is replayed at once; a streamed one is cached once its array has closed.
+    Unlike get_gpt_response, errors are raised. The scheduler retries errors raised before the
+    first text arrives; a stream failing after that is not resumed.
+
+    :param cache: False to always ask the model, neither reading nor storing a cached response.
+    :param priority: Scheduler queue: INTERACTIVE, PREFETCH or BULK (see app.core.llm_scheduler).
+    :param max_wait: Seconds the call may wait for the scheduler before it is dropped.
+    """
+    client = get_gpt_client()
+    response_cache = get_llm_cache() if cache else None
+    model = model or client.model
+    key = cache_key(model, prompt)
+    if response_cache is not None:
+        response = await response_cache.get_async(key)
+        if response is not None:
+            for location in response.get("locations", []):
+                yield location
+            return
+
+    async def open_stream():
+        stream = client.stream_text(prompt, model=model, api_key=api_key)
+        try:
+            return stream, await anext(stream, "")
+        except BaseException:
+            await stream.aclose()
+            raise
+
+    parser = LocationStreamParser()
+    locations = []
+    started = time.perf_counter()
+    stream, text = await get_llm_scheduler().run(open_stream, prompt, priority, max_wait)
+    try:
+        while text:
+            for location in parser.feed(text):
+                locations.append(location)
+                yield location
+            text = await anext(stream, "")
+    finally:
+        await stream.aclose()
+    parser.close()
+    # An answer without a locations array (such as {"error": ...}) is not cached.
+    if response_cache is not None and parser.done:
+        await response_cache.put_async(key, {"locations": locations}, time.perf_counter() - started, model)
@@ -0,0 +1,39 @@
+# app/core/grid.py
+#
+# Shared definitions for the integer (x, y) room grid. North is +y and east is +x.
+
+DIRECTION_OFFSETS = {
+    "north": (0, 1),
+    "northeast": (1, 1),
+    "east": (1, 0),
+    "southeast": (1, -1),
+    "south": (0, -1),
+    "southwest": (-1, -1),
+    "west": (-1, 0),
+    "northwest": (-1, 1),
+}
+
+# Compact integer codes for the eight directions, used as indexes into adjacency rows.
+DIRECTIONS = tuple(DIRECTION_OFFSETS)
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+REVERSE_DIRECTIONS = {
+    "north": "south",
+    "northeast": "southwest",
+    "east": "west",
+    "southeast": "northwest",
+    "south": "north",
+    "southwest": "northeast",
+    "west": "east",
+    "northwest": "southeast",
+}
+
+# Rooms are grouped into CHUNK_SIZE x CHUNK_SIZE chunks for region queries. The shift is baked into
+# the idx_rooms_chunk expression index (migration 5), so changing it needs a new migration.
+CHUNK_SHIFT = 4
+CHUNK_SIZE = 1 << CHUNK_SHIFT
+
+
+def chunk_of(x: int, y: int) -> tuple:
+    """Return the ``(chunk_x, chunk_y)`` containing a cell; negative coordinates floor like SQLite's >>."""
+    return x >> CHUNK_SHIFT, y >> CHUNK_SHIFT
@@ -0,0 +1,115 @@
+# app/core/json_stream.py
+#
+# Incremental extraction of the objects inside a {"locations": [...]} document, used for both
+# multi-gigabyte world files and token-by-token LLM output.
+
+import json
+import re
+
+_ARRAY_START = re.compile(r'(?<!\\)"locations"\s*:\s*\[')
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_NEXT_VALUE = re.compile(r'[^\s,]')
+
+
+class LocationStreamParser:
+    """
+    Feed text as it arrives and get back every location object completed so far.
+
+    Only the object currently being received is buffered, so memory stays bounded by the
+    size of the largest single location.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._in_array = False
+        self.done = False
+        # Offsets into _buffer: start of the unconsumed text and how far it has been scanned
+        self._start = 0
+        self._scan_position = 0
+        # Scan state for the object currently being received
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, text: str) -> list:
+        """Consume the next piece of the document and return the locations it completed."""
+        if self.done:
+            return []
+        self._buffer += text
+        locations = []
+        if not self._in_array:
+            match = _ARRAY_START.search(self._buffer)
+            if match is None:
+                # Keep enough of the tail to match a key split across pieces.
+                self._buffer = self._buffer[-64:]
+                return locations
+            self._in_array = True
+            self._start = self._scan_position = match.end()
+        while not self.done:
+            location = self._next_object()
+            if location is None:
+                break
+            locations.append(location)
+        # Drop everything already consumed, once per feed.
+        self._buffer = self._buffer[self._start:]
+        self._scan_position -= self._start
+        self._start = 0
+        return locations
+
+    def close(self):
+        """Signal the end of input; raises if the locations array was never closed."""
+        if self._in_array and not self.done:
+            raise ValueError("Truncated document: the locations array was not closed.")
+
+    def _next_object(self):
+        buffer = self._buffer
+        if self._depth == 0:
+            # Between objects: skip separators until the next object or the end of the array.
+            match = _NEXT_VALUE.search(buffer, self._start)
+            if match is None:
+                self._start = self._scan_position = len(buffer)
+                return None
+            char = match.group()
+            if char == "]":
+                self.done = True
+                self._start = self._scan_position = len(buffer)
+                return None
+            if char != "{":
+                raise ValueError(f"Expected a location object, got {char!r}")
+            self._start = self._scan_position = match.start()
+
+        position = self._scan_position
+        while True:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buffer, position)
+                if match is None:
+                    position = len(buffer)
+                    break
+                position = match.end()
+                if match.group() == "\\":
+                    if position == len(buffer):
+                        # The escaped character has not arrived yet
+                        position -= 1
+                        break
+                    position += 1
+                else:
+                    self._in_string = False
+                continue
+            match = _STRUCTURAL.search(buffer, position)
+            if match is None:
+                position = len(buffer)
+                break
+            position = match.end()
+            char = match.group()
+            if char == '"':
+                self._in_string = True
+            elif char == "{" or char == "[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    location = json.loads(buffer[self._start:position])
+                    self._start = self._scan_position = position
+                    return location
+        self._scan_position = position
+        return None
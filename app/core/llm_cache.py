@@ -0,0 +1,194 @@
+# app/core/llm_cache.py
+#
+# Persistent, content-addressed cache of LLM responses. A response is keyed by a hash of the model,
+# the normalized prompt and the response format, and kept in its own SQLite file so that it
+# survives game database resets: regenerating a region, replaying a session or re-running tests
+# asks the model only for prompts it has not answered before. Entries expire after a TTL and the
+# least recently used ones are evicted past a size limit. Async callers go through get_async and
+# put_async, which run the SQLite work (and its WAL commit) on a worker thread, off the event loop.
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "llm_cache.db"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace, so re-indented copies of a prompt share an entry."""
+    return " ".join(prompt.split())
+
+
+def cache_key(model: str, prompt: str, response_format: str = "json_object") -> str:
+    material = json.dumps([model, normalize_prompt(prompt), response_format], separators=(",", ":"))
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class LlmResponseCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 10000,
+                 max_bytes: int = 64 * 1024 * 1024, ttl: float = 30 * 24 * 3600):
+        """
+        :param path: SQLite file holding the entries (":memory:" for a throwaway cache).
+        :param max_entries: Entries kept before the least recently used ones are evicted.
+        :param max_bytes: Total response size kept before the least recently used ones are evicted.
+        :param ttl: Seconds an entry is served after it was stored; 0 keeps entries until evicted.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode = WAL;")
+        self._connection.execute("PRAGMA synchronous = NORMAL;")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                latency REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+        """)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used);")
+        # Kept up to date by every write, so eviction never has to scan the table.
+        self._count, self._size = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses;"
+        ).fetchone()
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache configured through LLM_CACHE_* environment variables."""
+        return cls(
+            path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+            max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            ttl=float(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600))),
+        )
+
+    def __len__(self):
+        return self._count
+
+    def get(self, key: str):
+        """Return the cached response for ``key``, or None on a miss or an expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, latency, created_at, size FROM llm_responses WHERE key = ?;", (key,)
+            ).fetchone()
+            if row is not None and self.ttl and now - row[2] > self.ttl:
+                self._connection.execute("DELETE FROM llm_responses WHERE key = ?;", (key,))
+                self._count -= 1
+                self._size -= row[3]
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE llm_responses SET last_used = ? WHERE key = ?;", (now, key))
+            self.hits += 1
+            self.saved_seconds += row[1]
+        return json.loads(row[0])
+
+    def put(self, key: str, response, latency: float, model: str = None):
+        """
+        Store ``response`` (anything json.dumps accepts) for ``key``.
+
+        :param latency: Seconds the completion took; a later hit counts it as saved.
+        """
+        text = json.dumps(response, separators=(",", ":"))
+        now = time.time()
+        with self._lock:
+            replaced = self._connection.execute("SELECT size FROM llm_responses WHERE key = ?;", (key,)).fetchone()
+            self._connection.execute("""
+                INSERT OR REPLACE INTO llm_responses (key, model, response, size, latency, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?);
+            """, (key, model, text, len(text), latency, now, now))
+            if replaced is None:
+                self._count += 1
+            self._size += len(text) - (replaced[0] if replaced else 0)
+            self._evict()
+
+    async def get_async(self, key: str):
+        """get, run on a worker thread so the event loop is not held up by SQLite."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def put_async(self, key: str, response, latency: float, model: str = None):
+        """put, run on a worker thread so the event loop is not held up by SQLite."""
+        await asyncio.to_thread(self.put, key, response, latency, model)
+
+    def _evict(self):
+        while self._count > self.max_entries or (self._count and self._size > self.max_bytes):
+            # The entries past max_entries go in one statement; past max_bytes, the oldest one at a time.
+            limit = max(self._count - self.max_entries, 1)
+            sizes = self._connection.execute("""
+                DELETE FROM llm_responses
+                WHERE key IN (SELECT key FROM llm_responses ORDER BY last_used LIMIT ?)
+                RETURNING size;
+            """, (limit,)).fetchall()
+            if not sizes:
+                break
+            self._count -= len(sizes)
+            self._size -= sum(size for size, in sizes)
+            self.evictions += len(sizes)
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM llm_responses;")
+            self._count = self._size = 0
+            self.hits = self.misses = self.expired = self.evictions = 0
+            self.saved_seconds = 0.0
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Return the shared cache, or None when LLM_CACHE_ENABLED=0."""
+    global _cache
+    if os.getenv("LLM_CACHE_ENABLED", "1") != "1":
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LlmResponseCache.from_env()
+    return _cache
+
+
+def set_llm_cache(cache):
+    """Replace the shared cache (None opens a new one from the environment on next use)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
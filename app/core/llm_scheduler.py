@@ -0,0 +1,323 @@
+# app/core/llm_scheduler.py
+#
+# Admission control in front of the LLM client. Every call waits in one of three priority queues
+# (a player waiting on the answer, background prefetch, admin/bulk work) until token buckets for
+# requests per minute and tokens per minute both have room, then goes out; lower priorities only
+# go out when nothing above them is waiting. Rate-limit, timeout and server errors are retried
+# with jittered exponential backoff, a 429 also pauses every queue, and low-priority jobs that
+# have waited past their deadline are dropped instead of being sent for answers nobody needs.
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+PREFETCH = 1
+BULK = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", PREFETCH: "prefetch", BULK: "bulk"}
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LlmDeadlineExceeded(Exception):
+    """Raised for a job dropped because it waited longer than its max_wait."""
+
+
+def estimate_tokens(prompt: str, completion_tokens: int) -> int:
+    """Rough token count of a call: about four characters per prompt token plus the expected answer."""
+    return len(prompt) // 4 + completion_tokens
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for rate limits, timeouts, dropped connections and server errors."""
+    from openai import APIConnectionError
+
+    if isinstance(error, (APIConnectionError, asyncio.TimeoutError)):
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES
+
+
+def retry_after(error: Exception):
+    """Seconds the provider asked us to wait (Retry-After), or None."""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        """
+        :param per_minute: Refill rate; also the capacity, so up to a minute's worth can go at once.
+            0 means unlimited.
+        """
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = None
+
+    def _refill(self, now: float):
+        if self.updated is not None:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.per_minute / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` can be taken (0 if it can be taken now)."""
+        if not self.per_minute:
+            return 0.0
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing * 60 / self.per_minute)
+
+    def take(self, amount: float, now: float):
+        if self.per_minute:
+            self._refill(now)
+            self.level -= min(amount, self.capacity)
+
+
+class LlmSchedulerStats:
+    def __init__(self):
+        self.submitted = dict.fromkeys(PRIORITY_NAMES, 0)
+        self.admitted = dict.fromkeys(PRIORITY_NAMES, 0)
+        self.dropped = dict.fromkeys(PRIORITY_NAMES, 0)
+        self.total_wait = dict.fromkeys(PRIORITY_NAMES, 0.0)
+        self.max_wait = dict.fromkeys(PRIORITY_NAMES, 0.0)
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+
+    def record_admission(self, priority: int, wait: float):
+        self.admitted[priority] += 1
+        self.total_wait[priority] += wait
+        self.max_wait[priority] = max(self.max_wait[priority], wait)
+
+    def as_dict(self, queue_depths: dict) -> dict:
+        return {
+            "queues": {
+                name: {
+                    "depth": queue_depths[priority],
+                    "submitted": self.submitted[priority],
+                    "admitted": self.admitted[priority],
+                    "dropped": self.dropped[priority],
+                    "mean_wait_ms": self.total_wait[priority] / self.admitted[priority] * 1000
+                    if self.admitted[priority] else 0.0,
+                    "max_wait_ms": self.max_wait[priority] * 1000,
+                }
+                for priority, name in PRIORITY_NAMES.items()
+            },
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "failures": self.failures,
+        }
+
+
+class _Job:
+    __slots__ = ("priority", "tokens", "deadline", "enqueued", "future")
+
+    def __init__(self, priority, tokens, deadline, enqueued, future):
+        self.priority = priority
+        self.tokens = tokens
+        self.deadline = deadline
+        self.enqueued = enqueued
+        self.future = future
+
+
+class LlmScheduler:
+    def __init__(self, requests_per_minute: float = 500, tokens_per_minute: float = 200000,
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 max_wait: dict = None, completion_tokens: int = 1500):
+        """
+        :param requests_per_minute: Request bucket rate (0 = unlimited).
+        :param tokens_per_minute: Token bucket rate (0 = unlimited).
+        :param max_retries: Retries of a retryable error before it is raised.
+        :param backoff_base: Seconds before the first retry; doubled per retry, plus jitter.
+        :param backoff_max: Cap on the backoff before jitter.
+        :param max_wait: ``{priority: seconds}`` a job may wait before it is dropped; None never drops.
+        :param completion_tokens: Expected answer size, counted against the token bucket.
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_wait = {INTERACTIVE: None, PREFETCH: None, BULK: None, **(max_wait or {})}
+        self.completion_tokens = completion_tokens
+        self.stats = LlmSchedulerStats()
+        self.loop = None
+        self._queue = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._wake = None
+        self._task = None
+
+    @classmethod
+    def from_env(cls):
+        """Build a scheduler configured through LLM_* environment variables."""
+        return cls(
+            requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500")),
+            tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+            backoff_base=float(os.getenv("LLM_BACKOFF_BASE", "0.5")),
+            backoff_max=float(os.getenv("LLM_BACKOFF_MAX", "30")),
+            max_wait={PREFETCH: float(os.getenv("LLM_PREFETCH_MAX_WAIT", "30")) or None,
+                      BULK: float(os.getenv("LLM_BULK_MAX_WAIT", "0")) or None},
+            completion_tokens=int(os.getenv("LLM_COMPLETION_TOKENS", "1500")),
+        )
+
+    def queue_depths(self) -> dict:
+        depths = dict.fromkeys(PRIORITY_NAMES, 0)
+        for _, _, job in self._queue:
+            depths[job.priority] += 1
+        return depths
+
+    def as_dict(self) -> dict:
+        return self.stats.as_dict(self.queue_depths())
+
+    async def run(self, fn, prompt: str = "", priority: int = INTERACTIVE, max_wait: float = None):
+        """
+        Return ``await fn()`` once admitted, retrying retryable errors with backoff.
+
+        :param prompt: Used to estimate the call's tokens.
+        :param max_wait: Seconds the job may wait for admission, instead of its priority's default.
+        :raises LlmDeadlineExceeded: If the job waited longer than ``max_wait``.
+        """
+        loop = asyncio.get_running_loop()
+        if max_wait is None:
+            max_wait = self.max_wait[priority]
+        deadline = loop.time() + max_wait if max_wait is not None else None
+        tokens = estimate_tokens(prompt, self.completion_tokens)
+        self.stats.submitted[priority] += 1
+        attempt = 0
+        while True:
+            await self.admit(priority, tokens, deadline)
+            try:
+                return await fn()
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    self.stats.failures += 1
+                    raise
+                delay = self.backoff(attempt, e)
+                attempt += 1
+                self.stats.retries += 1
+                if getattr(e, "status_code", None) == 429:
+                    # Over the provider's limit: hold every queue back, not just this job.
+                    self.stats.rate_limited += 1
+                    self._paused_until = max(self._paused_until, loop.time() + delay)
+                logger.warning(f"Retrying LLM call in {delay:.2f} s after: {str(e)}")
+                await asyncio.sleep(delay)
+
+    def backoff(self, attempt: int, error: Exception = None) -> float:
+        """Seconds to wait before retry ``attempt`` (from 0): the server's Retry-After if it sent one."""
+        requested = retry_after(error)
+        if requested is not None:
+            return requested
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def admit(self, priority: int, tokens: int, deadline: float = None):
+        """Wait until a call of ``tokens`` at ``priority`` may go out."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self.loop is not loop:
+            if self.loop is not loop:
+                # Jobs queued on another event loop can no longer be resumed.
+                self.loop = loop
+                self._queue = []
+            self._wake = asyncio.Event()
+            self._task = loop.create_task(self._dispatch(), name="llm-scheduler")
+        job = _Job(priority, tokens, deadline, loop.time(), loop.create_future())
+        heapq.heappush(self._queue, (priority, next(self._sequence), job))
+        self._wake.set()
+        await job.future
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._queue:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            now = loop.time()
+            self._drop_expired(now)
+            if not self._queue:
+                continue
+            _, _, job = self._queue[0]
+            wait = max(
+                self._paused_until - now,
+                self.requests.wait_time(1, now),
+                self.tokens.wait_time(job.tokens, now),
+            )
+            if wait > 0:
+                deadlines = [entry[2].deadline for entry in self._queue if entry[2].deadline is not None]
+                if deadlines:
+                    wait = max(0.0, min(wait, min(deadlines) - now))
+                # Sleep until there is room, waking early if a more urgent job arrives.
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._queue)
+            self.requests.take(1, now)
+            self.tokens.take(job.tokens, now)
+            self.stats.record_admission(job.priority, now - job.enqueued)
+            job.future.set_result(None)
+
+    def _drop_expired(self, now: float):
+        kept = []
+        for entry in self._queue:
+            job = entry[2]
+            if job.future.done():
+                # The caller gave up waiting.
+                continue
+            if job.deadline is not None and now > job.deadline:
+                self.stats.dropped[job.priority] += 1
+                job.future.set_exception(LlmDeadlineExceeded(
+                    f"Dropped {PRIORITY_NAMES[job.priority]} LLM call after waiting {now - job.enqueued:.1f} s"
+                ))
+                continue
+            kept.append(entry)
+        if len(kept) != len(self._queue):
+            heapq.heapify(kept)
+            self._queue = kept
+
+    async def close(self):
+        """Stop dispatching; jobs still waiting are cancelled."""
+        task, self._task = self._task, None
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        for _, _, job in self._queue:
+            job.future.cancel()
+        self._queue = []
+
+
+_scheduler = None
+
+
+def get_llm_scheduler() -> LlmScheduler:
+    """Return the shared scheduler, creating one from the environment on first use."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LlmScheduler.from_env()
+    return _scheduler
+
+
+def set_llm_scheduler(scheduler):
+    """Replace the shared scheduler (None builds a new one from the environment on next use)."""
+    global _scheduler
+    _scheduler = scheduler
+
+
+async def close_llm_scheduler():
+    """Stop the shared scheduler, cancelling calls still waiting for admission."""
+    global _scheduler
+    scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        await scheduler.close()
@@ -0,0 +1,130 @@
+# app/core/map_view.py
+#
+# Viewports of the map around a player, assembled from pre-rendered chunk tiles and encoded
+# compactly: terrain codes and room ids as grids with row 0 at the northern edge, run-length
+# encoded as JSON lists or zlib-compressed little-endian arrays in base64.
+
+import base64
+import zlib
+
+import numpy as np
+
+from app.core.grid import chunk_of, CHUNK_SHIFT, CHUNK_SIZE
+from app.db.map_tiles import map_tiles, terrain_codes
+from app.db.models import PlayerModel, RoomModel
+from app.db.room_identity import room_identity
+
+RLE = "rle"
+ZLIB = "zlib"
+ENCODINGS = (RLE, ZLIB)
+
+
+def run_length_encode(values: np.ndarray) -> list:
+    """Encode the values in row-major order as a flat ``[value, run length, value, run length, ...]`` list."""
+    flat = np.ascontiguousarray(values).ravel()
+    if not flat.size:
+        return []
+    starts = np.concatenate(([0], np.flatnonzero(flat[1:] != flat[:-1]) + 1))
+    lengths = np.diff(np.append(starts, flat.size))
+    return np.column_stack((flat[starts], lengths)).ravel().tolist()
+
+
+def run_length_decode(runs: list) -> np.ndarray:
+    """Inverse of run_length_encode, as a flat array."""
+    runs = np.asarray(runs, dtype=np.int64).reshape(-1, 2)
+    return np.repeat(runs[:, 0], runs[:, 1])
+
+
+def encode_room_ids(room_ids: np.ndarray) -> list:
+    """Run-length encode room ids as the differences between consecutive cells, which repeat across a grid."""
+    flat = np.ascontiguousarray(room_ids).ravel().astype(np.int64)
+    return run_length_encode(np.diff(flat, prepend=0))
+
+
+def decode_room_ids(runs: list) -> np.ndarray:
+    """Inverse of encode_room_ids, as a flat array."""
+    return np.cumsum(run_length_decode(runs))
+
+
+def _compress(values: np.ndarray, dtype: str) -> str:
+    return base64.b64encode(zlib.compress(np.ascontiguousarray(values).astype(dtype).tobytes(), 1)).decode()
+
+
+def viewport(connection, x0: int, y0: int, width: int, height: int, with_names: bool = True):
+    """
+    Assemble the terrain codes, room ids and room names of a ``width`` x ``height`` rectangle.
+
+    :return: ``(terrain, room_ids, names)`` where both arrays are indexed ``[x - x0, y - y0]`` and
+        ``names`` maps the id (as a string) of every room in the rectangle to its name (None unless
+        with_names).
+    """
+    x1, y1 = x0 + width - 1, y0 + height - 1
+    terrain = np.zeros((width, height), dtype=np.uint16)
+    room_ids = np.zeros((width, height), dtype=np.int32)
+    names = {} if with_names else None
+    chunk_x0, chunk_y0 = chunk_of(x0, y0)
+    chunk_x1, chunk_y1 = chunk_of(x1, y1)
+    for chunk_x in range(chunk_x0, chunk_x1 + 1):
+        for chunk_y in range(chunk_y0, chunk_y1 + 1):
+            rooms = RoomModel.get_rooms_in_chunk(connection, chunk_x, chunk_y)
+            if not rooms:
+                continue
+            tile = map_tiles.get((chunk_x, chunk_y), rooms, store=not connection.in_transaction)
+            origin_x, origin_y = chunk_x << CHUNK_SHIFT, chunk_y << CHUNK_SHIFT
+            # The part of the chunk inside the viewport, in chunk and in viewport coordinates.
+            from_x, to_x = max(x0, origin_x), min(x1, origin_x + tile.terrain.shape[0] - 1) + 1
+            from_y, to_y = max(y0, origin_y), min(y1, origin_y + tile.terrain.shape[1] - 1) + 1
+            source = np.s_[from_x - origin_x:to_x - origin_x, from_y - origin_y:to_y - origin_y]
+            target = np.s_[from_x - x0:to_x - x0, from_y - y0:to_y - y0]
+            terrain[target] = tile.terrain[source]
+            room_ids[target] = tile.room_ids[source]
+            if not with_names:
+                continue
+            if to_x - from_x == CHUNK_SIZE and to_y - from_y == CHUNK_SIZE:
+                names.update(tile.names)
+            else:
+                # Only the rooms that are visible, not every room of the chunks the edges cut through.
+                names.update((key, tile.names[key]) for key in map(str, np.unique(tile.room_ids[source]).tolist())
+                             if key != "0")
+    return terrain, room_ids, names
+
+
+def render_player_viewport(connection, player_name: str, width: int, height: int,
+                           encoding: str = RLE, with_names: bool = True):
+    """
+    The viewport centred on a player's room, encoded for the /map endpoint.
+
+    :param encoding: RLE for run-length encoded JSON lists, or ZLIB for base64 zlib-compressed
+        arrays (terrain as uint16, room ids as int32, both little-endian).
+    :return: The payload dict, or None if the player does not exist. A player who is in no known
+        room gets a payload with only ``player`` and an ``error`` message, as there is nothing to centre on.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding '{encoding}'.")
+    player = PlayerModel.get_player_by_name(connection, player_name)
+    if player is None:
+        return None
+    cell = room_identity.coordinates_for_id(connection, player.current_room_id)
+    if cell is None:
+        return {"width": width, "height": height, "player": {"x": None, "y": None, "room_id": player.current_room_id},
+                "encoding": encoding, "error": f"Player '{player_name}' is not in any room."}
+    x, y = cell
+    x0, y0 = x - width // 2, y - height // 2
+    terrain, room_ids, names = viewport(connection, x0, y0, width, height, with_names)
+    # Rows run from the northern edge (highest y) south, cells within a row from west to east.
+    terrain, room_ids = terrain.T[::-1], room_ids.T[::-1]
+    payload = {
+        "x0": x0, "y0": y0, "width": width, "height": height,
+        "player": {"x": x, "y": y, "room_id": player.current_room_id},
+        "encoding": encoding,
+        "legend": terrain_codes.legend(np.unique(terrain).tolist()),
+    }
+    if encoding == RLE:
+        payload["terrain"] = run_length_encode(terrain)
+        payload["room_ids"] = encode_room_ids(room_ids)
+    else:
+        payload["terrain"] = _compress(terrain, "<u2")
+        payload["room_ids"] = _compress(room_ids, "<i4")
+    if with_names:
+        payload["names"] = names
+    return payload
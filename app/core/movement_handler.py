@@ -1,14 +1,8 @@
 from app.db.models import PlayerModel
+from app.db.room_graph import room_graph
+from app.db.room_identity import room_identity
 
 class MovementHandler:
-    def __init__(self):
-        # Define valid movements from each room
-        self.room_transitions = {
-            "start": {"east": "east_room", "west": "west_room"},
-            "east_room": {"west": "start"},
-            "west_room": {"east": "start"}
-        }
-
     def move_player(self, connection, player_name: str, direction: str):
         """Handles player movement."""
         # Retrieve player data
@@ -16,13 +10,11 @@ class MovementHandler:
         if not player:
             return {"success": False, "message": "Player not found."}
 
-        player_dict = dict(player)
-        current_room = player_dict["current_room"]
-
-        # Determine the target room based on direction
-        if direction in self.room_transitions.get(current_room, {}):
-            new_room = self.room_transitions[current_room][direction]
-            PlayerModel.update_player_location(connection, player_dict["name"], new_room)
+        # Determine the target room from the room graph
+        new_room_id = room_graph.neighbor(connection, player.current_room_id, direction)
+        if new_room_id is not None:
+            PlayerModel.update_player_location(connection, player.name, new_room_id)
+            new_room = room_identity.name_for_id(connection, new_room_id)
             return {"success": True, "message": f"You have moved to the {new_room}."}
         else:
             return {"success": False, "message": "You can't move in that direction."}
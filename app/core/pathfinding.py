@@ -0,0 +1,218 @@
+# app/core/pathfinding.py
+#
+# Route finding over the room graph: A* with a grid heuristic for arbitrary destinations, and
+# cached BFS distance fields for popular ones (such as the start room) that answer any route into
+# them without a search. Routes are lists of (direction, room_id) steps.
+
+import heapq
+import logging
+import os
+import threading
+from collections import OrderedDict, deque
+
+from app.core.grid import DIRECTIONS
+from app.db.caches import register_cache
+from app.db.room_graph import room_graph
+from app.db.room_identity import room_identity
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_EXPANSIONS = 200_000
+
+
+def _grid_distance(a, b) -> int:
+    # Chebyshev distance: a diagonal step costs the same as a straight one.
+    return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+
+
+def find_path(connection, start_id: int, goal_id: int, max_expansions: int = DEFAULT_MAX_EXPANSIONS):
+    """
+    Find a shortest route between two rooms with A*.
+
+    The grid-distance heuristic is exact for worlds whose exits join adjacent cells; exits that jump
+    further can make the route longer than the shortest, never invalid.
+
+    :param max_expansions: Give up after expanding this many rooms.
+    :return: ``[(direction, room_id), ...]`` leading from start to goal, or None if no route was found.
+    """
+    if start_id == goal_id:
+        return []
+    goal = room_identity.coordinates_for_id(connection, goal_id)
+    if goal is None:
+        return None
+    best = {start_id: 0}
+    came_from = {}
+    # (estimated total, -cost, room): among equal estimates, expand the room furthest along first.
+    frontier = [(0, 0, start_id)]
+    expansions = 0
+    while frontier:
+        _, negative_cost, room_id = heapq.heappop(frontier)
+        cost = -negative_cost
+        if room_id == goal_id:
+            return _reconstruct(came_from, goal_id)
+        if cost > best[room_id]:
+            continue
+        expansions += 1
+        if expansions > max_expansions:
+            logger.info(f"Gave up routing {start_id} -> {goal_id} after {max_expansions} expansions")
+            return None
+        for code, neighbor_id in enumerate(room_graph.neighbors(connection, room_id)):
+            if neighbor_id is None or cost + 1 >= best.get(neighbor_id, cost + 2):
+                continue
+            best[neighbor_id] = cost + 1
+            came_from[neighbor_id] = (room_id, code)
+            coordinates = room_identity.coordinates_for_id(connection, neighbor_id)
+            estimate = _grid_distance(coordinates, goal) if coordinates else 0
+            heapq.heappush(frontier, (cost + 1 + estimate, -cost - 1, neighbor_id))
+    return None
+
+
+def _reconstruct(came_from: dict, goal_id: int) -> list:
+    steps = []
+    room_id = goal_id
+    while room_id in came_from:
+        previous_id, code = came_from[room_id]
+        steps.append((DIRECTIONS[code], room_id))
+        room_id = previous_id
+    steps.reverse()
+    return steps
+
+
+def _linked(neighbors, room_id) -> bool:
+    return neighbors is not None and room_id in neighbors
+
+
+class DistanceField:
+    """
+    Steps from every room within ``radius`` to one target room, following two-way exits.
+
+    Only exits that have a matching exit back are used, which lets the field be built by a forward
+    BFS from the target; routes read from it always follow real exits.
+    """
+
+    def __init__(self, target_id: int, radius: int):
+        self.target_id = target_id
+        self.radius = radius
+        self.distances = {target_id: 0}
+        self.generation = room_graph.generation
+
+    def build(self, connection):
+        queue = deque([self.target_id])
+        while queue:
+            room_id = queue.popleft()
+            self._relax_from(connection, room_id, queue)
+        return self
+
+    def _relax_from(self, connection, room_id: int, queue, load=True):
+        """Offer ``distance + 1`` to every two-way neighbor of ``room_id``; False if a row was not loaded."""
+        distance = self.distances[room_id] + 1
+        if distance > self.radius:
+            return True
+        neighbors = room_graph.neighbors(connection, room_id) if load else room_graph.loaded_neighbors(room_id)
+        if neighbors is None:
+            return False
+        for neighbor_id in neighbors:
+            if neighbor_id is None or self.distances.get(neighbor_id, distance + 1) <= distance:
+                continue
+            back = room_graph.neighbors(connection, neighbor_id) if load else room_graph.loaded_neighbors(neighbor_id)
+            if back is None:
+                return False
+            if room_id in back:
+                self.distances[neighbor_id] = distance
+                queue.append(neighbor_id)
+        return True
+
+    def edge_added(self, room_id: int, neighbor_room_id: int) -> bool:
+        """
+        Lower distances after a new exit, using only cached graph rows.
+
+        :return: False if the field could not be updated and must be rebuilt.
+        """
+        if room_id not in self.distances and neighbor_room_id not in self.distances:
+            # Neither end is within reach of the target, so no route through the new exit is either.
+            return True
+        if not _linked(room_graph.loaded_neighbors(neighbor_room_id), room_id):
+            # One-way so far (or not loaded); the field ignores it until the exit back exists.
+            return room_graph.loaded_neighbors(neighbor_room_id) is not None
+        queue = deque(room for room in (room_id, neighbor_room_id) if room in self.distances)
+        while queue:
+            if not self._relax_from(None, queue.popleft(), queue, load=False):
+                return False
+        return True
+
+    def route_from(self, connection, start_id: int):
+        """Return the steps from ``start_id`` to the target, or None if it is outside the field."""
+        if start_id not in self.distances:
+            return None
+        steps = []
+        room_id = start_id
+        while room_id != self.target_id:
+            distance = self.distances[room_id]
+            for code, neighbor_id in enumerate(room_graph.neighbors(connection, room_id)):
+                if neighbor_id is not None and self.distances.get(neighbor_id) == distance - 1:
+                    steps.append((DIRECTIONS[code], neighbor_id))
+                    room_id = neighbor_id
+                    break
+            else:
+                return None
+        return steps
+
+
+class DistanceFieldCache:
+    def __init__(self, radius: int = 256, max_fields: int = 16):
+        """
+        :param radius: Maximum number of steps a field extends from its target.
+        :param max_fields: Number of fields kept before the least recently used one is dropped.
+        """
+        self.radius = radius
+        self.max_fields = max_fields
+        self.builds = 0
+        self._fields = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._fields.clear()
+            self.builds = 0
+
+    def get(self, connection, target_id: int) -> DistanceField:
+        """Return the distance field towards ``target_id``, building it on first use."""
+        with self._lock:
+            field = self._fields.get(target_id)
+            if field is not None and field.generation == room_graph.generation:
+                self._fields.move_to_end(target_id)
+                return field
+        field = DistanceField(target_id, self.radius).build(connection)
+        with self._lock:
+            self.builds += 1
+            self._fields[target_id] = field
+            self._fields.move_to_end(target_id)
+            while len(self._fields) > self.max_fields:
+                self._fields.popitem(last=False)
+        return field
+
+    def edge_added(self, room_id: int, direction: str, neighbor_room_id: int):
+        with self._lock:
+            for target_id, field in list(self._fields.items()):
+                if not field.edge_added(room_id, neighbor_room_id):
+                    del self._fields[target_id]
+
+
+distance_fields = register_cache(DistanceFieldCache(int(os.getenv("PATHFINDING_FIELD_RADIUS", "256"))))
+room_graph.on_edge_added(distance_fields.edge_added)
+
+# Destinations that get a distance field instead of a search per request.
+POPULAR_DESTINATIONS = set(os.getenv("PATHFINDING_POPULAR_ROOMS", "start").split(","))
+
+
+def plan_route(connection, start_id: int, goal_id: int, max_expansions: int = DEFAULT_MAX_EXPANSIONS):
+    """
+    Route between two rooms, reading it from a distance field when the goal is a popular destination.
+
+    :return: ``[(direction, room_id), ...]``, or None if there is no route.
+    """
+    if room_identity.name_for_id(connection, goal_id) in POPULAR_DESTINATIONS:
+        route = distance_fields.get(connection, goal_id).route_from(connection, start_id)
+        if route is not None:
+            return route
+    return find_path(connection, start_id, goal_id, max_expansions)
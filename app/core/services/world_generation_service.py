@@ -1,20 +1,50 @@
+import asyncio
 import logging
-from app.core.gpt_service import get_gpt_response
-from app.db.models import RoomModel, NeighborRelationModel
+import os
+from app.core.gpt_service import completion_cost, get_gpt_completion, get_gpt_response, stream_locations
+from app.core.grid import CHUNK_SIZE, DIRECTION_OFFSETS
+from app.core.llm_scheduler import PREFETCH
+from app.core.llm_cache import normalize_prompt
+from app.core.single_flight import SingleFlight
+from app.db.async_repository import run_in_db_executor
+from app.db.grid_index import grid_index
+from app.db.models import RoomModel, RoomDetailModel, NeighborRelationModel
+from app.db.room_identity import room_identity
 
 logger = logging.getLogger(__name__)
 
+# Generations in flight in this process, keyed by the cell (or prompt) being generated, so that
+# concurrent requests for the same cell wait for one LLM call instead of racing to insert it.
+room_generations = SingleFlight()
+
+
+def cell_flight(x: int, y: int) -> tuple:
+    """The room_generations key of a generation producing the room at ``(x, y)``, however it was asked for."""
+    return ("room", x, y)
+
+
+# Cells claimed by frontier batches in flight, so overlapping frontier requests generate each cell once.
+frontier_claims = set()
+
 
 class WorldGenerationService:
     def __init__(self, connection):
         self.connection = connection
 
-    async def generate_map_room(self, prompt: str):
+    async def generate_map_room(self, prompt: str, use_cache: bool = True):
+        """
+        :param use_cache: False to ask the model even if it has answered this prompt before.
+        """
         try:
-            # Call the GPT service to generate a room
-            data = await get_gpt_response(prompt)
+            # Call the GPT service to generate a room, sharing a call already in flight for this prompt
+            data = await room_generations.run(
+                ("map_room", normalize_prompt(prompt), use_cache),
+                lambda: get_gpt_response(prompt, cache=use_cache),
+            )
 
             # Check if the response contains the expected data
+            if isinstance(data, str):
+                raise ValueError(data)
             if "name" not in data or "description" not in data:
                 raise ValueError(f"Unexpected response from GPT: {data}")
 
@@ -31,22 +61,46 @@ class WorldGenerationService:
         """
         Save the generated map room to the database.
 
-        :param room_data: The dictionary containing room details (name, description, coordinates).
+        :param room_data: The dictionary containing room details (name, description, coordinates,
+            and optionally terrain_type, features, sounds and smells).
         """
         try:
             logger.info(f"Saving map room to database: {room_data}")
-            name = room_data.get("name")
-            description = room_data.get("description")
-            coordinates = room_data.get("grid_coordinates")
-
-            # Extract x and y coordinates from the grid_coordinates dict
-            x_coordinate = coordinates.get('x')
-            y_coordinate = coordinates.get('y')
-
-            RoomModel.create_room(self.connection, name, description, x_coordinate, y_coordinate)
+            self.save_rooms_to_db([room_data])
         except Exception as e:
             logger.error(f"Error while saving map room to database: {str(e)}")
 
+    def save_rooms_to_db(self, rooms_data: list) -> dict:
+        """
+        Save generated rooms at the cells that are still free, in one transaction, with their terrain,
+        features and ambience, and link them to the rooms around them.
+
+        :param rooms_data: Room data dicts as save_map_room_to_db takes.
+        :return: ``{(x, y): id}`` of the rooms saved.
+        """
+        rooms = [(room_data["name"], room_data["description"], room_data["grid_coordinates"]["x"],
+                  room_data["grid_coordinates"]["y"], room_data.get("terrain_type")) for room_data in rooms_data]
+        with self.connection:
+            inserted = RoomModel.insert_new_rooms(self.connection, rooms)
+            if not inserted:
+                return inserted
+            # Nothing else writes during the transaction, so its new rooms are exactly this id range.
+            NeighborRelationModel.link_grid_neighbors(
+                self.connection, min(inserted.values()), max(inserted.values()), incremental=True
+            )
+            features, ambience = [], []
+            for room_data in rooms_data:
+                coordinates = room_data["grid_coordinates"]
+                room_id = inserted.get((coordinates["x"], coordinates["y"]))
+                if room_id is None:
+                    continue
+                for feature in room_data.get("features", []):
+                    features.append((room_id, feature.get("type"), feature.get("description", "")))
+                ambience.extend((room_id, "sound", sound) for sound in room_data.get("sounds", []))
+                ambience.extend((room_id, "smell", smell) for smell in room_data.get("smells", []))
+            RoomDetailModel.replace_room_details(self.connection, list(inserted.values()), features, ambience)
+        return inserted
+
     def connect_rooms(self, room_a_id, room_b_id, direction):
         """
         Create a neighboring relationship between two rooms.
@@ -57,7 +111,7 @@ class WorldGenerationService:
         """
         try:
             logger.info(f"Connecting rooms {room_a_id} to {room_b_id} via {direction}")
-            NeighborRelationModel.create_relation(self.connection, room_a_id, room_b_id, direction)
+            NeighborRelationModel.add_neighbor_relation(self.connection, room_a_id, room_b_id, direction)
         except Exception as e:
             logger.error(f"Error while creating neighboring relation: {str(e)}")
 
@@ -65,9 +119,13 @@ class WorldGenerationService:
         """
         Retrieve existing neighbors for the current room.
         :param room_id: The ID of the current room.
-        :return: A list of neighboring room coordinates.
+        :return: A list of the coordinates of the occupied cells around the room.
         """
-        return NeighborRelationModel.get_neighbors_with_coordinates(self.connection, room_id)
+        coordinates = room_identity.coordinates_for_id(self.connection, room_id)
+        if coordinates is None:
+            return []
+        neighbors = grid_index.existing_neighbors(self.connection, *coordinates)
+        return [{"x": x, "y": y} for x, y in neighbors.values()]
 
     def get_existing_room(self, coordinates):
         """
@@ -78,20 +136,8 @@ class WorldGenerationService:
         """
         return RoomModel.get_room_by_coordinates(self.connection, coordinates)
 
-    async def generate_connected_room(self, current_coordinates, direction):
-        """
-        Generate a new room connected to an existing room in the given direction.
-
-        :param current_coordinates: The coordinates of the current room.
-        :param direction: The direction in which to generate the connected room.
-        :return: The generated room data.
-        """
-        # Retrieve current room from coordinates
-        current_room = self.get_existing_room(current_coordinates)
-        if not current_room:
-            return {"error": "Current room not found."}
-
-        existing_neighbors = existing_neighbors = self.get_existing_neighbors(current_room['id'])
+    def _connected_room_prompt(self, current_room, current_coordinates, direction):
+        existing_neighbors = self.get_existing_neighbors(current_room.id)
 
         # Prepare GPT prompt with current coordinates and direction
         prompt = f"""
@@ -124,11 +170,44 @@ class WorldGenerationService:
         smooth transitions between terrain types (e.g., no abrupt changes like snow to desert or forest to river). 
         If the requested direction is occupied, return this error structure: {{ "error": "Location occupied" }}.
         """
+        return prompt
+
+    async def generate_connected_room(self, current_coordinates, direction, use_cache: bool = True):
+        """
+        Generate a new room connected to an existing room in the given direction.
+
+        :param current_coordinates: The coordinates of the current room.
+        :param direction: The direction in which to generate the connected room.
+        :param use_cache: False to ask the model even if it has answered this prompt before.
+        :return: The generated room data; concurrent calls for the same cell all get the first one's.
+        """
+        target = self._target_cell(current_coordinates, direction)
+        if target is None:
+            return await self._generate_connected_room(current_coordinates, direction, use_cache)
+        result = await room_generations.run(
+            cell_flight(target["x"], target["y"]),
+            lambda: self._generate_connected_room(current_coordinates, direction, use_cache),
+        )
+        if isinstance(result, tuple):
+            # Joined enter_connected_room's generation of this cell, which streams and saves the rooms.
+            result = await self._entered_locations(*result)
+        return result
+
+    async def _generate_connected_room(self, current_coordinates, direction, use_cache):
+        # Retrieve current room from coordinates
+        current_room = await run_in_db_executor(self.get_existing_room, current_coordinates)
+        if not current_room:
+            return {"error": "Current room not found."}
+
+        prompt = await run_in_db_executor(self._connected_room_prompt, current_room, current_coordinates, direction)
 
         logger.info(f"Prompt sent:\n{prompt}")
 
         # Generate a new room using GPT
-        new_room_data = await get_gpt_response(prompt)
+        new_room_data = await get_gpt_response(prompt, cache=use_cache)
+        if isinstance(new_room_data, str):
+            logger.error(new_room_data)
+            return {"error": new_room_data}
 
         """
         if "error" in new_room_data:
@@ -164,3 +243,269 @@ class WorldGenerationService:
         """
         # Return the new room data
         return new_room_data
+
+    async def stream_connected_room(self, current_coordinates, direction, use_cache: bool = True):
+        """
+        Generate the same locations as generate_connected_room, yielding each as soon as it has streamed in.
+
+        :raises ValueError: If there is no room at ``current_coordinates``.
+        """
+        current_room = await run_in_db_executor(self.get_existing_room, current_coordinates)
+        if not current_room:
+            raise ValueError("Current room not found.")
+        prompt = await run_in_db_executor(self._connected_room_prompt, current_room, current_coordinates, direction)
+        logger.info(f"Prompt streamed:\n{prompt}")
+        async for location in stream_locations(prompt, cache=use_cache):
+            yield location
+
+    async def enter_connected_room(self, current_coordinates, direction, use_cache: bool = True):
+        """
+        Generate the room in ``direction`` and save and return it as soon as it has streamed in; its
+        neighbors keep streaming in the background and are saved as each one completes.
+
+        :return: ``(room data, task)``, where the task resolves to the saved neighbors' room data,
+            or ``({"error": ...}, None)`` if the room was not generated. Concurrent calls for the same
+            cell all get the first one's.
+        """
+        target = self._target_cell(current_coordinates, direction)
+        if target is None:
+            return {"error": f"Unknown direction: {direction}"}, None
+        result = await room_generations.run(
+            cell_flight(target["x"], target["y"]),
+            lambda: self._enter_connected_room(current_coordinates, direction, target, use_cache),
+        )
+        if isinstance(result, dict):
+            # Joined generate_connected_room's generation of this cell, which leaves saving to its caller.
+            result = await self._save_generated_locations(result, target)
+        return result
+
+    async def _enter_connected_room(self, current_coordinates, direction, target, use_cache):
+        entered = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(self._save_streamed_rooms(current_coordinates, direction, target, entered, use_cache))
+        await asyncio.wait([entered, task], return_when=asyncio.FIRST_COMPLETED)
+        if entered.done():
+            return entered.result(), task
+        try:
+            task.result()
+            error = "The generated locations did not include the requested room."
+        except Exception as e:
+            error = str(e)
+        logger.error(f"Error while generating connected room: {error}")
+        return {"error": f"Error while generating connected room: {error}"}, None
+
+    async def _save_streamed_rooms(self, current_coordinates, direction, target, entered, use_cache):
+        neighbors = []
+        try:
+            async for location in self.stream_connected_room(current_coordinates, direction, use_cache):
+                room_data = self._location_room_data(location)
+                if room_data is None:
+                    logger.warning(f"Skipping malformed generated location: {location}")
+                    continue
+                # The prompt only lists the origin's neighbors, so cells further out may exist already.
+                existing = await run_in_db_executor(self.get_existing_room, room_data["grid_coordinates"])
+                if existing is not None:
+                    if not entered.done() and room_data["grid_coordinates"] == target:
+                        entered.set_result({"name": existing.name, "description": existing.description,
+                                            "grid_coordinates": target})
+                    continue
+                await run_in_db_executor(self.save_map_room_to_db, room_data)
+                if not entered.done() and room_data["grid_coordinates"] == target:
+                    entered.set_result(self._room_summary(room_data))
+                else:
+                    neighbors.append(self._room_summary(room_data))
+        except Exception as e:
+            if not entered.done():
+                raise
+            # The player already has their room; the remaining neighbors are generated on a later visit.
+            logger.error(f"Error while streaming neighboring rooms: {str(e)}")
+        return neighbors
+
+    @staticmethod
+    async def _entered_locations(room_data, neighbors_task):
+        """Convert enter_connected_room's result into the ``{"locations": [...]}`` generate_connected_room returns."""
+        if neighbors_task is None:
+            return room_data
+        neighbors = await neighbors_task
+        return {"locations": [
+            {"coords": dict(room["grid_coordinates"]), "name": room["name"], "description": room["description"]}
+            for room in [room_data] + neighbors
+        ]}
+
+    async def _save_generated_locations(self, answer, target):
+        """Save a whole generate_connected_room answer, returning enter_connected_room's result for ``target``."""
+        if "error" in answer:
+            return {"error": f"Error while generating connected room: {answer['error']}"}, None
+        locations = [self._location_room_data(location) for location in answer.get("locations", [])]
+        locations = [room_data for room_data in locations if room_data is not None]
+        inserted = await run_in_db_executor(self.save_rooms_to_db, locations)
+        entered = await run_in_db_executor(self.get_existing_room, target)
+        if entered is None:
+            return {"error": "Error while generating connected room: "
+                             "The generated locations did not include the requested room."}, None
+        neighbors = asyncio.get_running_loop().create_future()
+        neighbors.set_result([
+            self._room_summary(room_data) for room_data in locations
+            if room_data["grid_coordinates"] != target
+            and (room_data["grid_coordinates"]["x"], room_data["grid_coordinates"]["y"]) in inserted
+        ])
+        return {"name": entered.name, "description": entered.description, "grid_coordinates": target}, neighbors
+
+    @staticmethod
+    def _target_cell(current_coordinates, direction):
+        """The coordinates one step in ``direction``, or None for an unknown direction."""
+        offset = DIRECTION_OFFSETS.get(direction)
+        if offset is None:
+            return None
+        return {"x": int(current_coordinates["x"]) + offset[0], "y": int(current_coordinates["y"]) + offset[1]}
+
+    @staticmethod
+    def _location_room_data(location):
+        """Convert a generated location into the room data save_map_room_to_db takes, or None if malformed."""
+        try:
+            coords = location["coords"]
+            terrain = location.get("type")
+            return {
+                "name": location["name"],
+                "description": location["description"],
+                "grid_coordinates": {"x": int(coords["x"]), "y": int(coords["y"])},
+                "terrain_type": terrain if isinstance(terrain, str) else None,
+                "features": [feature for feature in location.get("features") or [] if isinstance(feature, dict)],
+                "sounds": [sound for sound in location.get("sounds") or [] if isinstance(sound, str)],
+                "smells": [smell for smell in location.get("smells") or [] if isinstance(smell, str)],
+            }
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _room_summary(room_data):
+        """The name, description and coordinates the entered room and its neighbors are reported with."""
+        return {key: room_data[key] for key in ("name", "description", "grid_coordinates")}
+
+    def frontier_cells(self, chunk_x: int, chunk_y: int, adjacent_only: bool = False) -> list:
+        """
+        Return the empty cells of a chunk, as ``(x, y)`` tuples.
+
+        :param adjacent_only: Only cells touching an existing room (edges and corners), so the
+            frontier grows outward from the explored map instead of filling the chunk blind.
+        """
+        x0, y0 = chunk_x * CHUNK_SIZE, chunk_y * CHUNK_SIZE
+        x1, y1 = x0 + CHUNK_SIZE - 1, y0 + CHUNK_SIZE - 1
+        rooms = RoomModel.get_rooms_in_region(self.connection, x0 - 1, y0 - 1, x1 + 1, y1 + 1)
+        occupied = {(room.x_coordinate, room.y_coordinate) for room in rooms}
+        cells = []
+        for y in range(y0, y1 + 1):
+            for x in range(x0, x1 + 1):
+                if (x, y) in occupied:
+                    continue
+                if adjacent_only and not any((x + dx, y + dy) in occupied for dx, dy in DIRECTION_OFFSETS.values()):
+                    continue
+                cells.append((x, y))
+        return cells
+
+    async def generate_frontier(self, cells, use_cache: bool = True, priority: int = PREFETCH,
+                                batch_size: int = None) -> dict:
+        """
+        Generate rooms for many cells with a few compact prompts instead of one prompt per step.
+
+        Cells are grouped into square-ish batches; each batch is one LLM call that gets the instructions
+        once, the known rooms around the batch as context, and the list of cells to fill, and returns one
+        room per cell. Cells that already hold a room, or that another frontier batch or connected-room
+        generation is producing, are skipped.
+
+        :param cells: ``(x, y)`` cells to fill, e.g. from frontier_cells.
+        :param batch_size: Cells per call (default FRONTIER_BATCH_SIZE, 16).
+        :return: A report: cells requested, skipped as duplicates, generated, saved, calls made, the
+            tokens they took, and tokens and cost per saved room.
+        """
+        batch_size = batch_size or int(os.getenv("FRONTIER_BATCH_SIZE", "16"))
+        requested = list(dict.fromkeys((int(x), int(y)) for x, y in cells))
+        claimed = await self._claim_frontier(requested)
+        report = {"requested": len(requested), "deduplicated": len(requested) - len(claimed), "calls": 0,
+                  "cached_calls": 0, "failed_calls": 0, "generated": 0, "saved": 0,
+                  "prompt_tokens": 0, "completion_tokens": 0}
+        try:
+            # Blocks of 4 x 4 cells keep each batch compact, so neighbors share the same context.
+            claimed.sort(key=lambda cell: (cell[1] >> 2, cell[0] >> 2, cell[1], cell[0]))
+            batches = [claimed[i:i + batch_size] for i in range(0, len(claimed), batch_size)]
+            results = await asyncio.gather(
+                *(self._generate_frontier_batch(batch, use_cache, priority) for batch in batches),
+                return_exceptions=True,
+            )
+        finally:
+            frontier_claims.difference_update(claimed)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error while generating frontier rooms: {str(result)}")
+                report["failed_calls"] += 1
+                continue
+            usage, generated, saved = result
+            report["calls"] += 1
+            report["cached_calls"] += usage["cached"]
+            report["prompt_tokens"] += usage["prompt_tokens"]
+            report["completion_tokens"] += usage["completion_tokens"]
+            report["generated"] += generated
+            report["saved"] += saved
+        tokens = report["prompt_tokens"] + report["completion_tokens"]
+        report["cost"] = completion_cost(report)
+        report["tokens_per_room"] = tokens / report["saved"] if report["saved"] else 0.0
+        report["cost_per_room"] = report["cost"] / report["saved"] if report["saved"] else 0.0
+        return report
+
+    async def _claim_frontier(self, cells: list) -> list:
+        """Claim the cells no room, frontier batch or connected-room generation already covers."""
+        # Claimed before reading which cells hold rooms, so a concurrent request cannot claim them meanwhile.
+        claimed = [(x, y) for x, y in cells
+                   if (x, y) not in frontier_claims and not room_generations.in_flight(cell_flight(x, y))]
+        frontier_claims.update(claimed)
+        try:
+            existing = await run_in_db_executor(RoomModel.get_room_ids_by_coordinates, self.connection, claimed)
+        except BaseException:
+            frontier_claims.difference_update(claimed)
+            raise
+        frontier_claims.difference_update(existing)
+        return [cell for cell in claimed if cell not in existing]
+
+    def _frontier_prompt(self, cells: list, known_rooms: list) -> str:
+        known = "; ".join(
+            f"{room.x_coordinate},{room.y_coordinate} {room.terrain_type or 'unknown'}: {room.name}"
+            for room in known_rooms
+        ) or "none"
+        requested = " ".join(f"{x},{y}" for x, y in cells)
+        return (
+            "Create one location of a grid-based text adventure for each requested cell (x grows east, y north). "
+            "Keep terrain continuous with the known rooms and between neighboring cells, without abrupt changes "
+            "like snow to desert. Descriptions are two or three vivid sentences.\n"
+            f"Known rooms nearby (x,y terrain: name): {known}\n"
+            f"Requested cells (x,y): {requested}\n"
+            'Return JSON: {"rooms": [{"x": 0, "y": 0, "name": "Name", "terrain": "one or two words", '
+            '"description": "Text"}]}'
+        )
+
+    async def _generate_frontier_batch(self, cells: list, use_cache: bool, priority: int) -> tuple:
+        """Generate and save one batch; return ``(usage, rooms generated, rooms saved)``."""
+        xs, ys = [x for x, _ in cells], [y for _, y in cells]
+        around = {(x + dx, y + dy) for x, y in cells for dx, dy in DIRECTION_OFFSETS.values()}
+        region = await run_in_db_executor(RoomModel.get_rooms_in_region, self.connection,
+                                          min(xs) - 1, min(ys) - 1, max(xs) + 1, max(ys) + 1)
+        known_rooms = [room for room in region if (room.x_coordinate, room.y_coordinate) in around]
+        prompt = self._frontier_prompt(cells, known_rooms)
+        logger.info(f"Frontier prompt sent for {len(cells)} cells")
+        answer, usage = await get_gpt_completion(prompt, cache=use_cache, priority=priority)
+
+        # Keep one room per requested cell; anything else the model made up is dropped.
+        wanted, rooms = set(cells), []
+        for room in answer.get("rooms", []) if isinstance(answer, dict) else []:
+            try:
+                cell = (int(room["x"]), int(room["y"]))
+                name, description = room["name"], room["description"]
+            except (KeyError, TypeError, ValueError):
+                logger.warning(f"Skipping malformed frontier room: {room}")
+                continue
+            if cell in wanted:
+                wanted.discard(cell)
+                rooms.append({"name": name, "description": description,
+                              "grid_coordinates": {"x": cell[0], "y": cell[1]}, "terrain_type": room.get("terrain")})
+        if wanted:
+            logger.warning(f"Frontier answer left {len(wanted)} of {len(cells)} cells empty")
+        saved = await run_in_db_executor(self.save_rooms_to_db, rooms)
+        return usage, len(rooms), len(saved)
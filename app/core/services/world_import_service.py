@@ -0,0 +1,114 @@
+import logging
+import time
+
+from app.core.json_stream import LocationStreamParser
+from app.db.models import RoomModel, RoomDetailModel, NeighborRelationModel
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def iter_locations_from_file(path: str, chunk_size: int = READ_CHUNK_SIZE):
+    """
+    Stream location objects out of a ``{"locations": [...]}`` world file.
+
+    :param path: Path to the world JSON file; it is read in ``chunk_size`` pieces.
+    """
+    parser = LocationStreamParser()
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield from parser.feed(chunk)
+            if parser.done:
+                return
+    parser.close()
+
+
+class WorldImportService:
+    def __init__(self, connection, batch_size: int = 1000):
+        self.connection = connection
+        self.batch_size = batch_size
+
+    def import_file(self, path: str) -> dict:
+        """
+        Import a generated world file into rooms, their details and neighbor_relations.
+
+        :param path: Path to a ``{"locations": [...]}`` JSON file of any size.
+        :return: Import statistics (row counts, elapsed seconds and rows per second).
+        """
+        return self.import_locations(iter_locations_from_file(path))
+
+    def import_locations(self, locations) -> dict:
+        """
+        Upsert an iterable of generated locations in batched transactions, then derive neighbors.
+
+        :param locations: Location dicts shaped like the world generator's output.
+        :return: Import statistics (row counts, elapsed seconds and rows per second).
+        """
+        started = time.perf_counter()
+        stats = {"rooms": 0, "features": 0, "ambience": 0, "neighbor_relations": 0}
+        first_room_id = last_room_id = None
+        batch = []
+        for location in locations:
+            batch.append(location)
+            if len(batch) >= self.batch_size:
+                first_room_id, last_room_id = self._import_batch(batch, stats, first_room_id, last_room_id)
+                batch = []
+        if batch:
+            first_room_id, last_room_id = self._import_batch(batch, stats, first_room_id, last_room_id)
+
+        if first_room_id is not None:
+            stats["neighbor_relations"] = self._link_neighbors(first_room_id, last_room_id)
+
+        stats["seconds"] = time.perf_counter() - started
+        total_rows = stats["rooms"] + stats["features"] + stats["ambience"] + stats["neighbor_relations"]
+        stats["rows_per_second"] = total_rows / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        logger.info(f"Imported world: {stats}")
+        return stats
+
+    def _import_batch(self, batch, stats, first_room_id, last_room_id):
+        rooms = []
+        for location in batch:
+            coordinates = location["coords"]
+            rooms.append((
+                location["name"],
+                location.get("description", ""),
+                int(coordinates["x"]),
+                int(coordinates["y"]),
+                location.get("type"),
+            ))
+
+        with self.connection:
+            RoomModel.upsert_rooms(self.connection, rooms)
+            room_ids = RoomModel.get_room_ids_by_coordinates(self.connection, [(room[2], room[3]) for room in rooms])
+            features, ambience = [], []
+            for location, room in zip(batch, rooms):
+                room_id = room_ids[(room[2], room[3])]
+                for feature in location.get("features", []):
+                    features.append((room_id, feature.get("type"), feature.get("description", "")))
+                ambience.extend((room_id, "sound", sound) for sound in location.get("sounds", []))
+                ambience.extend((room_id, "smell", smell) for smell in location.get("smells", []))
+            RoomDetailModel.replace_room_details(self.connection, list(room_ids.values()), features, ambience)
+
+        stats["rooms"] += len(rooms)
+        stats["features"] += len(features)
+        stats["ambience"] += len(ambience)
+        logger.info(f"Imported {stats['rooms']} rooms so far")
+        batch_first, batch_last = min(room_ids.values()), max(room_ids.values())
+        if first_room_id is None:
+            return batch_first, batch_last
+        return min(first_room_id, batch_first), max(last_room_id, batch_last)
+
+    def _link_neighbors(self, first_room_id, last_room_id) -> int:
+        """Link every imported room to its grid neighbors in one pass over bounded id ranges."""
+        linked = 0
+        step = self.batch_size * 10
+        for start in range(first_room_id, last_room_id + 1, step):
+            with self.connection:
+                linked += NeighborRelationModel.link_grid_neighbors(
+                    self.connection, start, min(start + step - 1, last_room_id)
+                )
+        return linked
@@ -0,0 +1,46 @@
+# app/core/single_flight.py
+#
+# Coalesces concurrent work on the same key: the first caller starts it, later callers arriving
+# while it runs await the same result (or exception), and the key is released as soon as it
+# finishes. Used so that players converging on one unexplored cell cause one generation.
+
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self):
+        self.executions = 0
+        self.coalesced = 0
+        self._flights = {}
+
+    async def run(self, key, fn):
+        """
+        Return the result of ``await fn()``, sharing the call already in flight for ``key`` if any.
+
+        The call runs as its own task, so a caller that is cancelled does not cancel it for the others.
+        """
+        task = self._flights.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _release(self, key, task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+
+    def in_flight(self, key) -> bool:
+        return key in self._flights
+
+    def stats(self) -> dict:
+        calls = self.executions + self.coalesced
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": self.coalesced / calls if calls else 0.0,
+            "in_flight": len(self._flights),
+        }
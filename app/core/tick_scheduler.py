@@ -0,0 +1,201 @@
+# app/core/tick_scheduler.py
+#
+# Fixed-tick simulation loop. Actions submitted by request handlers are queued; every tick drains
+# the queue, orders the actions deterministically and applies them through BatchHandler in one
+# transaction, then resolves each handler's future with its action's result.
+
+import asyncio
+import logging
+import os
+import time
+import zlib
+from collections import deque
+
+from app.core.batch_handler import BatchHandler, CONTINUE
+from app.db.async_repository import run_in_db_executor
+
+logger = logging.getLogger(__name__)
+
+
+class TickQueueFull(Exception):
+    """Raised by submit() when max_pending actions are already waiting for a tick."""
+
+
+class TickStats:
+    def __init__(self):
+        self.ticks = 0
+        self.actions = 0
+        self.overruns = 0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.last_queue_depth = 0
+        self.max_queue_depth = 0
+
+    def record(self, duration: float, queue_depth: int, actions: int, interval: float):
+        self.ticks += 1
+        self.actions += actions
+        self.last_duration = duration
+        self.max_duration = max(self.max_duration, duration)
+        self.total_duration += duration
+        self.last_queue_depth = queue_depth
+        self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+        if duration > interval:
+            self.overruns += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "actions": self.actions,
+            "overruns": self.overruns,
+            "last_duration_ms": self.last_duration * 1000,
+            "mean_duration_ms": self.total_duration / self.ticks * 1000 if self.ticks else 0.0,
+            "max_duration_ms": self.max_duration * 1000,
+            "last_queue_depth": self.last_queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+def tick_order(tick: int, player_name: str) -> int:
+    """
+    Rank of a player's actions within a tick.
+
+    Independent of arrival order, so contested actions (two players grabbing the same item) resolve
+    the same way given the same tick, and the winner varies from tick to tick rather than always
+    favouring the same player.
+    """
+    return zlib.crc32(f"{tick}:{player_name}".encode())
+
+
+class TickScheduler:
+    def __init__(self, connection, tick_rate: float = 20.0, max_actions_per_tick: int = 1000,
+                 max_pending: int = 10000, batch_handler: BatchHandler = None):
+        """
+        :param tick_rate: Ticks per second.
+        :param max_actions_per_tick: Actions applied per tick; the rest wait for the next one.
+        :param max_pending: Queued actions beyond which submit() raises TickQueueFull.
+        """
+        self.connection = connection
+        self.interval = 1.0 / tick_rate
+        self.max_actions_per_tick = max_actions_per_tick
+        self.max_pending = max_pending
+        self.batch_handler = batch_handler or BatchHandler()
+        self.stats = TickStats()
+        self.tick = 0
+        self._pending = deque()
+        self._task = None
+        self._stopping = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def submit(self, action: dict) -> asyncio.Future:
+        """
+        Queue an action (in the form BatchHandler.run takes) for the next tick.
+
+        :return: A future resolved with the action's result once its tick has committed.
+        :raises TickQueueFull: If max_pending actions are already queued.
+        """
+        if len(self._pending) >= self.max_pending:
+            raise TickQueueFull(f"{len(self._pending)} actions are already waiting.")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((action, future))
+        return future
+
+    def start(self):
+        self._stopping = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="game-tick")
+        return self
+
+    async def stop(self):
+        """Stop ticking after applying everything already queued."""
+        if self._task is None:
+            return
+        # Let the current tick finish rather than cancelling it with its futures unresolved.
+        self._stopping.set()
+        await self._task
+        self._task = None
+        while self._pending:
+            await self.run_tick()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while not self._stopping.is_set():
+            await self.run_tick()
+            next_tick += self.interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                # Overran: start the next tick now rather than bursting to catch up.
+                next_tick = loop.time()
+                delay = 0
+            try:
+                await asyncio.wait_for(self._stopping.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_tick(self):
+        """Apply up to max_actions_per_tick queued actions in one transaction."""
+        queue_depth = len(self._pending)
+        batch = [self._pending.popleft() for _ in range(min(queue_depth, self.max_actions_per_tick))]
+        # Handlers that gave up waiting (client disconnected) no longer need their action applied.
+        batch = [(action, future) for action, future in batch if not future.cancelled()]
+        tick = self.tick
+        self.tick += 1
+        if not batch:
+            return
+        started = time.perf_counter()
+        # Sorting is stable, so each player's own actions keep their submission order.
+        batch.sort(key=lambda entry: tick_order(tick, entry[0]["player_name"]))
+        try:
+            outcome = await run_in_db_executor(
+                self.batch_handler.run, self.connection, [action for action, _ in batch], CONTINUE
+            )
+        except Exception as e:
+            logger.exception(f"Tick {tick} failed; rejecting its {len(batch)} actions")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, outcome["results"]):
+            if not future.done():
+                future.set_result(result)
+        duration = time.perf_counter() - started
+        self.stats.record(duration, queue_depth, len(batch), self.interval)
+        logger.debug(f"Tick {tick}: {len(batch)} actions in {duration * 1000:.1f} ms, {queue_depth} queued")
+
+
+_scheduler = None
+
+
+def get_tick_scheduler():
+    """Return the running tick scheduler, or None when actions are applied per request."""
+    return _scheduler
+
+
+async def start_tick_scheduler(connection, tick_rate: float = None) -> TickScheduler:
+    """
+    Start applying submitted actions on a fixed tick.
+
+    :param tick_rate: Ticks per second (GAME_TICK_RATE).
+    """
+    global _scheduler
+    if tick_rate is None:
+        tick_rate = float(os.getenv("GAME_TICK_RATE", "20"))
+    await stop_tick_scheduler()
+    _scheduler = TickScheduler(
+        connection,
+        tick_rate=tick_rate,
+        max_actions_per_tick=int(os.getenv("GAME_TICK_MAX_ACTIONS", "1000")),
+        max_pending=int(os.getenv("GAME_TICK_MAX_PENDING", "10000")),
+    ).start()
+    return _scheduler
+
+
+async def stop_tick_scheduler():
+    """Apply any queued actions and go back to applying actions per request."""
+    global _scheduler
+    scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        await scheduler.stop()
@@ -0,0 +1,127 @@
+# app/db/async_repository.py
+#
+# Awaitable wrappers around the synchronous models. Every call runs on a bounded, dedicated
+# thread pool so a slow query only occupies one worker instead of blocking the event loop.
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.db.models import PlayerModel, RoomModel, InventoryModel, NeighborRelationModel
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Return the process-wide executor for database work (size set by DB_EXECUTOR_WORKERS)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("DB_EXECUTOR_WORKERS", "8")),
+                    thread_name_prefix="db-query",
+                )
+    return _executor
+
+
+def shutdown_db_executor():
+    """Wait for in-flight queries and release the executor threads."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def run_in_db_executor(fn, *args, **kwargs):
+    """Run a blocking database callable on the database executor and await its result."""
+    loop = asyncio.get_running_loop()
+    # Carry the caller's context (such as the request's player scope) over to the worker thread.
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(context.run, fn, *args, **kwargs))
+
+
+class AsyncRepository:
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def run(self, fn, *args, **kwargs):
+        """Await ``fn(connection, *args, **kwargs)`` executed off the event loop."""
+        return await run_in_db_executor(fn, self.connection, *args, **kwargs)
+
+
+class AsyncPlayerRepository(AsyncRepository):
+    async def create_player(self, name: str, current_room: str = "start"):
+        """Insert a new player into the database."""
+        return await self.run(PlayerModel.create_player, name, current_room)
+
+    async def get_player_by_name(self, name: str):
+        """Retrieve a player by name."""
+        return await self.run(PlayerModel.get_player_by_name, name)
+
+    async def update_player_location(self, player_name: str, new_room: str):
+        """Update a player's current room."""
+        return await self.run(PlayerModel.update_player_location, player_name, new_room)
+
+
+class AsyncRoomRepository(AsyncRepository):
+    async def create_room(self, name: str, description: str, x_coordinate: int, y_coordinate: int):
+        """Insert a new room into the database."""
+        return await self.run(RoomModel.create_room, name, description, x_coordinate, y_coordinate)
+
+    async def get_room_by_coordinates(self, coordinates: dict):
+        """Retrieve a room by its coordinates."""
+        return await self.run(RoomModel.get_room_by_coordinates, coordinates)
+
+    async def get_room_by_name(self, name: str):
+        """Retrieve a room by its name."""
+        return await self.run(RoomModel.get_room_by_name, name)
+
+
+class AsyncInventoryRepository(AsyncRepository):
+    async def transfer(self, source: tuple, target: tuple, item_name: str, quantity: int = 1) -> bool:
+        """Move units of an item between two ``(holder_kind, holder_id)`` holders in one transaction."""
+        return await self.run(InventoryModel.transfer, source, target, item_name, quantity)
+
+    async def add_item_to_room(self, room_name: str, item_name: str, quantity: int = 1):
+        """Add an item to a room."""
+        return await self.run(InventoryModel.add_item_to_room, room_name, item_name, quantity)
+
+    async def add_item_to_player(self, player_name: str, item_name: str, quantity: int = 1):
+        """Add an item to a player's inventory."""
+        return await self.run(InventoryModel.add_item_to_player, player_name, item_name, quantity)
+
+    async def remove_item_from_room(self, room_name: str, item_name: str, quantity: int = 1):
+        """Remove an item from a room."""
+        return await self.run(InventoryModel.remove_item_from_room, room_name, item_name, quantity)
+
+    async def remove_item_from_player(self, player_name: str, item_name: str, quantity: int = 1):
+        """Remove an item from a player's inventory."""
+        return await self.run(InventoryModel.remove_item_from_player, player_name, item_name, quantity)
+
+    async def is_item_in_room(self, room_name: str, item_name: str) -> bool:
+        """Check if an item is in the room."""
+        return await self.run(InventoryModel.is_item_in_room, room_name, item_name)
+
+    async def is_item_with_player(self, player_name: str, item_name: str) -> bool:
+        """Check if an item is with the player."""
+        return await self.run(InventoryModel.is_item_with_player, player_name, item_name)
+
+    async def get_player_inventory(self, player_name: str):
+        """Get all items in a player's inventory."""
+        return await self.run(InventoryModel.get_player_inventory, player_name)
+
+
+class AsyncNeighborRelationRepository(AsyncRepository):
+    async def add_neighbor_relation(self, room_id: int, neighbor_room_id: int, direction: str):
+        """Create a relation between two neighboring rooms with a direction."""
+        return await self.run(NeighborRelationModel.add_neighbor_relation, room_id, neighbor_room_id, direction)
+
+    async def get_neighbors_with_coordinates(self, room_id: int):
+        """Retrieve all neighboring rooms with coordinates for a specific room."""
+        return await self.run(NeighborRelationModel.get_neighbors_with_coordinates, room_id)
@@ -0,0 +1,18 @@
+# app/db/caches.py
+#
+# Registry of in-process caches derived from database contents. Anything that rebuilds or
+# swaps the database underneath the process (tests, restores, bulk resets) calls clear_caches().
+
+_caches = []
+
+
+def register_cache(cache):
+    """Register an object with a ``clear()`` method; returns it for use as a module-level instance."""
+    _caches.append(cache)
+    return cache
+
+
+def clear_caches():
+    """Drop every registered in-process cache."""
+    for cache in _caches:
+        cache.clear()
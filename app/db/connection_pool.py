@@ -0,0 +1,350 @@
+# app/db/connection_pool.py
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE = "singleton_dungeon_crawler.db"
+
+# Statements that never modify the database and can be served by a read-only connection.
+READ_STATEMENTS = ("SELECT", "WITH", "EXPLAIN")
+
+_COMMIT = object()
+_ROLLBACK = object()
+
+
+class QueryResult:
+    """
+    Rows produced by a statement, fully fetched so they can safely cross threads.
+
+    Mirrors the parts of ``sqlite3.Cursor`` the models rely on.
+    """
+
+    __slots__ = ("_rows", "_position", "lastrowid", "rowcount")
+
+    def __init__(self, rows, lastrowid=None, rowcount=-1):
+        self._rows = rows
+        self._position = 0
+        self.lastrowid = lastrowid
+        self.rowcount = rowcount
+
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        row = self._rows[self._position]
+        self._position += 1
+        return row
+
+    def fetchall(self):
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+
+def after_commit(connection, callback):
+    """
+    Call ``callback()`` once ``connection``'s current transaction commits (see PooledConnection.after_commit).
+
+    Plain sqlite3 connections have no commit hooks; the callback runs right away.
+    """
+    hook = getattr(connection, "after_commit", None)
+    if hook is None:
+        callback()
+    else:
+        hook(callback)
+
+
+def _is_read_statement(sql: str) -> bool:
+    words = sql.lstrip().split(None, 1)
+    return bool(words) and words[0].upper() in READ_STATEMENTS
+
+
+def _run_statement(connection, sql, parameters, many=False) -> QueryResult:
+    if many:
+        cursor = connection.executemany(sql, parameters)
+    else:
+        cursor = connection.execute(sql, parameters)
+    rows = cursor.fetchall()
+    return QueryResult(rows, cursor.lastrowid, cursor.rowcount)
+
+
+class _WriterThread(threading.Thread):
+    """Owns the single writer connection and runs queued write jobs in FIFO order."""
+
+    def __init__(self, connection):
+        super().__init__(name="db-writer", daemon=True)
+        self.connection = connection
+        self.jobs = queue.Queue()
+
+    def submit(self, fn) -> Future:
+        future = Future()
+        self.jobs.put((fn, future))
+        return future
+
+    def stop(self):
+        self.jobs.put(None)
+        self.join()
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            fn, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(self.connection))
+            except BaseException as e:
+                future.set_exception(e)
+        self.connection.close()
+
+
+def _serve_transaction(channel, connection, after_commit, begun):
+    """
+    Runs on the writer thread: execute statements sent through ``channel`` inside one
+    transaction until the owning caller commits or rolls back.
+
+    ``begun`` resolves once BEGIN IMMEDIATE succeeds, or fails with its error, so the caller
+    learns about a locked database before it sends any statement.
+    The ``after_commit`` callbacks run here, right after COMMIT, so they observe commits in order.
+    """
+    try:
+        connection.execute("BEGIN IMMEDIATE;")
+    except BaseException as e:
+        begun.set_exception(e)
+        raise
+    begun.set_result(None)
+    try:
+        while True:
+            item = channel.get()
+            if item is _COMMIT:
+                connection.execute("COMMIT;")
+                for callback in after_commit:
+                    try:
+                        callback()
+                    except Exception:
+                        logger.exception("After-commit callback failed")
+                return
+            if item is _ROLLBACK:
+                connection.execute("ROLLBACK;")
+                return
+            sql, parameters, many, future = item
+            try:
+                future.set_result(_run_statement(connection, sql, parameters, many))
+            except Exception as e:
+                future.set_exception(e)
+    except BaseException:
+        if connection.in_transaction:
+            connection.execute("ROLLBACK;")
+        raise
+
+
+class PooledConnection:
+    """
+    Connection-like facade handed to the models and routers.
+
+    Reads are served by the read-only pool, writes are queued for the writer connection
+    and committed immediately. ``with connection:`` opens a write transaction: every
+    statement issued by the same thread inside the block runs on the writer connection
+    and is committed (or rolled back on error) as a unit.
+    """
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._local = threading.local()
+
+    @property
+    def in_transaction(self) -> bool:
+        return getattr(self._local, "depth", 0) > 0
+
+    def execute(self, sql: str, parameters=()):
+        return self._dispatch(sql, parameters, many=False)
+
+    def executemany(self, sql: str, seq_of_parameters):
+        return self._dispatch(sql, list(seq_of_parameters), many=True)
+
+    def commit(self):
+        """Writes are committed as they are applied; kept for sqlite3 API compatibility."""
+
+    def after_commit(self, callback):
+        """
+        Call ``callback()`` once the current transaction has committed, or right away outside one.
+
+        Callbacks run on the writer thread in commit order and are dropped on rollback, which lets
+        caches write committed values through without racing other writers.
+        """
+        if self.in_transaction:
+            self._local.after_commit.append(callback)
+        else:
+            callback()
+
+    def _dispatch(self, sql, parameters, many):
+        if self.in_transaction:
+            future = Future()
+            self._local.channel.put((sql, parameters, many, future))
+            return future.result()
+        if not many and _is_read_statement(sql):
+            return self._pool.read(lambda connection: _run_statement(connection, sql, parameters))
+        return self._pool.write(lambda connection: self._autocommit(connection, sql, parameters, many))
+
+    @staticmethod
+    def _autocommit(connection, sql, parameters, many):
+        if not many:
+            return _run_statement(connection, sql, parameters)
+        # Group-commit a batch of statements in a single transaction.
+        with connection:
+            connection.execute("BEGIN;")
+            return _run_statement(connection, sql, parameters, many=True)
+
+    def __enter__(self):
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            channel = queue.Queue()
+            after_commit = []
+            begun = Future()
+            transaction = self._pool.submit_write(
+                lambda connection: _serve_transaction(channel, connection, after_commit, begun)
+            )
+            # Raise BEGIN's error here rather than leave the first statement waiting on a dead channel.
+            wait((begun, transaction), return_when=FIRST_COMPLETED)
+            if not begun.done():
+                transaction.result()
+            begun.result()
+            self._local.channel = channel
+            self._local.after_commit = after_commit
+            self._local.transaction = transaction
+        self._local.depth = depth + 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            self._local.channel.put(_ROLLBACK if exc_type else _COMMIT)
+            transaction = self._local.transaction
+            self._local.channel = None
+            self._local.after_commit = None
+            self._local.transaction = None
+            transaction.result()
+        return False
+
+
+class ConnectionPool:
+    """
+    WAL-mode SQLite connection manager: a pool of read-only connections for concurrent
+    readers and one writer connection fed through a FIFO queue.
+    """
+
+    def __init__(
+        self,
+        database: str = DEFAULT_DATABASE,
+        read_connections: int = 4,
+        synchronous: str = "NORMAL",
+        cache_size: int = -16000,
+        mmap_size: int = 268435456,
+        busy_timeout: int = 5000,
+    ):
+        if database == ":memory:":
+            raise ValueError("ConnectionPool needs a database file; ':memory:' cannot be shared.")
+        self.database = str(Path(database).absolute())
+        self.synchronous = synchronous
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.busy_timeout = busy_timeout
+
+        writer_connection = self._open(self.database)
+        writer_connection.execute("PRAGMA journal_mode = WAL;")
+        writer_connection.execute(f"PRAGMA synchronous = {synchronous};")
+        self._writer = _WriterThread(writer_connection)
+        self._writer.start()
+
+        self._readers = queue.LifoQueue()
+        for _ in range(read_connections):
+            reader = self._open(f"{Path(self.database).as_uri()}?mode=ro", uri=True)
+            reader.execute("PRAGMA query_only = ON;")
+            self._readers.put(reader)
+        self.read_connections = read_connections
+        self.connection = PooledConnection(self)
+        self._closed = False
+        logger.info(f"Opened connection pool on {self.database} with {read_connections} readers")
+
+    @classmethod
+    def from_env(cls):
+        """Build a pool configured through DB_* environment variables."""
+        return cls(
+            database=os.getenv("DB_PATH", DEFAULT_DATABASE),
+            read_connections=int(os.getenv("DB_READ_CONNECTIONS", "4")),
+            synchronous=os.getenv("DB_SYNCHRONOUS", "NORMAL"),
+            cache_size=int(os.getenv("DB_CACHE_SIZE", "-16000")),
+            mmap_size=int(os.getenv("DB_MMAP_SIZE", "268435456")),
+            busy_timeout=int(os.getenv("DB_BUSY_TIMEOUT", "5000")),
+        )
+
+    def _open(self, database, uri=False):
+        connection = sqlite3.connect(database, uri=uri, check_same_thread=False, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)};")
+        connection.execute(f"PRAGMA cache_size = {int(self.cache_size)};")
+        connection.execute(f"PRAGMA mmap_size = {int(self.mmap_size)};")
+        return connection
+
+    def read(self, fn):
+        """Run ``fn(connection)`` on a borrowed read-only connection."""
+        reader = self._readers.get()
+        try:
+            return fn(reader)
+        finally:
+            self._readers.put(reader)
+
+    def submit_write(self, fn) -> Future:
+        """Queue ``fn(connection)`` for the writer connection."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed.")
+        return self._writer.submit(fn)
+
+    def write(self, fn):
+        """Run ``fn(connection)`` on the writer connection and wait for its result."""
+        if threading.current_thread() is self._writer:
+            return fn(self._writer.connection)
+        return self.submit_write(fn).result()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._writer.stop()
+        for _ in range(self.read_connections):
+            self._readers.get().close()
+        logger.info(f"Closed connection pool on {self.database}")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool.from_env()
+    return _pool
+
+
+def close_pool():
+    """Close the process-wide pool; the next ``get_pool`` call opens a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
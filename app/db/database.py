@@ -1,34 +1,60 @@
-# Updated to use the singleton pattern with unique constraint on room coordinates
+# Connections come from a WAL-mode pool: concurrent read-only connections plus one queued writer.
 
-from app.db.singleton_db import get_singleton_db_connection
+import os
+
+from app.db.connection_pool import get_pool
+from app.db.migrations import migrate
+from app.db.models import PlayerModel, RoomModel
+from app.db.write_behind import WriteBehindBuffer, get_location_buffer, set_location_buffer
+
+
+def get_db_connection():
+    """Return the shared pooled connection used by models and routers."""
+    return get_pool().connection
 
 
 def get_connection():
-    connection = get_singleton_db_connection()
+    connection = get_db_connection()
     try:
         yield connection
     finally:
-        # Do not close the singleton connection here, it should be shared.
+        # The pooled connection is shared; borrowed reader/writer connections are returned per statement.
         pass
 
 
 def init_db():
-    connection = get_singleton_db_connection()
-    with connection:
-        connection.execute("""
-            CREATE TABLE IF NOT EXISTS players (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                current_room TEXT NOT NULL
-            );
-        """)
-        connection.execute("""
-            CREATE TABLE IF NOT EXISTS rooms (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                description TEXT NOT NULL,
-                x_coordinate INTEGER NOT NULL,
-                y_coordinate INTEGER NOT NULL,
-                UNIQUE (x_coordinate, y_coordinate)  -- Adding unique constraint for coordinates
-            );
-        """)
+    """Bring the database schema up to date and make sure new players have a room to start in."""
+    connection = get_db_connection()
+    migrate(connection)
+    RoomModel.ensure_start_room(connection)
+
+
+def enable_location_write_behind(max_pending: int = None, flush_interval: float = None):
+    """
+    Buffer player location updates and write them in batches.
+
+    :param max_pending: Buffered players that trigger an early flush (PLAYER_LOCATION_MAX_PENDING).
+    :param flush_interval: Durability window in seconds (PLAYER_LOCATION_FLUSH_INTERVAL).
+    :return: The started buffer.
+    """
+    if max_pending is None:
+        max_pending = int(os.getenv("PLAYER_LOCATION_MAX_PENDING", "500"))
+    if flush_interval is None:
+        flush_interval = float(os.getenv("PLAYER_LOCATION_FLUSH_INTERVAL", "0.5"))
+    disable_location_write_behind()
+    connection = get_db_connection()
+    buffer = WriteBehindBuffer(
+        lambda locations: PlayerModel.update_player_locations(connection, locations),
+        max_pending=max_pending,
+        flush_interval=flush_interval,
+    )
+    set_location_buffer(buffer.start())
+    return buffer
+
+
+def disable_location_write_behind():
+    """Flush any buffered locations and go back to write-through updates."""
+    buffer = get_location_buffer()
+    if buffer is not None:
+        set_location_buffer(None)
+        buffer.stop()
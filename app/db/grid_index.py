@@ -0,0 +1,147 @@
+# app/db/grid_index.py
+#
+# NumPy index of the room grid: one CHUNK_SIZE x CHUNK_SIZE int32 array of room ids (0 = no room)
+# per chunk that holds a room, so memory follows the explored cells however far apart they are.
+# Synced incrementally from the rooms table; room writers mark it stale once they commit.
+
+import threading
+
+import numpy as np
+
+from app.core.grid import CHUNK_SHIFT, CHUNK_SIZE, DIRECTION_OFFSETS, DIRECTIONS
+from app.db.caches import register_cache
+
+EMPTY = 0
+
+_CELL_MASK = CHUNK_SIZE - 1
+_NEIGHBOR_DX = np.array([DIRECTION_OFFSETS[direction][0] for direction in DIRECTIONS])
+_NEIGHBOR_DY = np.array([DIRECTION_OFFSETS[direction][1] for direction in DIRECTIONS])
+_OFFSETS = [DIRECTION_OFFSETS[direction] for direction in DIRECTIONS]
+
+
+class GridIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            # {(chunk_x, chunk_y): ids}: ids[x & _CELL_MASK, y & _CELL_MASK] holds the room id at (x, y).
+            # Cells only ever go from EMPTY to an id, so readers can use the arrays while sync fills them.
+            self._chunks = {}
+            self._last_room_id = 0
+            self._stale = True
+
+    def mark_stale(self):
+        """Note that rooms were added; the next query picks them up."""
+        self._stale = True
+
+    @property
+    def bounds(self):
+        """Return the ``(x0, y0, x1, y1)`` cells spanned by the indexed chunks (inclusive), or None when empty."""
+        chunks = list(self._chunks)
+        if not chunks:
+            return None
+        chunk_xs, chunk_ys = [chunk[0] for chunk in chunks], [chunk[1] for chunk in chunks]
+        return (min(chunk_xs) * CHUNK_SIZE, min(chunk_ys) * CHUNK_SIZE,
+                max(chunk_xs) * CHUNK_SIZE + _CELL_MASK, max(chunk_ys) * CHUNK_SIZE + _CELL_MASK)
+
+    @property
+    def chunk_count(self) -> int:
+        """Number of chunks holding at least one room, i.e. arrays allocated."""
+        return len(self._chunks)
+
+    def sync(self, connection) -> int:
+        """Load rooms created since the last sync; returns how many were added."""
+        with self._lock:
+            self._stale = False
+            rows = connection.execute("""
+                SELECT id, x_coordinate, y_coordinate FROM rooms WHERE id > ? ORDER BY id;
+            """, (self._last_room_id,)).fetchall()
+            if not rows:
+                return 0
+            rooms = np.array(rows, dtype=np.int64)
+            ids, xs, ys = rooms[:, 0], rooms[:, 1], rooms[:, 2]
+            chunk_xs, chunk_ys = xs >> CHUNK_SHIFT, ys >> CHUNK_SHIFT
+            # Sort by chunk so each chunk's rooms are one contiguous run, written with one assignment.
+            order = np.lexsort((chunk_ys, chunk_xs))
+            chunk_xs, chunk_ys = chunk_xs[order], chunk_ys[order]
+            cell_xs, cell_ys, ids_sorted = xs[order] & _CELL_MASK, ys[order] & _CELL_MASK, ids[order]
+            starts = np.flatnonzero((np.diff(chunk_xs) != 0) | (np.diff(chunk_ys) != 0)) + 1
+            for begin, end in zip(np.concatenate(([0], starts)), np.concatenate((starts, [len(order)]))):
+                chunk = (int(chunk_xs[begin]), int(chunk_ys[begin]))
+                grid = self._chunks.get(chunk)
+                if grid is None:
+                    grid = self._chunks[chunk] = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=np.int32)
+                grid[cell_xs[begin:end], cell_ys[begin:end]] = ids_sorted[begin:end]
+            self._last_room_id = int(ids[-1])
+            return len(rows)
+
+    def _current(self, connection):
+        # Rooms written by an open transaction are picked up once it has committed.
+        if self._stale and not connection.in_transaction:
+            self.sync(connection)
+        return self._chunks
+
+    def room_ids_at(self, connection, xs, ys) -> np.ndarray:
+        """Vectorized lookup: the room id at each ``(xs[i], ys[i])``, EMPTY where there is no room."""
+        chunks = self._current(connection)
+        xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64))
+        result = np.zeros(xs.shape, dtype=np.int32)
+        if xs.ndim == 0:
+            grid = chunks.get((int(xs) >> CHUNK_SHIFT, int(ys) >> CHUNK_SHIFT))
+            return result if grid is None else np.int32(grid[int(xs) & _CELL_MASK, int(ys) & _CELL_MASK])
+        chunk_keys = np.stack((xs >> CHUNK_SHIFT, ys >> CHUNK_SHIFT), axis=-1).reshape(-1, 2)
+        unique, inverse = np.unique(chunk_keys, axis=0, return_inverse=True)
+        flat_xs, flat_ys, flat = xs.reshape(-1), ys.reshape(-1), result.reshape(-1)
+        for position, (chunk_x, chunk_y) in enumerate(unique.tolist()):
+            grid = chunks.get((chunk_x, chunk_y))
+            if grid is not None:
+                inside = inverse.reshape(-1) == position
+                flat[inside] = grid[flat_xs[inside] & _CELL_MASK, flat_ys[inside] & _CELL_MASK]
+        return result
+
+    def room_id_at(self, connection, x: int, y: int):
+        """Return the id of the room at ``(x, y)``, or None."""
+        room_id = int(self.room_ids_at(connection, x, y))
+        return room_id or None
+
+    def neighbor_ids(self, connection, x: int, y: int) -> np.ndarray:
+        """Return the room ids of the eight cells around ``(x, y)`` in direction-code order (EMPTY if none)."""
+        block = self.region(connection, x - 1, y - 1, x + 1, y + 1)
+        return block[_NEIGHBOR_DX + 1, _NEIGHBOR_DY + 1]
+
+    def existing_neighbors(self, connection, x: int, y: int) -> dict:
+        """Return ``{direction: (x, y)}`` for every one of the eight surrounding cells that holds a room."""
+        neighbor_ids = self.neighbor_ids(connection, x, y).tolist()
+        return {
+            direction: (x + dx, y + dy)
+            for direction, (dx, dy), room_id in zip(DIRECTIONS, _OFFSETS, neighbor_ids) if room_id != EMPTY
+        }
+
+    def region(self, connection, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Return the room ids of a rectangle (edges included) as an array indexed ``[x - x0, y - y0]``."""
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        chunks = self._current(connection)
+        result = np.zeros((x1 - x0 + 1, y1 - y0 + 1), dtype=np.int32)
+        # Copy the part of each indexed chunk that overlaps the rectangle; the rest stays EMPTY.
+        for chunk_y in range(y0 >> CHUNK_SHIFT, (y1 >> CHUNK_SHIFT) + 1):
+            for chunk_x in range(x0 >> CHUNK_SHIFT, (x1 >> CHUNK_SHIFT) + 1):
+                grid = chunks.get((chunk_x, chunk_y))
+                if grid is None:
+                    continue
+                origin_x, origin_y = chunk_x * CHUNK_SIZE, chunk_y * CHUNK_SIZE
+                from_x, from_y = max(x0, origin_x), max(y0, origin_y)
+                to_x, to_y = min(x1, origin_x + _CELL_MASK) + 1, min(y1, origin_y + _CELL_MASK) + 1
+                result[from_x - x0:to_x - x0, from_y - y0:to_y - y0] = \
+                    grid[from_x - origin_x:to_x - origin_x, from_y - origin_y:to_y - origin_y]
+        return result
+
+    def unexplored_in_region(self, connection, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Return the ``(x, y)`` cells of a rectangle that have no room yet, as an ``(n, 2)`` array."""
+        cells = np.argwhere(self.region(connection, x0, y0, x1, y1) == EMPTY)
+        return cells + (min(x0, x1), min(y0, y1))
+
+
+grid_index = register_cache(GridIndex())
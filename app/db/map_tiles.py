@@ -0,0 +1,108 @@
+# app/db/map_tiles.py
+#
+# Pre-rendered map tiles: per chunk, CHUNK_SIZE x CHUNK_SIZE arrays of terrain codes and room ids
+# plus the names of the chunk's rooms. Each tile is rendered from the chunk's rooms in the chunk
+# cache and remembers which cached tuple it came from, so a chunk invalidated by a room write (or
+# evicted) is re-rendered on its next use with no invalidation hooks of its own.
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.core.grid import CHUNK_SHIFT, CHUNK_SIZE
+from app.db.caches import register_cache
+
+NO_ROOM = 0
+
+
+class TerrainCodes:
+    """Interns terrain type names as small integer codes (0 = no room), stable for the process's lifetime."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._codes = {}
+        self.names = [None]
+
+    def code(self, terrain_type) -> int:
+        terrain_type = terrain_type or "unknown"
+        code = self._codes.get(terrain_type)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(terrain_type)
+                if code is None:
+                    code = self._codes[terrain_type] = len(self.names)
+                    self.names.append(terrain_type)
+        return code
+
+    def legend(self, codes) -> dict:
+        """Return ``{code: terrain type}`` for the given codes, leaving out NO_ROOM."""
+        return {int(code): self.names[code] for code in codes if code != NO_ROOM}
+
+
+terrain_codes = TerrainCodes()
+
+
+class MapTile:
+    __slots__ = ("rooms", "terrain", "room_ids", "names")
+
+    def __init__(self, chunk: tuple, rooms: tuple):
+        """
+        :param rooms: The chunk's RoomTile records, as cached by the chunk cache.
+        """
+        self.rooms = rooms
+        # Indexed [x - chunk origin x, y - chunk origin y], like the grid index.
+        self.terrain = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=np.uint16)
+        self.room_ids = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=np.int32)
+        # Keyed by the id as a string, the way viewports send them.
+        self.names = {str(room.id): room.name for room in rooms}
+        if rooms:
+            xs = np.fromiter((room.x_coordinate for room in rooms), np.int64, len(rooms)) - (chunk[0] << CHUNK_SHIFT)
+            ys = np.fromiter((room.y_coordinate for room in rooms), np.int64, len(rooms)) - (chunk[1] << CHUNK_SHIFT)
+            self.terrain[xs, ys] = [terrain_codes.code(room.terrain_type) for room in rooms]
+            self.room_ids[xs, ys] = [room.id for room in rooms]
+
+
+class MapTileCache:
+    def __init__(self, max_tiles: int = 4096):
+        """
+        :param max_tiles: Tiles kept before the least recently used one is evicted.
+        """
+        self.max_tiles = max_tiles
+        self.renders = 0
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def clear(self):
+        with self._lock:
+            self._tiles.clear()
+            self.renders = 0
+
+    def get(self, chunk: tuple, rooms: tuple, store: bool = True) -> MapTile:
+        """
+        Return the tile of ``chunk``, rendering it unless the cached one was drawn from ``rooms``.
+
+        :param rooms: The chunk's current rooms (from RoomModel.get_rooms_in_chunk).
+        :param store: False for rooms read inside a transaction, which must not be shared.
+        """
+        with self._lock:
+            tile = self._tiles.get(chunk)
+            if tile is not None and tile.rooms is rooms:
+                self._tiles.move_to_end(chunk)
+                return tile
+        tile = MapTile(chunk, rooms)
+        with self._lock:
+            self.renders += 1
+            if store:
+                self._tiles[chunk] = tile
+                self._tiles.move_to_end(chunk)
+                while len(self._tiles) > self.max_tiles:
+                    self._tiles.popitem(last=False)
+        return tile
+
+
+map_tiles = register_cache(MapTileCache(int(os.getenv("MAP_TILE_CACHE_SIZE", "4096"))))
@@ -0,0 +1,236 @@
+# app/db/migrations.py
+#
+# Versioned schema migrations. Every schema change is appended to MIGRATIONS with the next
+# version number; applied versions are recorded in the schema_version table so each one
+# runs exactly once per database. Never edit a migration that has shipped - add a new one.
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _initial_schema(connection):
+    """Tables as they existed before versioning (created only when missing)."""
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS players (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            current_room TEXT NOT NULL
+        );
+    """)
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS rooms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL,
+            x_coordinate INTEGER NOT NULL,
+            y_coordinate INTEGER NOT NULL,
+            UNIQUE (x_coordinate, y_coordinate)
+        );
+    """)
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS inventory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_name TEXT,
+            room_name TEXT,
+            item_name TEXT,
+            FOREIGN KEY(player_name) REFERENCES players(name),
+            FOREIGN KEY(room_name) REFERENCES rooms(name)
+        );
+    """)
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS neighbor_relations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            room_id INTEGER NOT NULL,
+            neighbor_room_id INTEGER NOT NULL,
+            direction TEXT NOT NULL,
+            FOREIGN KEY(room_id) REFERENCES rooms(id),
+            FOREIGN KEY(neighbor_room_id) REFERENCES rooms(id)
+        );
+    """)
+
+
+def _hot_path_indexes(connection):
+    """Secondary indexes for the per-request lookups in app.db.models."""
+    # Player names become unique; keep the oldest row of any duplicates.
+    removed = connection.execute("""
+        DELETE FROM players WHERE id NOT IN (SELECT MIN(id) FROM players GROUP BY name);
+    """).rowcount
+    if removed > 0:
+        logger.warning(f"Removed {removed} duplicate player rows before adding the unique name index")
+    connection.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_players_name ON players (name);")
+    # Databases created by the old RoomModel.create_table lack the coordinate constraint.
+    connection.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_rooms_coordinates ON rooms (x_coordinate, y_coordinate);
+    """)
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_rooms_name ON rooms (name);")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_inventory_player_item ON inventory (player_name, item_name);")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_inventory_room_item ON inventory (room_name, item_name);")
+    connection.execute("""
+        CREATE INDEX IF NOT EXISTS idx_neighbor_relations_room
+        ON neighbor_relations (room_id, neighbor_room_id);
+    """)
+
+
+def _integer_room_identity(connection):
+    """Point players and room inventory at rooms.id instead of free-text room names."""
+    connection.execute("""
+        CREATE TABLE players_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            current_room_id INTEGER,
+            FOREIGN KEY(current_room_id) REFERENCES rooms(id)
+        );
+    """)
+    # Duplicate room names resolve to the oldest room, matching RoomIdentityCache.
+    connection.execute("""
+        INSERT INTO players_new (id, name, current_room_id)
+        SELECT p.id, p.name, (SELECT MIN(r.id) FROM rooms r WHERE r.name = p.current_room)
+        FROM players p;
+    """)
+    unresolved = connection.execute("""
+        SELECT COUNT(*) FROM players_new WHERE current_room_id IS NULL;
+    """).fetchone()[0]
+    if unresolved:
+        logger.warning(f"{unresolved} players were in rooms that do not exist; their location is now unset")
+    connection.execute("DROP TABLE players;")
+    connection.execute("ALTER TABLE players_new RENAME TO players;")
+    connection.execute("CREATE UNIQUE INDEX idx_players_name ON players (name);")
+    connection.execute("CREATE INDEX idx_players_current_room ON players (current_room_id);")
+
+    connection.execute("""
+        CREATE TABLE inventory_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_name TEXT,
+            room_id INTEGER,
+            item_name TEXT,
+            FOREIGN KEY(player_name) REFERENCES players(name),
+            FOREIGN KEY(room_id) REFERENCES rooms(id)
+        );
+    """)
+    connection.execute("""
+        INSERT INTO inventory_new (id, player_name, room_id, item_name)
+        SELECT i.id, i.player_name, (SELECT MIN(r.id) FROM rooms r WHERE r.name = i.room_name), i.item_name
+        FROM inventory i
+        WHERE i.room_name IS NULL OR EXISTS (SELECT 1 FROM rooms r WHERE r.name = i.room_name);
+    """)
+    connection.execute("DROP TABLE inventory;")
+    connection.execute("ALTER TABLE inventory_new RENAME TO inventory;")
+    connection.execute("CREATE INDEX idx_inventory_player_item ON inventory (player_name, item_name);")
+    connection.execute("CREATE INDEX idx_inventory_room_item ON inventory (room_id, item_name);")
+
+
+def _room_details(connection):
+    """Keep the terrain type, features, sounds and smells that world generation produces."""
+    connection.execute("ALTER TABLE rooms ADD COLUMN terrain_type TEXT;")
+    connection.execute("""
+        CREATE TABLE room_features (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            room_id INTEGER NOT NULL,
+            feature_type TEXT,
+            description TEXT NOT NULL,
+            FOREIGN KEY(room_id) REFERENCES rooms(id)
+        );
+    """)
+    connection.execute("CREATE INDEX idx_room_features_room ON room_features (room_id);")
+    connection.execute("""
+        CREATE TABLE room_ambience (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            room_id INTEGER NOT NULL,
+            kind TEXT NOT NULL CHECK (kind IN ('sound', 'smell')),
+            description TEXT NOT NULL,
+            FOREIGN KEY(room_id) REFERENCES rooms(id)
+        );
+    """)
+    connection.execute("CREATE INDEX idx_room_ambience_room ON room_ambience (room_id, kind);")
+    # One edge per room and direction, so derived relations can be inserted idempotently.
+    connection.execute("""
+        DELETE FROM neighbor_relations
+        WHERE id NOT IN (SELECT MIN(id) FROM neighbor_relations GROUP BY room_id, direction);
+    """)
+    connection.execute("""
+        CREATE UNIQUE INDEX idx_neighbor_relations_direction ON neighbor_relations (room_id, direction);
+    """)
+
+
+def _spatial_chunks(connection):
+    """Index rooms by the 16x16 chunk they fall in, so a region is a handful of equality lookups."""
+    connection.execute("""
+        CREATE INDEX idx_rooms_chunk ON rooms ((x_coordinate >> 4), (y_coordinate >> 4));
+    """)
+
+
+def _inventory_quantities(connection):
+    """Store one row per (holder, item) with a quantity instead of one row per item instance."""
+    connection.execute("""
+        CREATE TABLE inventory_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            holder_kind TEXT NOT NULL CHECK (holder_kind IN ('player', 'room')),
+            holder_id INTEGER NOT NULL,
+            item_name TEXT NOT NULL,
+            quantity INTEGER NOT NULL CHECK (quantity >= 0),
+            UNIQUE (holder_kind, holder_id, item_name)
+        );
+    """)
+    # Player items were keyed by name; duplicate names were merged by migration 2, so each maps to one id.
+    connection.execute("""
+        INSERT INTO inventory_new (holder_kind, holder_id, item_name, quantity)
+        SELECT 'player', p.id, i.item_name, COUNT(*)
+        FROM inventory i JOIN players p ON p.name = i.player_name
+        WHERE i.item_name IS NOT NULL
+        GROUP BY p.id, i.item_name;
+    """)
+    connection.execute("""
+        INSERT INTO inventory_new (holder_kind, holder_id, item_name, quantity)
+        SELECT 'room', i.room_id, i.item_name, COUNT(*)
+        FROM inventory i
+        WHERE i.player_name IS NULL AND i.room_id IS NOT NULL AND i.item_name IS NOT NULL
+        GROUP BY i.room_id, i.item_name;
+    """)
+    connection.execute("DROP TABLE inventory;")
+    connection.execute("ALTER TABLE inventory_new RENAME TO inventory;")
+
+
+# (version, description, apply) in the order they must run.
+MIGRATIONS = [
+    (1, "initial schema", _initial_schema),
+    (2, "hot path indexes", _hot_path_indexes),
+    (3, "integer room identity for players and inventory", _integer_room_identity),
+    (4, "room terrain, features and ambience", _room_details),
+    (5, "spatial chunk index on rooms", _spatial_chunks),
+    (6, "inventory holdings with quantities", _inventory_quantities),
+]
+
+
+def get_schema_version(connection) -> int:
+    """Return the highest applied migration version (0 for an unversioned database)."""
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    row = connection.execute("SELECT MAX(version) FROM schema_version;").fetchone()
+    return row[0] or 0
+
+
+def migrate(connection) -> int:
+    """
+    Apply every pending migration, each in its own transaction.
+
+    :param connection: A pooled or plain sqlite3 connection.
+    :return: The schema version after migrating.
+    """
+    current_version = get_schema_version(connection)
+    for version, description, apply in MIGRATIONS:
+        if version <= current_version:
+            continue
+        logger.info(f"Applying schema migration {version}: {description}")
+        with connection:
+            apply(connection)
+            connection.execute("""
+                INSERT INTO schema_version (version, description) VALUES (?, ?);
+            """, (version, description))
+        current_version = version
+    return current_version
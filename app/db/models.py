@@ -1,5 +1,17 @@
 import logging
 
+from app.core.grid import DIRECTION_OFFSETS, chunk_of
+from app.db.migrations import migrate
+from app.db.connection_pool import after_commit
+from app.db.grid_index import grid_index
+from app.db.occupancy import occupancy
+from app.db.player_cache import player_cache
+from app.db.records import PlayerRecord, RoomRecord, NeighborRecord, InventoryEntry, RoomTile
+from app.db.room_graph import room_graph
+from app.db.room_identity import room_identity
+from app.db.spatial import chunk_cache
+from app.db.write_behind import get_location_buffer
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -7,163 +19,456 @@ logger = logging.getLogger(__name__)
 class PlayerModel:
     @staticmethod
     def create_table(connection):
-        """Create the players table if it doesn't exist."""
-        connection.execute("""
-            CREATE TABLE IF NOT EXISTS players (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                current_room TEXT NOT NULL
-            );
-        """)
+        """Ensure the players table exists by applying any pending schema migrations."""
+        migrate(connection)
 
     @staticmethod
-    def create_player(connection, name: str, current_room: str = "start"):
-        """Insert a new player into the database."""
-        connection.execute("""
-            INSERT INTO players (name, current_room)
+    def create_player(connection, name: str, current_room="start"):
+        """Insert a new player into the database, starting in a room given by name or id."""
+        room_id = room_identity.resolve(connection, current_room)
+        player_id = connection.execute("""
+            INSERT INTO players (name, current_room_id)
             VALUES (?, ?);
-        """, (name, current_room))
+        """, (name, room_id)).lastrowid
+        cell = room_identity.coordinates_for_id(connection, room_id)
+        after_commit(connection, lambda: occupancy.player_added(player_id, name, room_id, cell))
 
     @staticmethod
     def get_player_by_name(connection, name: str):
-        """Retrieve a player by name."""
-        player = connection.execute("""
-            SELECT * FROM players WHERE name = ?;
+        """
+        Retrieve a player by name, including any location update still waiting in the write-behind buffer.
+
+        Served from the player cache when possible; every call returns a new record.
+        """
+        state = player_cache.get_player(connection, name, lambda: PlayerModel._load_state(connection, name))
+        if state is None:
+            return None
+        player_id, room_id = state
+        player = PlayerRecord(player_id, name, room_id, room_identity.name_for_id(connection, room_id))
+        return PlayerModel._with_pending_location(connection, player)
+
+    @staticmethod
+    def _load_state(connection, name: str):
+        row = connection.execute("""
+            SELECT id, current_room_id FROM players WHERE name = ?;
         """, (name,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    @staticmethod
+    def get_players_by_names(connection, names) -> dict:
+        """Retrieve many players in one query as ``{name: PlayerRecord}``; unknown names are left out."""
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+        placeholders = ", ".join("(?)" for _ in names)
+        rows = connection.execute(f"""
+            SELECT p.id, p.name, p.current_room_id, r.name
+            FROM (VALUES {placeholders}) AS n
+            JOIN players p ON p.name = n.column1
+            LEFT JOIN rooms r ON r.id = p.current_room_id;
+        """, names).fetchall()
+        return {row[1]: PlayerModel._with_pending_location(connection, PlayerRecord(*row)) for row in rows}
+
+    @staticmethod
+    def _with_pending_location(connection, player: PlayerRecord) -> PlayerRecord:
+        buffer = get_location_buffer()
+        if buffer is not None:
+            pending_room_id = buffer.get(player.name)
+            if pending_room_id is not None:
+                player.current_room_id = pending_room_id
+                player.current_room = room_identity.name_for_id(connection, pending_room_id)
         return player
 
     @staticmethod
-    def update_player_location(connection, player_name: str, new_room: str):
-        """Update a player's current room."""
-        connection.execute("""
-            UPDATE players SET current_room = ? WHERE name = ?;
-        """, (new_room, player_name))
+    def update_player_location(connection, player_name: str, new_room):
+        """
+        Update a player's current room (buffered when location write-behind is enabled).
+
+        :param new_room: The room's id, or its name for the legacy string API.
+        """
+        new_room_id = room_identity.resolve(connection, new_room)
+        cell = room_identity.coordinates_for_id(connection, new_room_id)
+        buffer = get_location_buffer()
+        if buffer is not None:
+            # Readers see the buffered room; the cache is written through when the buffer flushes.
+            buffer.put(player_name, new_room_id)
+            occupancy.player_moved(player_name, new_room_id, cell)
+            return
+        with connection:
+            connection.execute("""
+                UPDATE players SET current_room_id = ? WHERE name = ?;
+            """, (new_room_id, player_name))
+            player_cache.location_changed(connection, player_name, new_room_id)
+            after_commit(connection, lambda: occupancy.player_moved(player_name, new_room_id, cell))
+
+    @staticmethod
+    def update_player_locations(connection, locations: dict):
+        """
+        Update many players' rooms in one transaction from a ``{player_name: room_id}`` dict.
+
+        Used to flush the write-behind buffer, whose moves the occupancy index already reflects.
+        """
+        with connection:
+            connection.executemany("""
+                UPDATE players SET current_room_id = ? WHERE name = ?;
+            """, [(room_id, player_name) for player_name, room_id in locations.items()])
+            for player_name, room_id in locations.items():
+                player_cache.location_changed(connection, player_name, room_id)
 
 
 class RoomModel:
     @staticmethod
     def create_table(connection):
-        """Create the rooms table if it doesn't exist."""
-        with connection:
-            connection.execute("""
-                CREATE TABLE IF NOT EXISTS rooms (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    x_coordinate INTEGER NOT NULL,
-                    y_coordinate INTEGER NOT NULL
-                );
-            """)
+        """Ensure the rooms table exists by applying any pending schema migrations."""
+        migrate(connection)
 
     @staticmethod
     def create_room(connection, name: str, description: str, x_coordinate: int, y_coordinate: int):
         """Insert a new room into the database."""
         with connection:
-            connection.execute("""
+            room_id = connection.execute("""
                 INSERT INTO rooms (name, description, x_coordinate, y_coordinate)
                 VALUES (?, ?, ?, ?);
-            """, (name, description, x_coordinate, y_coordinate))
+            """, (name, description, x_coordinate, y_coordinate)).lastrowid
+        after_commit(connection, lambda: chunk_cache.invalidate([chunk_of(x_coordinate, y_coordinate)]))
+        after_commit(connection, grid_index.mark_stale)
+        after_commit(connection, lambda: room_graph.add_room(room_id, name, x_coordinate, y_coordinate))
 
     @staticmethod
     def get_room_by_coordinates(connection, coordinates: dict):
-        """Retrieve a room by its coordinates."""
-        room = connection.execute("""
-            SELECT * FROM rooms WHERE x_coordinate = ? AND y_coordinate = ?;
+        """Retrieve a room by its coordinates; the description is loaded on first access."""
+        row = connection.execute("""
+            SELECT id, name, x_coordinate, y_coordinate FROM rooms WHERE x_coordinate = ? AND y_coordinate = ?;
         """, (coordinates['x'], coordinates['y'])).fetchone()
-        return room
+        return RoomRecord(*row, _connection=connection) if row else None
 
     @staticmethod
     def get_room_by_name(connection, name: str):
-        """Retrieve a room by its name."""
-        room = connection.execute("""
-            SELECT * FROM rooms WHERE name = ?;
+        """Retrieve a room by its name; the description is loaded on first access."""
+        row = connection.execute("""
+            SELECT id, name, x_coordinate, y_coordinate FROM rooms WHERE name = ?;
         """, (name,)).fetchone()
-        return room
+        return RoomRecord(*row, _connection=connection) if row else None
 
-class InventoryModel:
     @staticmethod
-    def create_table(connection):
-        """Create the inventory table."""
+    def get_room_by_id(connection, room_id: int):
+        """Retrieve a room by its id together with its description, for callers about to show it."""
+        row = connection.execute("""
+            SELECT id, name, x_coordinate, y_coordinate, description FROM rooms WHERE id = ?;
+        """, (room_id,)).fetchone()
+        return RoomRecord(*row[:4], _connection=connection, _description=row[4]) if row else None
+
+    @staticmethod
+    def upsert_rooms(connection, rooms: list):
+        """
+        Insert or update rooms keyed by their coordinates.
+
+        :param rooms: ``(name, description, x_coordinate, y_coordinate, terrain_type)`` tuples.
+        """
+        connection.executemany("""
+            INSERT INTO rooms (name, description, x_coordinate, y_coordinate, terrain_type)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (x_coordinate, y_coordinate) DO UPDATE SET
+                name = excluded.name,
+                description = excluded.description,
+                terrain_type = excluded.terrain_type;
+        """, rooms)
+        chunks = {chunk_of(room[2], room[3]) for room in rooms}
+        after_commit(connection, lambda: chunk_cache.invalidate(chunks))
+        after_commit(connection, grid_index.mark_stale)
+        # Updated rooms may have been renamed.
+        after_commit(connection, lambda: room_identity.forget_cells([(room[2], room[3]) for room in rooms]))
+
+    @staticmethod
+    def insert_new_rooms(connection, rooms: list) -> dict:
+        """
+        Insert rooms at coordinates that are still free, leaving any room already there untouched.
+
+        :param rooms: ``(name, description, x_coordinate, y_coordinate, terrain_type)`` tuples.
+        :return: ``{(x, y): id}`` of the rooms inserted.
+        """
+        inserted = {}
+        with connection:
+            for room in rooms:
+                row = connection.execute("""
+                    INSERT INTO rooms (name, description, x_coordinate, y_coordinate, terrain_type)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (x_coordinate, y_coordinate) DO NOTHING
+                    RETURNING id;
+                """, room).fetchone()
+                if row is not None:
+                    inserted[(room[2], room[3])] = row[0]
+        chunks = {chunk_of(x, y) for x, y in inserted}
+        after_commit(connection, lambda: chunk_cache.invalidate(chunks))
+        after_commit(connection, grid_index.mark_stale)
+        added = [(inserted[(x, y)], name, x, y) for name, _, x, y, _ in rooms if (x, y) in inserted]
+
+        def add_to_graph():
+            for room in added:
+                room_graph.add_room(*room)
+
+        after_commit(connection, add_to_graph)
+        return inserted
+
+    @staticmethod
+    def get_room_ids_by_coordinates(connection, coordinates: list) -> dict:
+        """Map each ``(x, y)`` in ``coordinates`` that holds a room to that room's id."""
+        room_ids = {}
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(coordinates), 500):
+            chunk = coordinates[start:start + 500]
+            placeholders = ", ".join("(?, ?)" for _ in chunk)
+            # Joined rather than a row-value IN, which SQLite answers by scanning the whole index.
+            rows = connection.execute(f"""
+                SELECT r.id, r.x_coordinate, r.y_coordinate
+                FROM (VALUES {placeholders}) AS c
+                JOIN rooms r ON r.x_coordinate = c.column1 AND r.y_coordinate = c.column2;
+            """, [value for pair in chunk for value in pair]).fetchall()
+            room_ids.update({(row[1], row[2]): row[0] for row in rows})
+        return room_ids
+
+    @staticmethod
+    def ensure_start_room(connection):
+        """Create the 'start' room at the origin that new players are placed in, unless it exists."""
         connection.execute("""
-            CREATE TABLE IF NOT EXISTS inventory (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                player_name TEXT,
-                room_name TEXT,
-                item_name TEXT,
-                FOREIGN KEY(player_name) REFERENCES players(name),
-                FOREIGN KEY(room_name) REFERENCES rooms(name)
-            );
+            INSERT OR IGNORE INTO rooms (name, description, x_coordinate, y_coordinate)
+            SELECT 'start', 'The starting point of your journey.', 0, 0
+            WHERE NOT EXISTS (SELECT 1 FROM rooms WHERE name = 'start');
         """)
+        after_commit(connection, lambda: chunk_cache.invalidate([chunk_of(0, 0)]))
+        after_commit(connection, grid_index.mark_stale)
 
     @staticmethod
-    def add_item_to_room(connection, room_name: str, item_name: str):
-        """Add an item to a room."""
-        connection.execute("""
-            INSERT INTO inventory (room_name, item_name)
-            VALUES (?, ?);
-        """, (room_name, item_name))
+    def get_rooms_in_chunk(connection, chunk_x: int, chunk_y: int) -> tuple:
+        """Return the rooms of one chunk as RoomTile records, from the chunk cache when possible."""
+        def load():
+            rows = connection.execute("""
+                SELECT id, name, x_coordinate, y_coordinate, terrain_type FROM rooms
+                WHERE (x_coordinate >> 4) = ? AND (y_coordinate >> 4) = ?;
+            """, (chunk_x, chunk_y)).fetchall()
+            return tuple(RoomTile(*row) for row in rows)
+        if connection.in_transaction:
+            # Uncommitted rows must not leak into the shared cache.
+            return load()
+        return chunk_cache.get_or_load((chunk_x, chunk_y), load)
 
     @staticmethod
-    def add_item_to_player(connection, player_name: str, item_name: str):
+    def get_rooms_in_region(connection, x0: int, y0: int, x1: int, y1: int) -> list:
+        """
+        Return every room inside the rectangle spanned by two corner cells, edges included.
+
+        Runs at most one indexed query per chunk overlapping the rectangle; cached chunks cost none.
+
+        :return: RoomTile records ordered by chunk, not by coordinate.
+        """
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        chunk_x0, chunk_y0 = chunk_of(x0, y0)
+        chunk_x1, chunk_y1 = chunk_of(x1, y1)
+        rooms = []
+        for chunk_y in range(chunk_y0, chunk_y1 + 1):
+            for chunk_x in range(chunk_x0, chunk_x1 + 1):
+                rooms.extend(
+                    room for room in RoomModel.get_rooms_in_chunk(connection, chunk_x, chunk_y)
+                    if x0 <= room.x_coordinate <= x1 and y0 <= room.y_coordinate <= y1
+                )
+        return rooms
+
+
+class InventoryModel:
+    # Holder kinds: an item stack belongs to either a player (players.id) or a room (rooms.id).
+    PLAYER = "player"
+    ROOM = "room"
+
+    @staticmethod
+    def create_table(connection):
+        """Ensure the inventory table exists by applying any pending schema migrations."""
+        migrate(connection)
+
+    @staticmethod
+    def _player_holder(connection, player_name: str) -> tuple:
+        player = PlayerModel.get_player_by_name(connection, player_name)
+        if player is None:
+            raise ValueError(f"Player '{player_name}' does not exist.")
+        return InventoryModel.PLAYER, player.id
+
+    @staticmethod
+    def _room_holder(connection, room) -> tuple:
+        return InventoryModel.ROOM, room_identity.resolve(connection, room)
+
+    @staticmethod
+    def give(connection, holder: tuple, item_name: str, quantity: int = 1):
+        """Add ``quantity`` units of an item to a ``(holder_kind, holder_id)`` holder."""
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive.")
+        with connection:
+            total = connection.execute("""
+                INSERT INTO inventory (holder_kind, holder_id, item_name, quantity)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (holder_kind, holder_id, item_name) DO UPDATE SET quantity = quantity + excluded.quantity
+                RETURNING quantity;
+            """, (*holder, item_name, quantity)).fetchone()[0]
+            if holder[0] == InventoryModel.PLAYER:
+                player_cache.quantity_changed(connection, holder[1], item_name, total)
+
+    @staticmethod
+    def _take(connection, holder: tuple, item_name: str, quantity: int) -> bool:
+        remaining = connection.execute("""
+            UPDATE inventory SET quantity = quantity - ?
+            WHERE holder_kind = ? AND holder_id = ? AND item_name = ? AND quantity >= ?
+            RETURNING quantity;
+        """, (quantity, *holder, item_name, quantity)).fetchone()
+        if remaining is None:
+            return False
+        if remaining[0] == 0:
+            connection.execute("""
+                DELETE FROM inventory WHERE holder_kind = ? AND holder_id = ? AND item_name = ?;
+            """, (*holder, item_name))
+        if holder[0] == InventoryModel.PLAYER:
+            player_cache.quantity_changed(connection, holder[1], item_name, remaining[0])
+        return True
+
+    @staticmethod
+    def take(connection, holder: tuple, item_name: str, quantity: int = 1) -> bool:
+        """
+        Remove ``quantity`` units of an item from a holder, all or nothing.
+
+        :return: False (and nothing removed) if the holder has fewer than ``quantity`` units.
+        """
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive.")
+        with connection:
+            return InventoryModel._take(connection, holder, item_name, quantity)
+
+    @staticmethod
+    def transfer(connection, source: tuple, target: tuple, item_name: str, quantity: int = 1) -> bool:
+        """
+        Move ``quantity`` units of an item between two ``(holder_kind, holder_id)`` holders in one transaction.
+
+        Concurrent transfers out of the same holder are serialized by the write transaction, so only as
+        many succeed as there are units to take.
+
+        :return: False (and nothing moved) if the source holds fewer than ``quantity`` units.
+        """
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive.")
+        with connection:
+            if not InventoryModel._take(connection, source, item_name, quantity):
+                return False
+            InventoryModel.give(connection, target, item_name, quantity)
+        return True
+
+    @staticmethod
+    def get_quantity(connection, holder: tuple, item_name: str) -> int:
+        """Return how many units of an item a holder has (0 if none)."""
+        row = connection.execute("""
+            SELECT quantity FROM inventory WHERE holder_kind = ? AND holder_id = ? AND item_name = ?;
+        """, (*holder, item_name)).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def add_item_to_room(connection, room_name, item_name: str, quantity: int = 1):
+        """Add an item to a room, given by name or id."""
+        InventoryModel.give(connection, InventoryModel._room_holder(connection, room_name), item_name, quantity)
+
+    @staticmethod
+    def add_item_to_player(connection, player_name: str, item_name: str, quantity: int = 1):
         """Add an item to a player's inventory."""
-        connection.execute("""
-            INSERT INTO inventory (player_name, item_name)
-            VALUES (?, ?);
-        """, (player_name, item_name))
+        InventoryModel.give(connection, InventoryModel._player_holder(connection, player_name), item_name, quantity)
 
     @staticmethod
-    def remove_item_from_room(connection, room_name: str, item_name: str):
-        """Remove an item from a room."""
-        connection.execute("""
-            DELETE FROM inventory WHERE room_name = ? AND item_name = ?;
-        """, (room_name, item_name))
+    def remove_item_from_room(connection, room_name, item_name: str, quantity: int = 1) -> bool:
+        """Remove units of an item from a room, given by name or id; False if there are not enough."""
+        return InventoryModel.take(connection, InventoryModel._room_holder(connection, room_name), item_name, quantity)
 
     @staticmethod
-    def remove_item_from_player(connection, player_name: str, item_name: str):
-        """Remove an item from a player's inventory."""
-        connection.execute("""
-            DELETE FROM inventory WHERE player_name = ? AND item_name = ?;
-        """, (player_name, item_name))
+    def remove_item_from_player(connection, player_name: str, item_name: str, quantity: int = 1) -> bool:
+        """Remove units of an item from a player's inventory; False if they do not have enough."""
+        return InventoryModel.take(
+            connection, InventoryModel._player_holder(connection, player_name), item_name, quantity
+        )
 
     @staticmethod
-    def is_item_in_room(connection, room_name: str, item_name: str) -> bool:
-        """Check if an item is in the room."""
+    def is_item_in_room(connection, room_name, item_name: str) -> bool:
+        """Check if an item is in the room, given by name or id."""
         item = connection.execute("""
-            SELECT * FROM inventory WHERE room_name = ? AND item_name = ?;
-        """, (room_name, item_name)).fetchone()
+            SELECT 1 FROM inventory WHERE holder_kind = 'room' AND holder_id = ? AND item_name = ? LIMIT 1;
+        """, (room_identity.resolve(connection, room_name), item_name)).fetchone()
         return item is not None
 
     @staticmethod
     def is_item_with_player(connection, player_name: str, item_name: str) -> bool:
         """Check if an item is with the player."""
         item = connection.execute("""
-            SELECT * FROM inventory WHERE player_name = ? AND item_name = ?;
+            SELECT 1 FROM inventory
+            WHERE holder_kind = 'player' AND holder_id = (SELECT id FROM players WHERE name = ?) AND item_name = ?
+            LIMIT 1;
         """, (player_name, item_name)).fetchone()
         return item is not None
 
     @staticmethod
     def get_player_inventory(connection, player_name: str):
-        """Get all items in a player's inventory."""
-        items = connection.execute("""
-            SELECT item_name FROM inventory WHERE player_name = ?;
-        """, (player_name,)).fetchall()
-        return [item["item_name"] for item in items]
+        """Get the names of the items in a player's inventory, once per item regardless of quantity."""
+        return [entry.item_name for entry in InventoryModel.get_player_inventory_entries(connection, player_name)]
+
+    @staticmethod
+    def get_player_inventory_entries(connection, player_name: str):
+        """Get a player's inventory as one entry per distinct item with its quantity."""
+        player = PlayerModel.get_player_by_name(connection, player_name)
+        if player is None:
+            return []
+
+        def load():
+            rows = connection.execute("""
+                SELECT item_name, quantity FROM inventory WHERE holder_kind = 'player' AND holder_id = ?;
+            """, (player.id,)).fetchall()
+            return {item_name: quantity for item_name, quantity in rows}
+
+        inventory = player_cache.get_inventory(connection, player.id, load)
+        return [InventoryEntry(item_name, quantity) for item_name, quantity in inventory.items()]
+
+
+class RoomDetailModel:
+    @staticmethod
+    def replace_room_details(connection, room_ids: list, features: list, ambience: list):
+        """
+        Replace the features and ambience of the given rooms.
+
+        :param features: ``(room_id, feature_type, description)`` tuples.
+        :param ambience: ``(room_id, kind, description)`` tuples, kind being 'sound' or 'smell'.
+        """
+        ids = [(room_id,) for room_id in room_ids]
+        connection.executemany("DELETE FROM room_features WHERE room_id = ?;", ids)
+        connection.executemany("DELETE FROM room_ambience WHERE room_id = ?;", ids)
+        connection.executemany("""
+            INSERT INTO room_features (room_id, feature_type, description) VALUES (?, ?, ?);
+        """, features)
+        connection.executemany("""
+            INSERT INTO room_ambience (room_id, kind, description) VALUES (?, ?, ?);
+        """, ambience)
+
+    @staticmethod
+    def get_room_features(connection, room_id: int):
+        """Get ``{"type", "description"}`` dicts for a room's features."""
+        rows = connection.execute("""
+            SELECT feature_type, description FROM room_features WHERE room_id = ? ORDER BY id;
+        """, (room_id,)).fetchall()
+        return [{"type": row[0], "description": row[1]} for row in rows]
+
+    @staticmethod
+    def get_room_ambience(connection, room_id: int, kind: str):
+        """Get a room's sounds (kind='sound') or smells (kind='smell')."""
+        rows = connection.execute("""
+            SELECT description FROM room_ambience WHERE room_id = ? AND kind = ? ORDER BY id;
+        """, (room_id, kind)).fetchall()
+        return [row[0] for row in rows]
 
 
 class NeighborRelationModel:
     @staticmethod
     def create_table(connection):
-        """Create the neighbor_relations table if it doesn't exist."""
-        connection.execute("""
-            CREATE TABLE IF NOT EXISTS neighbor_relations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                room_id INTEGER NOT NULL,
-                neighbor_room_id INTEGER NOT NULL,
-                direction TEXT NOT NULL,
-                FOREIGN KEY(room_id) REFERENCES rooms(id),
-                FOREIGN KEY(neighbor_room_id) REFERENCES rooms(id)
-            );
-        """)
+        """Ensure the neighbor_relations table exists by applying any pending schema migrations."""
+        migrate(connection)
 
     @staticmethod
     def add_neighbor_relation(connection, room_id: int, neighbor_room_id: int, direction: str):
@@ -172,16 +477,93 @@ class NeighborRelationModel:
             INSERT INTO neighbor_relations (room_id, neighbor_room_id, direction)
             VALUES (?, ?, ?);
         """, (room_id, neighbor_room_id, direction))
+        after_commit(connection, lambda: room_graph.add_edge(room_id, direction, neighbor_room_id))
 
     @staticmethod
     def get_neighbors_with_coordinates(connection, room_id: int):
         """Retrieve all neighboring rooms with coordinates for a specific room."""
         query = """
-            SELECT r.x_coordinate, r.y_coordinate
+            SELECT r.id, r.x_coordinate, r.y_coordinate, nr.direction
             FROM neighbor_relations nr
             JOIN rooms r ON nr.neighbor_room_id = r.id
             WHERE nr.room_id = ?
         """
         neighbors = connection.execute(query, (room_id,)).fetchall()
-        return [{"x": neighbor["x_coordinate"], "y": neighbor["y_coordinate"]} for neighbor in neighbors]
+        return [NeighborRecord(*neighbor) for neighbor in neighbors]
+
+    @staticmethod
+    def route_exists(connection, start_room_id: int, route: list) -> bool:
+        """
+        Check that every step of a route is an existing exit.
+
+        :param route: ``[(direction, room_id), ...]`` steps leading away from ``start_room_id``.
+        """
+        edges = []
+        room_id = start_room_id
+        for direction, neighbor_room_id in route:
+            edges.append((room_id, direction, neighbor_room_id))
+            room_id = neighbor_room_id
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(edges), 300):
+            chunk = edges[start:start + 300]
+            placeholders = ", ".join("(?, ?, ?)" for _ in chunk)
+            found = connection.execute(f"""
+                SELECT COUNT(*) FROM (VALUES {placeholders}) AS e
+                JOIN neighbor_relations nr
+                  ON nr.room_id = e.column1 AND nr.direction = e.column2 AND nr.neighbor_room_id = e.column3;
+            """, [value for edge in chunk for value in edge]).fetchone()[0]
+            if found != len(chunk):
+                return False
+        return True
+
+    @staticmethod
+    def link_grid_neighbors(connection, first_room_id: int = None, last_room_id: int = None,
+                            incremental: bool = False) -> int:
+        """
+        Derive 8-direction relations from room coordinates, skipping edges that already exist.
+
+        :param first_room_id: Only add edges that start or end at a room with an id in this
+            inclusive range (all rooms by default).
+        :param incremental: Apply the added edges to the cached room graph one by one instead of
+            clearing it; for the handful of rooms a generation adds, not for bulk imports.
+        :return: The number of relations added.
+        """
+        bounds = (first_room_id if first_room_id is not None else -2 ** 63,
+                  last_room_id if last_room_id is not None else 2 ** 63 - 1)
+        offsets = ", ".join(f"('{direction}', {dx}, {dy})" for direction, (dx, dy) in DIRECTION_OFFSETS.items())
+        returning = "RETURNING room_id, direction, neighbor_room_id" if incremental else ""
+        # Edges leaving rooms in the range
+        leaving = connection.execute(f"""
+            INSERT OR IGNORE INTO neighbor_relations (room_id, neighbor_room_id, direction)
+            WITH d(direction, dx, dy) AS (VALUES {offsets})
+            SELECT r.id, n.id, d.direction
+            FROM rooms r
+            CROSS JOIN d
+            JOIN rooms n ON n.x_coordinate = r.x_coordinate + d.dx AND n.y_coordinate = r.y_coordinate + d.dy
+            WHERE r.id BETWEEN ? AND ?
+            {returning};
+        """, bounds)
+        # Edges from existing rooms into the range
+        entering = connection.execute(f"""
+            INSERT OR IGNORE INTO neighbor_relations (room_id, neighbor_room_id, direction)
+            WITH d(direction, dx, dy) AS (VALUES {offsets})
+            SELECT r.id, n.id, d.direction
+            FROM rooms n
+            CROSS JOIN d
+            JOIN rooms r ON r.x_coordinate = n.x_coordinate - d.dx AND r.y_coordinate = n.y_coordinate - d.dy
+            WHERE n.id BETWEEN ? AND ?
+            {returning};
+        """, bounds)
+        if not incremental:
+            added = leaving.rowcount + entering.rowcount
+            if added:
+                after_commit(connection, room_graph.clear)
+            return added
+        edges = leaving.fetchall() + entering.fetchall()
+
+        def add_edges():
+            for room_id, direction, neighbor_room_id in edges:
+                room_graph.add_edge(room_id, direction, neighbor_room_id)
 
+        after_commit(connection, add_edges)
+        return len(edges)
@@ -0,0 +1,170 @@
+# app/db/occupancy.py
+#
+# In-memory occupancy index: which players are in which room, and where every player is. Occupied
+# rooms are also indexed by cell and bucketed by spatial chunk, so "players within R cells" only
+# visits the area around the player. Built from the database on startup (or first use) and kept
+# current by PlayerModel as players are created and move.
+
+import threading
+
+from app.core.grid import CHUNK_SHIFT, chunk_of
+from app.db.caches import register_cache
+from app.db.write_behind import get_location_buffer
+
+
+class OccupancyIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.loaded = False
+            self._ids_by_name = {}
+            self._names = {}              # player id -> name
+            self._player_rooms = {}       # player id -> room id
+            self._room_players = {}       # room id -> set of player ids
+            self._room_cells = {}         # occupied room id -> (x, y)
+            self._cell_rooms = {}         # (x, y) -> occupied room id
+            self._chunk_rooms = {}        # chunk -> set of occupied room ids
+
+    def __len__(self):
+        return len(self._player_rooms)
+
+    def rebuild(self, connection) -> int:
+        """Load every player's location from the database; returns the number of players indexed."""
+        with self._lock:
+            rows = connection.execute("""
+                SELECT p.id, p.name, p.current_room_id, r.x_coordinate, r.y_coordinate
+                FROM players p JOIN rooms r ON r.id = p.current_room_id;
+            """).fetchall()
+            buffer = get_location_buffer()
+            pending = buffer.snapshot() if buffer is not None else {}
+            pending_cells = {}
+            if pending:
+                cells = connection.execute(f"""
+                    SELECT id, x_coordinate, y_coordinate FROM rooms
+                    WHERE id IN ({", ".join("?" for _ in pending)});
+                """, list(pending.values())).fetchall()
+                pending_cells = {room_id: (x, y) for room_id, x, y in cells}
+            self.loaded = False
+            self._ids_by_name, self._names, self._player_rooms = {}, {}, {}
+            self._room_players, self._room_cells, self._cell_rooms, self._chunk_rooms = {}, {}, {}, {}
+            for player_id, name, room_id, x, y in rows:
+                self._ids_by_name[name] = player_id
+                self._names[player_id] = name
+                # Buffered moves are what readers see, so they win over the stored room.
+                if name in pending and pending[name] in pending_cells:
+                    room_id = pending[name]
+                    x, y = pending_cells[room_id]
+                self._place(player_id, room_id, x, y)
+            self.loaded = True
+            return len(rows)
+
+    def _place(self, player_id: int, room_id: int, x: int, y: int):
+        old_room_id = self._player_rooms.get(player_id)
+        if old_room_id == room_id:
+            return
+        if old_room_id is not None:
+            occupants = self._room_players[old_room_id]
+            occupants.discard(player_id)
+            if not occupants:
+                del self._room_players[old_room_id]
+                old_cell = self._room_cells.pop(old_room_id)
+                del self._cell_rooms[old_cell]
+                old_chunk = chunk_of(*old_cell)
+                self._chunk_rooms[old_chunk].discard(old_room_id)
+                if not self._chunk_rooms[old_chunk]:
+                    del self._chunk_rooms[old_chunk]
+        self._player_rooms[player_id] = room_id
+        occupants = self._room_players.get(room_id)
+        if occupants is None:
+            occupants = self._room_players[room_id] = set()
+            self._room_cells[room_id] = (x, y)
+            self._cell_rooms[(x, y)] = room_id
+            self._chunk_rooms.setdefault(chunk_of(x, y), set()).add(room_id)
+        occupants.add(player_id)
+
+    def player_added(self, player_id: int, name: str, room_id: int, cell: tuple):
+        """Index a newly created player in ``room_id`` at ``cell`` (x, y)."""
+        with self._lock:
+            if not self.loaded or cell is None:
+                return
+            self._ids_by_name[name] = player_id
+            self._names[player_id] = name
+            self._place(player_id, room_id, *cell)
+
+    def player_moved(self, name: str, room_id: int, cell: tuple):
+        """Record that the player called ``name`` is now in ``room_id`` at ``cell`` (x, y)."""
+        with self._lock:
+            player_id = self._ids_by_name.get(name)
+            if not self.loaded or player_id is None or cell is None:
+                return
+            self._place(player_id, room_id, *cell)
+
+    def _ensure_loaded(self, connection):
+        if not self.loaded:
+            self.rebuild(connection)
+
+    def room_of(self, connection, name: str):
+        """Return the id of the room the player called ``name`` is in, or None."""
+        self._ensure_loaded(connection)
+        with self._lock:
+            return self._player_rooms.get(self._ids_by_name.get(name))
+
+    def occupants(self, connection, room_id: int) -> list:
+        """Return the names of the players in a room, sorted."""
+        self._ensure_loaded(connection)
+        with self._lock:
+            return sorted(self._names[player_id] for player_id in self._room_players.get(room_id, ()))
+
+    def players_near(self, connection, name: str, radius: int) -> list:
+        """
+        Return the other players within ``radius`` cells (Chebyshev distance) of the player called ``name``.
+
+        :return: ``[(distance, player_name, room_id), ...]`` sorted by distance then name; empty if
+            the player is unknown.
+        """
+        self._ensure_loaded(connection)
+        with self._lock:
+            player_id = self._ids_by_name.get(name)
+            room_id = self._player_rooms.get(player_id)
+            if room_id is None:
+                return []
+            x, y = self._room_cells[room_id]
+            nearby = []
+            for other_room_id in self._occupied_rooms_near(x, y, radius):
+                other_x, other_y = self._room_cells[other_room_id]
+                distance = max(abs(other_x - x), abs(other_y - y))
+                if distance > radius:
+                    continue
+                for other_id in self._room_players[other_room_id]:
+                    if other_id != player_id:
+                        nearby.append((distance, self._names[other_id], other_room_id))
+        nearby.sort()
+        return nearby
+
+    def _occupied_rooms_near(self, x: int, y: int, radius: int):
+        """Occupied rooms in (at least) the square of ``radius`` cells around (x, y), by the cheapest route."""
+        chunk_x0, chunk_y0 = (x - radius) >> CHUNK_SHIFT, (y - radius) >> CHUNK_SHIFT
+        chunk_x1, chunk_y1 = (x + radius) >> CHUNK_SHIFT, (y + radius) >> CHUNK_SHIFT
+        if (chunk_x1 - chunk_x0 + 1) * (chunk_y1 - chunk_y0 + 1) > len(self._chunk_rooms):
+            # The square covers more chunks than are occupied at all.
+            return [room_id for rooms in self._chunk_rooms.values() for room_id in rooms]
+        chunks = [
+            self._chunk_rooms[chunk]
+            for chunk in ((cx, cy) for cx in range(chunk_x0, chunk_x1 + 1) for cy in range(chunk_y0, chunk_y1 + 1))
+            if chunk in self._chunk_rooms
+        ]
+        if (2 * radius + 1) ** 2 < sum(len(rooms) for rooms in chunks):
+            # Crowded chunks: probing each cell of the square is cheaper than filtering their rooms.
+            cells = self._cell_rooms
+            return [
+                cells[(cell_x, cell_y)]
+                for cell_x in range(x - radius, x + radius + 1) for cell_y in range(y - radius, y + radius + 1)
+                if (cell_x, cell_y) in cells
+            ]
+        return [room_id for rooms in chunks for room_id in rooms]
+
+
+occupancy = register_cache(OccupancyIndex())
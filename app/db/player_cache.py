@@ -0,0 +1,141 @@
+# app/db/player_cache.py
+#
+# Player state cache: a request-scoped memo, so one request never loads the same player twice, in
+# front of a process-wide LRU of player locations and inventories. Writers report committed values
+# through connection.after_commit, which runs in commit order, so the cache is written through
+# without racing other writers; a load that overlapped a write is not stored.
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.db.caches import register_cache
+from app.db.connection_pool import after_commit
+
+# {player name: (player id, current_room_id)} for the request being served, if any.
+_request_players = ContextVar("request_players", default=None)
+
+
+@contextmanager
+def player_request_scope():
+    """Memoize player lookups until the block exits (one block per HTTP request)."""
+    token = _request_players.set({})
+    try:
+        yield
+    finally:
+        _request_players.reset(token)
+
+
+class PlayerCache:
+    def __init__(self, max_players: int = 10000):
+        """
+        :param max_players: Players (and, separately, inventories) kept before the least recently
+            used one is evicted; 0 disables the cache and request scopes.
+        """
+        self.max_players = max_players
+        self.hits = 0
+        self.misses = 0
+        self.request_hits = 0
+        self._players = OrderedDict()
+        self._inventories = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every write so a load that raced with it is not stored.
+        self._generation = 0
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._players.clear()
+            self._inventories.clear()
+            self.hits = self.misses = self.request_hits = 0
+
+    def _store(self, entries: OrderedDict, key, value):
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_players:
+            entries.popitem(last=False)
+
+    def _get(self, connection, entries: OrderedDict, key, load):
+        # Reads inside a transaction skip the cache so they see the transaction's own writes.
+        if not self.max_players or connection.in_transaction:
+            return load()
+        with self._lock:
+            value = entries.get(key)
+            if value is not None:
+                entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+            generation = self._generation
+        value = load()
+        if value is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._store(entries, key, value)
+        return value
+
+    def get_player(self, connection, name: str, load):
+        """
+        Return ``(player id, current_room_id)`` for the player called ``name``, or None.
+
+        :param load: Callable reading the same tuple from the database on a miss.
+        """
+        scope = _request_players.get() if self.max_players and not connection.in_transaction else None
+        if scope is not None and name in scope:
+            self.request_hits += 1
+            return scope[name]
+        state = self._get(connection, self._players, name, load)
+        if scope is not None and state is not None:
+            scope[name] = state
+        return state
+
+    def location_changed(self, connection, name: str, room_id: int):
+        """Write a player's new room through once the write that moved them has committed."""
+        if not self.max_players:
+            return
+        scope = _request_players.get()
+
+        def write_through():
+            with self._lock:
+                self._generation += 1
+                state = self._players.get(name)
+                if state is not None:
+                    self._players[name] = (state[0], room_id)
+            if scope is not None and name in scope:
+                scope[name] = (scope[name][0], room_id)
+
+        after_commit(connection, write_through)
+
+    def get_inventory(self, connection, player_id: int, load) -> dict:
+        """
+        Return a copy of ``{item_name: quantity}`` for a player.
+
+        :param load: Callable reading the same dict from the database on a miss.
+        """
+        return dict(self._get(connection, self._inventories, player_id, load))
+
+    def quantity_changed(self, connection, player_id: int, item_name: str, quantity: int):
+        """Write a player's new quantity of an item through once it has committed."""
+        if not self.max_players:
+            return
+
+        def write_through():
+            with self._lock:
+                self._generation += 1
+                inventory = self._inventories.get(player_id)
+                if inventory is None:
+                    return
+                # Replaced rather than mutated, since readers copy it outside the lock.
+                inventory = dict(inventory)
+                if quantity > 0:
+                    inventory[item_name] = quantity
+                else:
+                    inventory.pop(item_name, None)
+                self._inventories[player_id] = inventory
+
+        after_commit(connection, write_through)
+
+
+player_cache = register_cache(PlayerCache(int(os.getenv("PLAYER_CACHE_SIZE", "10000"))))
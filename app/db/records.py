@@ -0,0 +1,85 @@
+# app/db/records.py
+#
+# Compact, slotted row objects returned by the models in place of sqlite3.Row.
+
+from dataclasses import dataclass, field
+from typing import ClassVar
+
+
+class _RecordMapping:
+    """Lets records stand in for the sqlite3.Row objects callers used to receive (row["name"], dict(row))."""
+
+    __slots__ = ()
+    _KEYS: ClassVar[tuple] = ()
+
+    def keys(self):
+        return self._KEYS
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+
+@dataclass(slots=True)
+class PlayerRecord(_RecordMapping):
+    _KEYS: ClassVar[tuple] = ("id", "name", "current_room_id", "current_room")
+
+    id: int
+    name: str
+    current_room_id: int
+    current_room: str
+
+
+@dataclass(slots=True)
+class RoomRecord(_RecordMapping):
+    """A room whose (potentially long) description is only loaded when first accessed."""
+
+    _KEYS: ClassVar[tuple] = ("id", "name", "description", "x_coordinate", "y_coordinate")
+
+    id: int
+    name: str
+    x_coordinate: int
+    y_coordinate: int
+    _connection: object = field(default=None, repr=False, compare=False)
+    _description: str = field(default=None, repr=False)
+
+    @property
+    def description(self) -> str:
+        if self._description is None and self._connection is not None:
+            row = self._connection.execute("""
+                SELECT description FROM rooms WHERE id = ?;
+            """, (self.id,)).fetchone()
+            self._description = row[0] if row else None
+        return self._description
+
+
+@dataclass(slots=True)
+class NeighborRecord(_RecordMapping):
+    _KEYS: ClassVar[tuple] = ("room_id", "x", "y", "direction")
+
+    room_id: int
+    x: int
+    y: int
+    direction: str
+
+
+@dataclass(slots=True)
+class InventoryEntry(_RecordMapping):
+    _KEYS: ClassVar[tuple] = ("item_name", "quantity")
+
+    item_name: str
+    quantity: int
+
+
+@dataclass(slots=True, frozen=True)
+class RoomTile(_RecordMapping):
+    """The part of a room needed to draw or stream a map region; shared between callers via the chunk cache."""
+
+    _KEYS: ClassVar[tuple] = ("id", "name", "x_coordinate", "y_coordinate", "terrain_type")
+
+    id: int
+    name: str
+    x_coordinate: int
+    y_coordinate: int
+    terrain_type: str
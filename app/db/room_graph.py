@@ -0,0 +1,108 @@
+# app/db/room_graph.py
+#
+# In-memory adjacency of the room graph stored in neighbor_relations: room id -> a row of eight
+# neighbor ids indexed by direction code. Rows are loaded a whole spatial chunk at a time on first
+# use (or all at once by warm()), and kept current by NeighborRelationModel as edges are added.
+
+import threading
+
+from app.core.grid import DIRECTION_CODES, DIRECTIONS
+from app.db.caches import register_cache
+from app.db.room_identity import room_identity
+
+# One column per direction code, each a lookup on the unique (room_id, direction) index.
+_NEIGHBOR_COLUMNS = ", ".join(
+    f"(SELECT neighbor_room_id FROM neighbor_relations WHERE room_id = r.id AND direction = '{direction}')"
+    for direction in DIRECTIONS
+)
+
+
+class RoomGraph:
+    def __init__(self):
+        self.chunk_loads = 0
+        # Bumped whenever cached rows are dropped, so derived structures know to rebuild.
+        self.generation = 0
+        self._adjacency = {}
+        self._edge_listeners = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._adjacency)
+
+    def clear(self):
+        with self._lock:
+            self._adjacency.clear()
+            self.chunk_loads = 0
+            self.generation += 1
+
+    def on_edge_added(self, listener):
+        """Call ``listener(room_id, direction, neighbor_room_id)`` after every add_edge."""
+        self._edge_listeners.append(listener)
+
+    def _store(self, rows):
+        """Cache adjacency rows from ``(room_id, name, x, y, *neighbor_ids)`` query rows."""
+        adjacency = {}
+        for row in rows:
+            room_identity.remember(*row[:4])
+            adjacency[row[0]] = list(row[4:])
+        with self._lock:
+            # Rows already cached may carry incremental edges newer than this read.
+            for room_id, neighbors in adjacency.items():
+                self._adjacency.setdefault(room_id, neighbors)
+        return adjacency
+
+    def _load_chunk_of(self, connection, room_id: int):
+        rows = connection.execute(f"""
+            SELECT r.id, r.name, r.x_coordinate, r.y_coordinate, {_NEIGHBOR_COLUMNS}
+            FROM rooms c
+            JOIN rooms r ON (r.x_coordinate >> 4) = (c.x_coordinate >> 4)
+                        AND (r.y_coordinate >> 4) = (c.y_coordinate >> 4)
+            WHERE c.id = ?;
+        """, (room_id,)).fetchall()
+        self.chunk_loads += 1
+        self._store(rows)
+
+    def warm(self, connection) -> int:
+        """Load the whole graph up front; returns the number of rooms loaded."""
+        rows = connection.execute(f"""
+            SELECT r.id, r.name, r.x_coordinate, r.y_coordinate, {_NEIGHBOR_COLUMNS} FROM rooms r;
+        """).fetchall()
+        return len(self._store(rows))
+
+    def loaded_neighbors(self, room_id: int):
+        """Return the room's neighbor row if it is already cached, else None (never reads the database)."""
+        return self._adjacency.get(room_id)
+
+    def neighbors(self, connection, room_id: int) -> list:
+        """Return the room's eight neighbor ids (None where there is no exit), indexed by direction code."""
+        neighbors = self._adjacency.get(room_id)
+        if neighbors is None:
+            self._load_chunk_of(connection, room_id)
+            neighbors = self._adjacency.get(room_id)
+        return neighbors or [None] * len(DIRECTIONS)
+
+    def neighbor(self, connection, room_id: int, direction: str):
+        """Return the id of the room reached by leaving ``room_id`` towards ``direction``, or None."""
+        code = DIRECTION_CODES.get(direction)
+        if code is None:
+            return None
+        return self.neighbors(connection, room_id)[code]
+
+    def add_room(self, room_id: int, name: str, x: int, y: int):
+        """Record a room that was just created, and so has no exits yet."""
+        room_identity.remember(room_id, name, x, y)
+        with self._lock:
+            self._adjacency.setdefault(room_id, [None] * len(DIRECTIONS))
+
+    def add_edge(self, room_id: int, direction: str, neighbor_room_id: int):
+        """Record a new edge; rooms that are not loaded yet will read it from the database."""
+        code = DIRECTION_CODES.get(direction)
+        with self._lock:
+            neighbors = self._adjacency.get(room_id)
+            if neighbors is not None and code is not None:
+                neighbors[code] = neighbor_room_id
+        for listener in self._edge_listeners:
+            listener(room_id, direction, neighbor_room_id)
+
+
+room_graph = register_cache(RoomGraph())
@@ -0,0 +1,96 @@
+# app/db/room_identity.py
+#
+# In-process interning table for rooms: maps the legacy string API (room names) and grid
+# coordinates to the integer rooms.id used by players, inventory and neighbor_relations.
+
+import threading
+
+from app.db.caches import register_cache
+
+
+class RoomIdentityCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids_by_name = {}
+        self._ids_by_coordinates = {}
+        self._rooms_by_id = {}
+
+    def remember(self, room_id: int, name: str, x_coordinate: int, y_coordinate: int):
+        # Names are not unique and a bulk load may not include the oldest room with a name, so
+        # the name map is only filled by id_for_name's own query.
+        with self._lock:
+            self._ids_by_coordinates[(x_coordinate, y_coordinate)] = room_id
+            self._rooms_by_id[room_id] = (name, x_coordinate, y_coordinate)
+
+    def forget_cells(self, cells):
+        """Forget the rooms at the given ``(x, y)`` cells after they were renamed; the next lookup reloads them."""
+        with self._lock:
+            for cell in cells:
+                room_id = self._ids_by_coordinates.pop(cell, None)
+                room = self._rooms_by_id.pop(room_id, None)
+                if room is not None and self._ids_by_name.get(room[0]) == room_id:
+                    del self._ids_by_name[room[0]]
+
+    def clear(self):
+        with self._lock:
+            self._ids_by_name.clear()
+            self._ids_by_coordinates.clear()
+            self._rooms_by_id.clear()
+
+    def _load(self, connection, where: str, parameters):
+        row = connection.execute(f"""
+            SELECT id, name, x_coordinate, y_coordinate FROM rooms WHERE {where} ORDER BY id LIMIT 1;
+        """, parameters).fetchone()
+        if row is None:
+            return None
+        self.remember(*row)
+        return row[0]
+
+    def id_for_name(self, connection, name: str):
+        """Return the id of the (oldest) room called ``name``, or None if there is none."""
+        room_id = self._ids_by_name.get(name)
+        if room_id is None:
+            room_id = self._load(connection, "name = ?", (name,))
+            if room_id is not None:
+                with self._lock:
+                    self._ids_by_name[name] = room_id
+        return room_id
+
+    def id_for_coordinates(self, connection, x_coordinate: int, y_coordinate: int):
+        """Return the id of the room at the given coordinates, or None if the cell is empty."""
+        room_id = self._ids_by_coordinates.get((x_coordinate, y_coordinate))
+        if room_id is None:
+            room_id = self._load(connection, "x_coordinate = ? AND y_coordinate = ?", (x_coordinate, y_coordinate))
+        return room_id
+
+    def _room(self, connection, room_id: int):
+        room = self._rooms_by_id.get(room_id)
+        if room is None and self._load(connection, "id = ?", (room_id,)) is not None:
+            room = self._rooms_by_id.get(room_id)
+        return room
+
+    def name_for_id(self, connection, room_id: int):
+        room = self._room(connection, room_id)
+        return room[0] if room else None
+
+    def coordinates_for_id(self, connection, room_id: int):
+        """Return ``(x, y)`` for a room id, or None if it does not exist."""
+        room = self._room(connection, room_id)
+        return (room[1], room[2]) if room else None
+
+    def resolve(self, connection, room):
+        """
+        Map a room reference from the legacy API to its id.
+
+        :param room: A rooms.id (int) or a room name (str).
+        :raises ValueError: If no room with that name exists.
+        """
+        if isinstance(room, int):
+            return room
+        room_id = self.id_for_name(connection, room)
+        if room_id is None:
+            raise ValueError(f"Room '{room}' does not exist.")
+        return room_id
+
+
+room_identity = register_cache(RoomIdentityCache())
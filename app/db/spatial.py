@@ -0,0 +1,68 @@
+# app/db/spatial.py
+#
+# In-process LRU cache of room chunks (CHUNK_SIZE x CHUNK_SIZE cells of the grid) backing region
+# queries. Writers that touch rooms invalidate the chunks they changed; clear_caches() drops all.
+
+import os
+import threading
+from collections import OrderedDict
+
+from app.db.caches import register_cache
+
+
+class ChunkCache:
+    def __init__(self, max_chunks: int = 4096):
+        """
+        :param max_chunks: Number of chunks kept before the least recently used one is evicted.
+        """
+        self.max_chunks = max_chunks
+        self.hits = 0
+        self.misses = 0
+        self._chunks = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation so a load that raced with a write is not stored.
+        self._generation = 0
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def get_or_load(self, chunk: tuple, load):
+        """
+        Return the cached rooms of ``chunk``, calling ``load()`` on a miss.
+
+        :param chunk: ``(chunk_x, chunk_y)``.
+        :param load: Callable returning the chunk's rooms as a tuple.
+        """
+        with self._lock:
+            rooms = self._chunks.get(chunk)
+            if rooms is not None:
+                self._chunks.move_to_end(chunk)
+                self.hits += 1
+                return rooms
+            self.misses += 1
+            generation = self._generation
+
+        rooms = load()
+        with self._lock:
+            if generation == self._generation:
+                self._chunks[chunk] = rooms
+                self._chunks.move_to_end(chunk)
+                while len(self._chunks) > self.max_chunks:
+                    self._chunks.popitem(last=False)
+        return rooms
+
+    def invalidate(self, chunks):
+        """Forget the given ``(chunk_x, chunk_y)`` chunks after their rooms changed."""
+        with self._lock:
+            self._generation += 1
+            for chunk in chunks:
+                self._chunks.pop(chunk, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._chunks.clear()
+            self.hits = self.misses = 0
+
+
+chunk_cache = register_cache(ChunkCache(int(os.getenv("ROOM_CHUNK_CACHE_SIZE", "4096"))))
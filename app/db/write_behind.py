@@ -0,0 +1,107 @@
+# app/db/write_behind.py
+#
+# Opt-in write-behind buffering for high-frequency, low-value state such as players.current_room.
+# Only the latest value per key is kept; pending values are flushed in one transaction when the
+# buffer reaches max_pending entries or flush_interval seconds have passed (the durability window).
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    def __init__(self, flush_fn, max_pending: int = 500, flush_interval: float = 0.5):
+        """
+        :param flush_fn: Callable receiving a ``{key: value}`` dict to persist in a single transaction.
+        :param max_pending: Number of buffered keys that triggers an early flush.
+        :param flush_interval: Maximum seconds a buffered value may wait before it is written.
+        """
+        self.flush_fn = flush_fn
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.flush_count = 0
+        self.flushed_rows = 0
+        self._pending = {}
+        # Values handed to flush_fn but not yet committed; still visible to readers.
+        self._flushing = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def put(self, key, value):
+        """Buffer ``value`` for ``key``, replacing any value that has not been flushed yet."""
+        with self._lock:
+            self._pending[key] = value
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def get(self, key, default=None):
+        """Return the buffered value for ``key`` so callers always see their own writes."""
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            return self._flushing.get(key, default)
+
+    def snapshot(self) -> dict:
+        """Return every value not yet committed, as readers would see it."""
+        with self._lock:
+            return {**self._flushing, **self._pending}
+
+    def flush(self) -> int:
+        """Write every buffered value in one transaction; returns the number of keys written."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch = self._pending
+                self._pending = {}
+                self._flushing = batch
+            try:
+                self.flush_fn(batch)
+            except Exception as e:
+                logger.error(f"Write-behind flush of {len(batch)} rows failed, will retry: {str(e)}")
+                with self._lock:
+                    # Newer values buffered during the failed flush take precedence.
+                    self._pending = {**batch, **self._pending}
+                    self._flushing = {}
+                return 0
+            with self._lock:
+                self._flushing = {}
+            self.flush_count += 1
+            self.flushed_rows += len(batch)
+            return len(batch)
+
+    def stop(self):
+        """Stop the background flusher and write whatever is still buffered."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+_location_buffer = None
+
+
+def get_location_buffer():
+    """Return the active player-location buffer, or None when writes go straight to the database."""
+    return _location_buffer
+
+
+def set_location_buffer(buffer):
+    global _location_buffer
+    _location_buffer = buffer
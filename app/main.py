@@ -1,7 +1,68 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.api.v1 import player
+from app.api.v1 import gpt_interaction, player, session
+from app.core.gpt_service import close_gpt_client, start_gpt_client
+from app.core.llm_scheduler import close_llm_scheduler
+from app.core.tick_scheduler import start_tick_scheduler, stop_tick_scheduler
+from app.db.async_repository import shutdown_db_executor
+from app.db.connection_pool import close_pool
+from app.db.database import get_db_connection, init_db, enable_location_write_behind, disable_location_write_behind
+from app.db.occupancy import occupancy
+from app.db.player_cache import player_request_scope
+from app.db.room_graph import room_graph
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Apply pending schema migrations before serving requests
+    init_db()
+    if os.getenv("PLAYER_LOCATION_WRITE_BEHIND", "0") == "1":
+        enable_location_write_behind()
+    # Index who is where from the stored player locations
+    occupancy.rebuild(get_db_connection())
+    # Load the whole room graph now instead of chunk by chunk on first use
+    if os.getenv("ROOM_GRAPH_WARM", "0") == "1":
+        room_graph.warm(get_db_connection())
+    # Apply moves on a fixed tick instead of one transaction per request
+    tick_rate = float(os.getenv("GAME_TICK_RATE", "0"))
+    if tick_rate > 0:
+        await start_tick_scheduler(get_db_connection(), tick_rate)
+    # One pooled LLM client for the life of the app, talking to a local fake provider if FAKE_LLM=1
+    fake_llm = None
+    if os.getenv("FAKE_LLM", "0") == "1":
+        # A development and test stand-in, only loaded when asked for.
+        from app.core.fake_llm import FakeLlmServer
+
+        fake_llm = await FakeLlmServer.from_env().start()
+        await start_gpt_client(api_key="fake", model="fake", base_url=fake_llm.base_url)
+    else:
+        await start_gpt_client()
+    yield
+    await close_llm_scheduler()
+    await close_gpt_client()
+    if fake_llm is not None:
+        await fake_llm.close()
+    # Apply queued actions, let in-flight queries finish, persist buffered player locations,
+    # then drain the writer queue and close every pooled connection
+    await stop_tick_scheduler()
+    shutdown_db_executor()
+    disable_location_write_behind()
+    close_pool()
+
+
+app = FastAPI(title="Dungeon Crawler Backend", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def scope_player_lookups(request, call_next):
+    # A request never loads the same player twice (see app.db.player_cache)
+    with player_request_scope():
+        return await call_next(request)
 
-app = FastAPI(title="Dungeon Crawler Backend")
 
 # Include our different routers for organizing endpoints
 app.include_router(player.router, prefix="/api/v1/player", tags=["Player"])
+app.include_router(session.router, prefix="/api/v1/session", tags=["Session"])
+app.include_router(gpt_interaction.router, prefix="/api/v1/gpt", tags=["GPT"])
@@ -0,0 +1,130 @@
+"""
+Benchmark reads and moves per second against the database layer.
+
+Compares the old single shared sqlite3 connection with the WAL connection pool at
+1, 8 and 64 concurrent clients:
+
+    python -m scripts.bench_connection_pool --seconds 2
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from app.db.caches import clear_caches
+from app.db.connection_pool import ConnectionPool, QueryResult
+from app.db.models import PlayerModel
+
+PLAYERS = 1000
+ROOMS = ["start", "east_room", "west_room"]
+
+
+class SharedConnection:
+    """
+    The previous setup: one connection shared by every thread, committing each write.
+
+    A lock is required for correctness (an unguarded shared connection corrupts cursors
+    under concurrent use), so every statement is serialized.
+    """
+
+    def __init__(self, database):
+        self._connection = sqlite3.connect(database, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        self.connection = self
+
+    def execute(self, sql, parameters=()):
+        with self._lock:
+            cursor = self._connection.execute(sql, parameters)
+            result = QueryResult(cursor.fetchall())
+            if not sql.lstrip().upper().startswith("SELECT"):
+                self._connection.commit()
+        return result
+
+    def executemany(self, sql, seq_of_parameters):
+        with self._lock:
+            self._connection.executemany(sql, seq_of_parameters)
+            self._connection.commit()
+
+    def __enter__(self):
+        self._lock.acquire()
+        self._connection.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            return self._connection.__exit__(exc_type, exc_value, traceback)
+        finally:
+            self._lock.release()
+
+    def close(self):
+        self._connection.close()
+
+
+def seed(connection):
+    PlayerModel.create_table(connection)
+    clear_caches()
+    connection.executemany(
+        "INSERT INTO rooms (name, description, x_coordinate, y_coordinate) VALUES (?, '', ?, 0);",
+        [(name, x) for x, name in enumerate(ROOMS)],
+    )
+    connection.executemany(
+        "INSERT INTO players (name, current_room_id) VALUES (?, 1);",
+        [(f"player{i}",) for i in range(PLAYERS)],
+    )
+
+
+def read_op(connection, rng):
+    PlayerModel.get_player_by_name(connection, f"player{rng.randrange(PLAYERS)}")
+
+
+def move_op(connection, rng):
+    name = f"player{rng.randrange(PLAYERS)}"
+    player = PlayerModel.get_player_by_name(connection, name)
+    PlayerModel.update_player_location(connection, player["name"], rng.choice(ROOMS))
+
+
+def run(connection, operation, clients, seconds):
+    counts = [0] * clients
+    stop = threading.Event()
+
+    def client(index):
+        rng = random.Random(index)
+        while not stop.is_set():
+            operation(connection, rng)
+            counts[index] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of each measurement")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64])
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'clients':>7} {'reads/s':>10} {'moves/s':>10}")
+    for backend in ("shared", "pool"):
+        with tempfile.TemporaryDirectory() as directory:
+            database = os.path.join(directory, "bench.db")
+            db = SharedConnection(database) if backend == "shared" else ConnectionPool(database, read_connections=8)
+            seed(db.connection)
+            for clients in args.clients:
+                reads = run(db.connection, read_op, clients, args.seconds)
+                moves = run(db.connection, move_op, clients, args.seconds)
+                print(f"{backend:<8} {clients:>7} {reads:>10.0f} {moves:>10.0f}")
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark the LLM tokens and cost per generated room of filling one chunk against the local fake
+LLM provider, two ways:
+
+    step     one connected-room prompt per step (the new cell plus its 8 neighbors), stepping from a
+             known room into the nearest empty cell of the chunk until the chunk is full;
+    packed   generate_frontier over the chunk's empty cells, --batch-sizes cells per prompt.
+
+    python -m scripts.bench_frontier_prompts --batch-sizes 4 16 64 --latency 0.2
+
+Token counts are the provider's usage (the fake counts four characters per token); cost uses
+LLM_PROMPT_COST_PER_MILLION and LLM_COMPLETION_COST_PER_MILLION.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from app.core.fake_llm import FakeLlmServer
+from app.core.gpt_service import close_gpt_client, completion_cost, get_gpt_completion, start_gpt_client
+from app.core.grid import CHUNK_SIZE, DIRECTION_OFFSETS
+from app.core.llm_scheduler import LlmScheduler, set_llm_scheduler
+from app.core.services.world_generation_service import WorldGenerationService
+from app.db import connection_pool
+from app.db.caches import clear_caches
+from app.db.database import get_db_connection, init_db
+from app.db.models import RoomModel
+
+
+def next_step(service):
+    """A known room and the direction of an empty chunk cell next to it, nearest the origin first."""
+    frontier = service.frontier_cells(0, 0, adjacent_only=True)
+    for x, y in sorted(frontier, key=lambda cell: (abs(cell[0]) + abs(cell[1]), cell)):
+        for direction, (dx, dy) in DIRECTION_OFFSETS.items():
+            if service.get_existing_room({"x": x - dx, "y": y - dy}) is not None:
+                return {"x": x - dx, "y": y - dy}, direction
+    return None
+
+
+async def fill_by_steps(service):
+    usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    while (step := next_step(service)) is not None:
+        coordinates, direction = step
+        prompt = service._connected_room_prompt(service.get_existing_room(coordinates), coordinates, direction)
+        answer, call_usage = await get_gpt_completion(prompt, cache=False)
+        usage["calls"] += 1
+        usage["prompt_tokens"] += call_usage["prompt_tokens"]
+        usage["completion_tokens"] += call_usage["completion_tokens"]
+        for location in answer.get("locations", []):
+            room_data = service._location_room_data(location)
+            if room_data is not None and service.get_existing_room(room_data["grid_coordinates"]) is None:
+                service.save_map_room_to_db(room_data)
+    return usage
+
+
+async def measure(args, mode, batch_size=None):
+    connection = get_db_connection()
+    connection.execute("DELETE FROM neighbor_relations;")
+    connection.execute("DELETE FROM rooms WHERE name != 'start';")
+    clear_caches()
+    scheduler = LlmScheduler(requests_per_minute=0, tokens_per_minute=0)
+    set_llm_scheduler(scheduler)
+    service = WorldGenerationService(connection)
+
+    async with FakeLlmServer(seed=args.seed, latency=args.latency, tokens_per_second=args.tokens_per_second) as server:
+        await start_gpt_client(api_key="fake", model="fake", base_url=server.base_url)
+        started = time.perf_counter()
+        if mode == "step":
+            usage = await fill_by_steps(service)
+        else:
+            usage = await service.generate_frontier(service.frontier_cells(0, 0), use_cache=False,
+                                                    batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        await close_gpt_client()
+        await scheduler.close()
+
+    rooms = connection.execute("SELECT COUNT(*) FROM rooms WHERE name != 'start';").fetchone()[0]
+    in_chunk = len(RoomModel.get_rooms_in_chunk(connection, 0, 0)) - 1
+    tokens = usage["prompt_tokens"] + usage["completion_tokens"]
+    label = mode if mode == "step" else f"packed {batch_size}"
+    print(f"{label:>10} {usage['calls']:>6} {rooms:>6} {in_chunk:>9} {usage['prompt_tokens'] / rooms:>13.0f} "
+          f"{usage['completion_tokens'] / rooms:>13.0f} {tokens / rooms:>11.0f} "
+          f"{completion_cost(usage) / rooms * 1e6:>13.1f} {elapsed:>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake provider seconds to first byte")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="fake provider generation speed")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        print(f"chunk of {CHUNK_SIZE} x {CHUNK_SIZE} cells")
+        print(f"{'mode':>10} {'calls':>6} {'rooms':>6} {'in chunk':>9} {'prompt/room':>13} "
+              f"{'answer/room':>13} {'tokens/room':>11} {'$/M rooms':>13} {'wall s':>7}")
+        asyncio.run(measure(args, "step"))
+        for batch_size in args.batch_sizes:
+            asyncio.run(measure(args, "packed", batch_size))
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark the NumPy grid index against SQL for neighbor and unexplored-cell queries.
+
+Generates a --size x --size world with --holes of its cells left unexplored (1M cells by default):
+
+    python -m scripts.bench_grid_index --size 1000 --holes 0.3 --queries 5000 --region 64
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from app.core.grid import DIRECTION_OFFSETS
+from app.db import connection_pool
+from app.db.database import get_db_connection, init_db
+from app.db.grid_index import grid_index
+from scripts.bench_spatial_region import generate_grid
+
+
+def sql_existing_neighbors(connection, x, y):
+    cells = [(x + dx, y + dy) for dx, dy in DIRECTION_OFFSETS.values()]
+    placeholders = ", ".join("(?, ?)" for _ in cells)
+    return connection.execute(f"""
+        SELECT r.x_coordinate, r.y_coordinate
+        FROM (VALUES {placeholders}) AS c
+        JOIN rooms r ON r.x_coordinate = c.column1 AND r.y_coordinate = c.column2;
+    """, [value for cell in cells for value in cell]).fetchall()
+
+
+def sql_unexplored_in_region(connection, x0, y0, x1, y1):
+    explored = set(connection.execute("""
+        SELECT x_coordinate, y_coordinate FROM rooms
+        WHERE x_coordinate BETWEEN ? AND ? AND y_coordinate BETWEEN ? AND ?;
+    """, (x0, x1, y0, y1)).fetchall())
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1) if (x, y) not in explored]
+
+
+def measure(label, calls, query):
+    started = time.perf_counter()
+    for call in calls:
+        query(*call)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {len(calls) / elapsed:>12.0f} {elapsed / len(calls) * 1e6:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1000, help="world edge length in cells")
+    parser.add_argument("--holes", type=float, default=0.3, help="fraction of cells without a room")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--region", type=int, default=64, help="edge length of the unexplored-cell query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        connection = get_db_connection()
+        generate_grid(connection, args.size)
+        connection.execute("DELETE FROM rooms WHERE abs(random()) % 1000 < ?;", (int(args.holes * 1000),))
+        rooms = connection.execute("SELECT COUNT(*) FROM rooms;").fetchone()[0]
+
+        started = time.perf_counter()
+        grid_index.sync(connection)
+        print(f"Synced {rooms} rooms into a {grid_index.bounds} index in {time.perf_counter() - started:.2f}s")
+
+        rng = random.Random(0)
+        cells = [(rng.randrange(args.size), rng.randrange(args.size)) for _ in range(args.queries)]
+        regions = []
+        for _ in range(max(args.queries // 10, 1)):
+            x, y = rng.randrange(args.size - args.region), rng.randrange(args.size - args.region)
+            regions.append((x, y, x + args.region - 1, y + args.region - 1))
+
+        print(f"{'query':<28} {'queries/s':>12} {'us/query':>10}")
+        measure("8 neighbors, sql", cells, lambda x, y: sql_existing_neighbors(connection, x, y))
+        measure("8 neighbors, grid index", cells, lambda x, y: grid_index.existing_neighbors(connection, x, y))
+        measure("unexplored region, sql", regions, lambda *box: sql_unexplored_in_region(connection, *box))
+        measure("unexplored region, index", regions, lambda *box: grid_index.unexplored_in_region(connection, *box))
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark many players hammering one room's loot: each client picks up one unit and drops it again.
+
+Compares the old per-instance rows with separate check/insert/delete statements against the
+transactional quantity transfer, and reports whether the total number of units was conserved:
+
+    python -m scripts.bench_inventory_transfer --seconds 2 --clients 1 8 64
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from app.core.inventory_handler import InventoryHandler
+from app.db import connection_pool
+from app.db.database import get_db_connection, init_db
+from app.db.models import InventoryModel, PlayerModel, RoomModel
+
+LOOT = 100
+ITEM = "Gold Coin"
+
+
+def legacy_pick_up(connection, player_name, room_id):
+    # The pre-transfer flow: one row per unit and independent statements outside any transaction.
+    if connection.execute("""
+        SELECT 1 FROM legacy_inventory WHERE room_id = ? AND item_name = ? LIMIT 1;
+    """, (room_id, ITEM)).fetchone() is None:
+        return False
+    connection.execute("INSERT INTO legacy_inventory (player_name, item_name) VALUES (?, ?);", (player_name, ITEM))
+    connection.execute("DELETE FROM legacy_inventory WHERE room_id = ? AND item_name = ?;", (room_id, ITEM))
+    return True
+
+
+def legacy_drop(connection, player_name, room_id):
+    if connection.execute("""
+        SELECT 1 FROM legacy_inventory WHERE player_name = ? AND item_name = ? LIMIT 1;
+    """, (player_name, ITEM)).fetchone() is None:
+        return False
+    connection.execute("DELETE FROM legacy_inventory WHERE player_name = ? AND item_name = ?;", (player_name, ITEM))
+    connection.execute("INSERT INTO legacy_inventory (room_id, item_name) VALUES (?, ?);", (room_id, ITEM))
+    return True
+
+
+def run(clients, seconds, pick_up, drop):
+    counts = [0] * clients
+    stop = threading.Event()
+
+    def client(index):
+        name = f"player{index}"
+        while not stop.is_set():
+            if pick_up(name):
+                drop(name)
+                counts[index] += 2
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of each measurement")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        connection = get_db_connection()
+        handler = InventoryHandler()
+        room_id = RoomModel.get_room_by_name(connection, "start").id
+        connection.execute("""
+            CREATE TABLE legacy_inventory (id INTEGER PRIMARY KEY, player_name TEXT, room_id INTEGER, item_name TEXT);
+        """)
+        connection.execute("CREATE INDEX idx_legacy_player ON legacy_inventory (player_name, item_name);")
+        connection.execute("CREATE INDEX idx_legacy_room ON legacy_inventory (room_id, item_name);")
+        for index in range(max(args.clients)):
+            PlayerModel.create_player(connection, name=f"player{index}")
+
+        print(f"{'mode':<10} {'clients':>7} {'transfers/s':>12} {'units before':>13} {'units after':>12}")
+        for clients in args.clients:
+            connection.execute("DELETE FROM legacy_inventory;")
+            connection.executemany("""
+                INSERT INTO legacy_inventory (room_id, item_name) VALUES (?, ?);
+            """, [(room_id, ITEM)] * LOOT)
+            transfers = run(
+                clients, args.seconds,
+                lambda name: legacy_pick_up(connection, name, room_id),
+                lambda name: legacy_drop(connection, name, room_id),
+            )
+            after = connection.execute("SELECT COUNT(*) FROM legacy_inventory;").fetchone()[0]
+            print(f"{'legacy':<10} {clients:>7} {transfers:>12.0f} {LOOT:>13} {after:>12}")
+
+            connection.execute("DELETE FROM inventory;")
+            InventoryModel.add_item_to_room(connection, room_id, ITEM, quantity=LOOT)
+            transfers = run(
+                clients, args.seconds,
+                lambda name: handler.pick_up_item(connection, name, ITEM)["success"],
+                lambda name: handler.drop_item(connection, name, ITEM)["success"],
+            )
+            after = connection.execute("SELECT COALESCE(SUM(quantity), 0) FROM inventory;").fetchone()[0]
+            print(f"{'transfer':<10} {clients:>7} {transfers:>12.0f} {LOOT:>13} {after:>12}")
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
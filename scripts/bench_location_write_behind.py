@@ -0,0 +1,82 @@
+"""
+Benchmark moves per second with write-through and write-behind player locations.
+
+Each move loads the player and updates their room, as GameEngine.move does:
+
+    python -m scripts.bench_location_write_behind --seconds 2 --flush-interval 0.5
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from app.db import connection_pool
+from app.db.database import get_db_connection, init_db, enable_location_write_behind, disable_location_write_behind
+from app.db.models import PlayerModel, RoomModel
+
+PLAYERS = 1000
+ROOMS = ["start", "east_room", "west_room"]
+
+
+def move_op(connection, rng):
+    name = f"player{rng.randrange(PLAYERS)}"
+    player = PlayerModel.get_player_by_name(connection, name)
+    PlayerModel.update_player_location(connection, player["name"], rng.choice(ROOMS))
+
+
+def run(connection, clients, seconds):
+    counts = [0] * clients
+    stop = threading.Event()
+
+    def client(index):
+        rng = random.Random(index)
+        while not stop.is_set():
+            move_op(connection, rng)
+            counts[index] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of each measurement")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--flush-interval", type=float, default=0.5, help="write-behind durability window")
+    parser.add_argument("--max-pending", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        connection = get_db_connection()
+        for x, name in enumerate(ROOMS[1:], start=1):
+            RoomModel.create_room(connection, name, "", x, 0)
+        connection.executemany(
+            "INSERT INTO players (name, current_room_id) VALUES (?, 1);",
+            [(f"player{i}",) for i in range(PLAYERS)],
+        )
+
+        print(f"{'mode':<14} {'clients':>7} {'moves/s':>10} {'flushes':>8} {'rows/flush':>10}")
+        for clients in args.clients:
+            moves = run(connection, clients, args.seconds)
+            print(f"{'write-through':<14} {clients:>7} {moves:>10.0f} {'-':>8} {'-':>10}")
+
+            buffer = enable_location_write_behind(args.max_pending, args.flush_interval)
+            moves = run(connection, clients, args.seconds)
+            disable_location_write_behind()
+            rows_per_flush = buffer.flushed_rows / max(buffer.flush_count, 1)
+            print(f"{'write-behind':<14} {clients:>7} {moves:>10.0f} {buffer.flush_count:>8} {rows_per_flush:>10.1f}")
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
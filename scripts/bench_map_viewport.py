@@ -0,0 +1,101 @@
+"""
+Benchmark map viewports around a player: latency from a cold and a warm tile cache, and payload
+size for each encoding, against plain JSON grids built from a region query:
+
+    python -m scripts.bench_map_viewport --size 1024 --viewports 64 256 --requests 200
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.core.map_view import RLE, ZLIB, render_player_viewport
+from app.db import connection_pool
+from app.db.caches import clear_caches
+from app.db.database import get_db_connection, init_db
+from app.db.models import PlayerModel, RoomModel
+from scripts.bench_spatial_region import generate_grid
+
+TERRAINS = ("forest", "meadow", "river", "hills", "swamp", "ruins")
+
+
+def plain_viewport(connection, player_name, width, height):
+    """What a map endpoint without tiles would send: a 2D list of [terrain, room id, name] cells."""
+    player = PlayerModel.get_player_by_name(connection, player_name)
+    x, y = connection.execute("SELECT x_coordinate, y_coordinate FROM rooms WHERE id = ?;",
+                              (player.current_room_id,)).fetchone()
+    x0, y0 = x - width // 2, y - height // 2
+    grid = [[None] * width for _ in range(height)]
+    for room in RoomModel.get_rooms_in_region(connection, x0, y0, x0 + width - 1, y0 + height - 1):
+        grid[y0 + height - 1 - room.y_coordinate][room.x_coordinate - x0] = [room.terrain_type, room.id, room.name]
+    return {"x0": x0, "y0": y0, "cells": grid}
+
+
+def measure(label, players, render):
+    latencies, sizes = [], []
+    for name in players:
+        started = time.perf_counter()
+        payload = json.dumps(render(name), separators=(",", ":"))
+        latencies.append(time.perf_counter() - started)
+        sizes.append(len(payload))
+    latencies.sort()
+    print(f"{label:<24} {statistics.median(latencies) * 1000:>9.2f} {latencies[int(len(latencies) * 0.99) - 1] * 1000:>9.2f} "
+          f"{statistics.mean(sizes) / 1024:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1024, help="world edge length in rooms")
+    parser.add_argument("--viewports", type=int, nargs="+", default=[64, 256])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--players", type=int, default=10,
+                        help="distinct viewports; keep players x chunks per viewport under the chunk caches")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        connection = get_db_connection()
+        generate_grid(connection, args.size)
+        # Terrain in 8 x 8 patches, with one room in ten left unexplored.
+        connection.execute(f"""
+            UPDATE rooms SET terrain_type = CASE ((x_coordinate / 8) * 7 + (y_coordinate / 8) * 3) % {len(TERRAINS)}
+                {" ".join(f"WHEN {code} THEN '{terrain}'" for code, terrain in enumerate(TERRAINS))} END;
+        """)
+        connection.execute("DELETE FROM rooms WHERE name LIKE 'room_%' AND abs(random()) % 10 = 0;")
+        room_ids = [room_id for (room_id,) in connection.execute(
+            "SELECT id FROM rooms WHERE name LIKE 'room_%';").fetchall()]
+        rng = random.Random(0)
+        connection.executemany("INSERT INTO players (name, current_room_id) VALUES (?, ?);", [
+            (f"player{i}", rng.choice(room_ids)) for i in range(args.players)
+        ])
+        names = [f"player{i}" for i in range(args.players)]
+
+        print(f"{'viewport':<24} {'p50 ms':>9} {'p99 ms':>9} {'KiB':>10}")
+        for size in args.viewports:
+            requests = [rng.choice(names) for _ in range(args.requests)]
+            clear_caches()
+            cold = []
+            for name in names:
+                started = time.perf_counter()
+                render_player_viewport(connection, name, size, size)
+                cold.append(time.perf_counter() - started)
+            print(f"{f'{size}x{size} cold tiles':<24} {statistics.median(cold) * 1000:>9.2f}")
+            measure(f"{size}x{size} plain json", requests, lambda name: plain_viewport(connection, name, size, size))
+            measure(f"{size}x{size} rle", requests, lambda name: render_player_viewport(connection, name, size, size))
+            measure(f"{size}x{size} rle, no names", requests,
+                    lambda name: render_player_viewport(connection, name, size, size, RLE, False))
+            measure(f"{size}x{size} zlib", requests,
+                    lambda name: render_player_viewport(connection, name, size, size, ZLIB))
+            measure(f"{size}x{size} zlib, no names", requests,
+                    lambda name: render_player_viewport(connection, name, size, size, ZLIB, False))
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark presence queries on the in-memory occupancy index against SQL, with --players simulated
+players spread over a --size x --size world:
+
+    python -m scripts.bench_occupancy --players 100000 --size 300 --queries 2000 --radius 5 20
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+from app.db import connection_pool
+from app.db.database import get_db_connection, init_db
+from app.db.occupancy import occupancy
+from scripts.bench_spatial_region import generate_grid
+
+
+def sql_occupants(connection, room_id):
+    return sorted(name for (name,) in connection.execute(
+        "SELECT name FROM players WHERE current_room_id = ?;", (room_id,)).fetchall())
+
+
+def sql_players_near(connection, name, radius):
+    x, y = connection.execute("""
+        SELECT r.x_coordinate, r.y_coordinate FROM players p JOIN rooms r ON r.id = p.current_room_id
+        WHERE p.name = ?;
+    """, (name,)).fetchone()
+    return connection.execute("""
+        SELECT p.name, r.id FROM rooms r JOIN players p ON p.current_room_id = r.id
+        WHERE r.x_coordinate BETWEEN ? AND ? AND r.y_coordinate BETWEEN ? AND ? AND p.name != ?;
+    """, (x - radius, x + radius, y - radius, y + radius, name)).fetchall()
+
+
+def measure(label, calls, query):
+    found = 0
+    started = time.perf_counter()
+    for call in calls:
+        found += len(query(*call))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<26} {len(calls) / elapsed:>12.0f} {elapsed / len(calls) * 1e6:>10.1f} {found / len(calls):>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--size", type=int, default=300, help="world edge length in rooms")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--radius", type=int, nargs="+", default=[5, 20])
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        connection = get_db_connection()
+        rooms = generate_grid(connection, args.size)
+        cells = {room_id: (x, y) for room_id, x, y in connection.execute(
+            "SELECT id, x_coordinate, y_coordinate FROM rooms;").fetchall()}
+        room_ids = list(cells)
+        rng = random.Random(0)
+        connection.executemany("INSERT INTO players (name, current_room_id) VALUES (?, ?);", [
+            (f"player{i}", rng.choice(room_ids)) for i in range(args.players)
+        ])
+        connection.execute("ANALYZE;")
+
+        started = time.perf_counter()
+        occupancy.rebuild(connection)
+        print(f"Indexed {len(occupancy)} players in {rooms} rooms in {time.perf_counter() - started:.2f}s")
+
+        rooms_queried = [(rng.choice(room_ids),) for _ in range(args.queries)]
+        players = [f"player{rng.randrange(args.players)}" for _ in range(args.queries)]
+        print(f"{'query':<26} {'queries/s':>12} {'us/query':>10} {'players':>8}")
+        measure("occupants, sql", rooms_queried, lambda room_id: sql_occupants(connection, room_id))
+        measure("occupants, index", rooms_queried, lambda room_id: occupancy.occupants(connection, room_id))
+        for radius in args.radius:
+            calls = [(name, radius) for name in players]
+            measure(f"near r={radius}, sql", calls, lambda name, r: sql_players_near(connection, name, r))
+            measure(f"near r={radius}, index", calls, lambda name, r: occupancy.players_near(connection, name, r))
+
+        moves = [(f"player{rng.randrange(args.players)}", rng.choice(room_ids)) for _ in range(100_000)]
+        started = time.perf_counter()
+        for name, room_id in moves:
+            occupancy.player_moved(name, room_id, cells[room_id])
+        print(f"Index upkeep: {(time.perf_counter() - started) / len(moves) * 1e6:.2f} us per move")
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark route planning over a generated world with --holes of its cells left unexplored.
+
+Compares a breadth-first search issuing one SQL query per room (what a client stepping through
+exits would cost) with A* over the room graph, lazily loaded and warm, and with reading routes
+to the start room from its distance field:
+
+    python -m scripts.bench_pathfinding --size 300 --holes 0.3 --queries 200 --distance 60
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import deque
+
+from app.core.pathfinding import distance_fields, find_path
+from app.db import connection_pool
+from app.db.caches import clear_caches
+from app.db.database import get_db_connection, init_db
+from app.db.models import NeighborRelationModel
+from app.db.room_graph import room_graph
+from scripts.bench_spatial_region import generate_grid
+
+
+def sql_bfs(connection, start_id, goal_id):
+    came_from = {start_id: None}
+    queue = deque([start_id])
+    while queue:
+        room_id = queue.popleft()
+        if room_id == goal_id:
+            return True
+        for (neighbor_id,) in connection.execute(
+                "SELECT neighbor_room_id FROM neighbor_relations WHERE room_id = ?;", (room_id,)).fetchall():
+            if neighbor_id not in came_from:
+                came_from[neighbor_id] = room_id
+                queue.append(neighbor_id)
+    return False
+
+
+def measure(label, pairs, route):
+    found = 0
+    started = time.perf_counter()
+    for start_id, goal_id in pairs:
+        found += bool(route(start_id, goal_id))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<24} {len(pairs) / elapsed:>10.1f} {elapsed / len(pairs) * 1000:>10.2f} {found:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=300, help="world edge length in cells")
+    parser.add_argument("--holes", type=float, default=0.3, help="fraction of cells without a room")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--distance", type=int, default=60, help="maximum grid distance between endpoints")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        connection = get_db_connection()
+        generate_grid(connection, args.size)
+        connection.execute("""
+            DELETE FROM rooms WHERE abs(random()) % 1000 < ? AND (x_coordinate, y_coordinate) != (0, 0);
+        """, (int(args.holes * 1000),))
+        connection.execute("UPDATE rooms SET name = 'start' WHERE x_coordinate = 0 AND y_coordinate = 0;")
+        NeighborRelationModel.link_grid_neighbors(connection)
+        rooms = {(x, y): room_id for room_id, x, y in connection.execute(
+            "SELECT id, x_coordinate, y_coordinate FROM rooms;").fetchall()}
+        print(f"World of {len(rooms)} rooms")
+
+        rng = random.Random(0)
+        cells = list(rooms)
+        pairs = []
+        while len(pairs) < args.queries:
+            x, y = rng.choice(cells)
+            goal = (x + rng.randint(-args.distance, args.distance), y + rng.randint(-args.distance, args.distance))
+            if goal in rooms:
+                pairs.append((rooms[(x, y)], rooms[goal]))
+        start_id = rooms[(0, 0)]
+        to_start = [(rooms[cell], start_id) for cell in rng.sample(cells, args.queries)]
+
+        print(f"{'planner':<24} {'routes/s':>10} {'ms/route':>10} {'found':>7}")
+        measure("bfs, sql per room", pairs[:max(args.queries // 10, 1)], lambda a, b: sql_bfs(connection, a, b))
+        clear_caches()
+        measure("a*, lazy graph", pairs, lambda a, b: find_path(connection, a, b))
+        measure("a*, loaded graph", pairs, lambda a, b: find_path(connection, a, b))
+        clear_caches()
+        started = time.perf_counter()
+        room_graph.warm(connection)
+        print(f"Warmed the graph in {time.perf_counter() - started:.2f}s")
+        measure("a*, warm graph", pairs, lambda a, b: find_path(connection, a, b))
+        measure("a* to start", to_start, lambda a, b: find_path(connection, a, b))
+        started = time.perf_counter()
+        field = distance_fields.get(connection, start_id)
+        print(f"Built a distance field of {len(field.distances)} rooms in {time.perf_counter() - started:.2f}s")
+        measure("distance field to start", to_start, lambda a, b: field.route_from(connection, a))
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark player actions per second sent one request per action versus in batches.
+
+Requests go through the FastAPI app in-process (no network), from --clients concurrent clients that
+each own some players and repeat move east, drop, pick up, move west:
+
+    python -m scripts.bench_player_batch --actions 4000 --clients 8 --batch-sizes 1 10 100
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from app.db import connection_pool
+from app.db.async_repository import shutdown_db_executor
+from app.db.database import get_db_connection, init_db
+from app.db.models import InventoryModel, NeighborRelationModel, PlayerModel, RoomModel
+
+PLAYERS_PER_CLIENT = 10
+
+
+def round_trip(player_name):
+    return [
+        {"player_name": player_name, "action": "move", "direction": "east"},
+        {"player_name": player_name, "action": "drop", "item_name": "Coin"},
+        {"player_name": player_name, "action": "pick_up", "item_name": "Coin"},
+        {"player_name": player_name, "action": "move", "direction": "west"},
+    ]
+
+
+def client_actions(client, count):
+    players = [f"player{client}_{i}" for i in range(PLAYERS_PER_CLIENT)]
+    actions = []
+    while len(actions) < count:
+        for player_name in players:
+            actions.extend(round_trip(player_name))
+    return actions[:count // 4 * 4]
+
+
+async def send_moves(http, actions):
+    for action in actions:
+        response = await http.post("/api/v1/player/move", json=action)
+        assert response.status_code == 200, response.text
+
+
+async def send_batches(http, actions, batch_size):
+    for start in range(0, len(actions), batch_size):
+        response = await http.post("/api/v1/player/batch", json={"actions": actions[start:start + batch_size]})
+        assert all(result["success"] for result in response.json()["results"]), response.text
+
+
+async def measure(label, workloads, send):
+    from app.main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(send(http, workload) for workload in workloads))
+        elapsed = time.perf_counter() - started
+    actions = sum(len(workload) for workload in workloads)
+    print(f"{label:<24} {actions / elapsed:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--actions", type=int, default=4000, help="actions per mode, split across the clients")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        connection = get_db_connection()
+        RoomModel.create_room(connection, "east_room", "", 1, 0)
+        NeighborRelationModel.link_grid_neighbors(connection)
+        for client in range(args.clients):
+            for i in range(PLAYERS_PER_CLIENT):
+                PlayerModel.create_player(connection, f"player{client}_{i}")
+                InventoryModel.add_item_to_player(connection, f"player{client}_{i}", "Coin")
+
+        print(f"{'mode':<24} {'actions/s':>12}")
+        workloads = [client_actions(client, args.actions // args.clients) for client in range(args.clients)]
+        moves = [[action for action in workload if action["action"] == "move"] for workload in workloads]
+        asyncio.run(measure("/move, moves only", moves, send_moves))
+        for batch_size in args.batch_sizes:
+            asyncio.run(measure(
+                f"/batch of {batch_size}", workloads,
+                lambda http, actions, size=batch_size: send_batches(http, actions, size),
+            ))
+        shutdown_db_executor()
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Count the SQL statements one /move request issues with the player cache off and on.
+
+Requests go through the FastAPI app in-process, from --clients concurrent clients that each move
+their own players back and forth between two rooms:
+
+    python -m scripts.bench_player_cache --moves 4000 --clients 8 --players 100
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from app.db import connection_pool
+from app.db.async_repository import shutdown_db_executor
+from app.db.database import get_connection, get_db_connection, init_db
+from app.db.models import NeighborRelationModel, PlayerModel, RoomModel
+from app.db.player_cache import player_cache
+
+
+class CountingConnection:
+    """Pooled connection wrapper that counts the statements sent through it."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.statements = 0
+
+    @property
+    def in_transaction(self):
+        return self.connection.in_transaction
+
+    def execute(self, sql, parameters=()):
+        self.statements += 1
+        return self.connection.execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self.statements += 1
+        return self.connection.executemany(sql, seq_of_parameters)
+
+    def after_commit(self, callback):
+        self.connection.after_commit(callback)
+
+    def __enter__(self):
+        self.connection.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self.connection.__exit__(*exc_info)
+
+
+async def send_moves(http, players, moves, in_east_room):
+    for i in range(moves):
+        name = players[i % len(players)]
+        direction = "west" if name in in_east_room else "east"
+        response = await http.post("/api/v1/player/move", json={"player_name": name, "direction": direction})
+        assert response.status_code == 200, response.text
+        in_east_room.symmetric_difference_update({name})
+
+
+async def measure(label, connection, clients, in_east_room):
+    from app.main import app
+    app.dependency_overrides[get_connection] = lambda: connection
+    before = connection.statements
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(send_moves(http, players, moves, in_east_room) for players, moves in clients))
+        elapsed = time.perf_counter() - started
+    total = sum(moves for _, moves in clients)
+    print(f"{label:<12} {(connection.statements - before) / total:>14.2f} {total / elapsed:>10.0f} "
+          f"{player_cache.hits:>8} {player_cache.request_hits:>13} {player_cache.misses:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--moves", type=int, default=4000, help="moves per mode, split across the clients")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--players", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        RoomModel.create_room(get_db_connection(), "east_room", "", 1, 0)
+        NeighborRelationModel.link_grid_neighbors(get_db_connection())
+        names = [f"player{i}" for i in range(args.players)]
+        for name in names:
+            PlayerModel.create_player(get_db_connection(), name)
+        clients = [(names[c::args.clients], args.moves // args.clients) for c in range(args.clients)]
+
+        in_east_room = set()
+        connection = CountingConnection(get_db_connection())
+        print(f"{'cache':<12} {'queries/move':>14} {'moves/s':>10} {'hits':>8} {'request hits':>13} {'misses':>8}")
+        size = player_cache.max_players
+        player_cache.max_players = 0
+        asyncio.run(measure("off", connection, clients, in_east_room))
+        player_cache.max_players = size
+        player_cache.clear()
+        asyncio.run(measure("on, cold", connection, clients, in_east_room))
+        asyncio.run(measure("on, warm", connection, clients, in_east_room))
+        shutdown_db_executor()
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark moves per second on a generated --size x --size grid (1000 x 1000 by default).
+
+Compares resolving each move with a neighbor_relations query against the in-memory room graph,
+loaded lazily per chunk (the chunks the players start in are loaded before measuring, and their
+cost reported) and warmed up front. Player locations use write-behind so the writer
+does not hide the cost of resolving the move:
+
+    python -m scripts.bench_room_graph --size 1000 --seconds 2 --clients 1 8
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+from app.core.game_engine import GameEngine
+from app.core.grid import DIRECTIONS
+from app.db import connection_pool
+from app.db.caches import clear_caches
+from app.db.database import get_db_connection, init_db, enable_location_write_behind, disable_location_write_behind
+from app.db.models import NeighborRelationModel, PlayerModel
+from app.db.room_graph import room_graph
+from scripts.bench_spatial_region import generate_grid
+
+PLAYERS = 1000
+
+
+def sql_move(connection, player_name, direction):
+    # The per-move lookup the graph replaces: one indexed query on neighbor_relations.
+    player = PlayerModel.get_player_by_name(connection, player_name)
+    row = connection.execute("""
+        SELECT neighbor_room_id FROM neighbor_relations WHERE room_id = ? AND direction = ?;
+    """, (player.current_room_id, direction)).fetchone()
+    if row is not None:
+        PlayerModel.update_player_location(connection, player_name, row[0])
+
+
+def run(clients, seconds, move):
+    counts = [0] * clients
+    stop = threading.Event()
+
+    def client(index):
+        rng = random.Random(index)
+        while not stop.is_set():
+            move(f"player{rng.randrange(PLAYERS)}", rng.choice(DIRECTIONS))
+            counts[index] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1000, help="world edge length in rooms")
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of each measurement")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+    # Walking into the edge of the world is expected here; do not log every refused move.
+    logging.disable(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        connection = get_db_connection()
+        started = time.perf_counter()
+        rooms = generate_grid(connection, args.size)
+        relations = NeighborRelationModel.link_grid_neighbors(connection)
+        print(f"Generated {rooms} rooms and {relations} relations in {time.perf_counter() - started:.1f}s")
+        rng = random.Random(0)
+        player_rooms = [rng.randint(1, rooms) for _ in range(PLAYERS)]
+        connection.executemany("""
+            INSERT INTO players (name, current_room_id) VALUES (?, ?);
+        """, [(f"player{i}", room_id) for i, room_id in enumerate(player_rooms)])
+
+        game_engine = GameEngine()
+        enable_location_write_behind()
+        print(f"{'mode':<12} {'clients':>7} {'moves/s':>10} {'chunk loads':>12}")
+        for clients in args.clients:
+            moves = run(clients, args.seconds, lambda name, direction: sql_move(connection, name, direction))
+            print(f"{'sql lookup':<12} {clients:>7} {moves:>10.0f} {'-':>12}")
+
+            # Lazy loading: the first move in a chunk loads it, as each player's first move would.
+            clear_caches()
+            load_started = time.perf_counter()
+            for room_id in set(player_rooms):
+                room_graph.neighbors(connection, room_id)
+            loads = room_graph.chunk_loads
+            load_ms = (time.perf_counter() - load_started) * 1000 / max(loads, 1)
+            moves = run(clients, args.seconds, lambda name, direction: game_engine.move(connection, name, direction))
+            print(f"{'graph, lazy':<12} {clients:>7} {moves:>10.0f} {room_graph.chunk_loads:>12}"
+                  f"  ({loads} first loads, {load_ms:.1f} ms each)")
+
+            clear_caches()
+            warm_started = time.perf_counter()
+            room_graph.warm(connection)
+            warm_seconds = time.perf_counter() - warm_started
+            moves = run(clients, args.seconds, lambda name, direction: game_engine.move(connection, name, direction))
+            print(f"{'graph, warm':<12} {clients:>7} {moves:>10.0f} {room_graph.chunk_loads:>12}"
+                  f"  (warm-up {warm_seconds:.1f}s)")
+        disable_location_write_behind()
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Microbenchmark of allocations and time per player and room lookup.
+
+"before" is the previous SELECT * with sqlite3.Row (plus the dict(row) copy the movement
+path made); "after" is the column-projected model methods returning slotted records:
+
+    python -m scripts.bench_row_records --calls 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.db import connection_pool
+from app.db.database import get_db_connection, init_db
+from app.db.models import PlayerModel, RoomModel
+
+DESCRIPTION = "A long and richly detailed room description. " * 20
+
+
+def legacy_get_player_by_name(connection, name):
+    player = connection.execute("SELECT * FROM players WHERE name = ?;", (name,)).fetchone()
+    return dict(player)
+
+
+def legacy_get_room_by_coordinates(connection, coordinates):
+    return connection.execute("""
+        SELECT * FROM rooms WHERE x_coordinate = ? AND y_coordinate = ?;
+    """, (coordinates["x"], coordinates["y"])).fetchone()
+
+
+def measure(fn, connection, argument, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn(connection, argument)
+    elapsed = time.perf_counter() - start
+
+    # Bytes held by the returned object and transient peak, averaged over a sample of calls.
+    samples = min(calls, 1000)
+    retained = peak = 0
+    tracemalloc.start()
+    for _ in range(samples):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = fn(connection, argument)
+        current, call_peak = tracemalloc.get_traced_memory()
+        retained += current - baseline
+        peak += call_peak - baseline
+        del result
+    tracemalloc.stop()
+    return elapsed / calls * 1e6, retained // samples, peak // samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        connection = get_db_connection()
+        PlayerModel.create_player(connection, "TestPlayer")
+        RoomModel.create_room(connection, "east_room", DESCRIPTION, 1, 0)
+
+        cases = [
+            ("get_player_by_name", "before", legacy_get_player_by_name, "TestPlayer"),
+            ("get_player_by_name", "after", PlayerModel.get_player_by_name, "TestPlayer"),
+            ("get_room_by_coordinates", "before", legacy_get_room_by_coordinates, {"x": 1, "y": 0}),
+            ("get_room_by_coordinates", "after", RoomModel.get_room_by_coordinates, {"x": 1, "y": 0}),
+        ]
+        print(f"{'call':<24} {'version':<7} {'us/call':>8} {'result bytes':>12} {'peak bytes':>11}")
+        for name, version, fn, argument in cases:
+            per_call, result_bytes, peak = measure(fn, connection, argument, args.calls)
+            print(f"{name:<24} {version:<7} {per_call:>8.1f} {result_bytes:>12} {peak:>11}")
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark viewport region queries over a generated world of --size x --size rooms (1M by default).
+
+Compares a plain coordinate range query with chunked queries against a cold and a warm chunk cache,
+the warm case panning the viewport one cell at a time as a walking player would:
+
+    python -m scripts.bench_spatial_region --size 1000 --viewport 48 32 --queries 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.db import connection_pool
+from app.db.caches import clear_caches
+from app.db.database import get_db_connection, init_db
+from app.db.models import RoomModel
+
+
+def generate_grid(connection, size):
+    """Fill rooms with a size x size grid starting at the origin; returns the number of rooms."""
+    connection.execute("""
+        INSERT OR IGNORE INTO rooms (name, description, x_coordinate, y_coordinate, terrain_type)
+        WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+        SELECT 'room_' || (i % ?) || '_' || (i / ?), '', i % ?, i / ?, 'plains' FROM n;
+    """, (size * size, size, size, size, size))
+    connection.execute("ANALYZE;")
+    return connection.execute("SELECT COUNT(*) FROM rooms;").fetchone()[0]
+
+
+def range_query(connection, x0, y0, x1, y1):
+    return connection.execute("""
+        SELECT id, name, x_coordinate, y_coordinate, terrain_type FROM rooms
+        WHERE x_coordinate BETWEEN ? AND ? AND y_coordinate BETWEEN ? AND ?;
+    """, (x0, x1, y0, y1)).fetchall()
+
+
+def measure(label, viewports, query):
+    latencies = []
+    rooms = 0
+    started = time.perf_counter()
+    for x0, y0, x1, y1 in viewports:
+        query_started = time.perf_counter()
+        rooms += len(query(x0, y0, x1, y1))
+        latencies.append(time.perf_counter() - query_started)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:<20} {len(viewports) / elapsed:>10.0f} {statistics.median(latencies) * 1000:>9.3f} "
+          f"{p99 * 1000:>9.3f} {rooms / len(viewports):>8.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1000, help="world edge length in rooms")
+    parser.add_argument("--viewport", type=int, nargs=2, default=[48, 32], metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    width, height = args.viewport
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        connection = get_db_connection()
+        started = time.perf_counter()
+        rooms = generate_grid(connection, args.size)
+        print(f"Generated {rooms} rooms in {time.perf_counter() - started:.1f}s")
+
+        rng = random.Random(0)
+        random_viewports = []
+        for _ in range(args.queries):
+            x, y = rng.randrange(args.size - width), rng.randrange(args.size - height)
+            random_viewports.append((x, y, x + width - 1, y + height - 1))
+        x, y = args.size // 2, args.size // 2
+        panning_viewports = []
+        for _ in range(args.queries):
+            dx, dy = rng.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
+            x = min(max(x + dx, 0), args.size - width)
+            y = min(max(y + dy, 0), args.size - height)
+            panning_viewports.append((x, y, x + width - 1, y + height - 1))
+
+        print(f"{'query':<20} {'queries/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'rooms':>8}")
+        measure("range scan", random_viewports, lambda *box: range_query(connection, *box))
+        measure("range scan, panning", panning_viewports, lambda *box: range_query(connection, *box))
+
+        def chunked(*box):
+            return RoomModel.get_rooms_in_region(connection, *box)
+
+        def chunked_cold(*box):
+            clear_caches()
+            return chunked(*box)
+
+        measure("chunks, cold cache", random_viewports, chunked_cold)
+        clear_caches()
+        measure("chunks, panning", panning_viewports, chunked)
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
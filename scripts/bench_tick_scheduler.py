@@ -0,0 +1,83 @@
+"""
+Benchmark /move applied per request versus on a fixed tick, under many concurrent clients.
+
+Each client awaits the /move handler directly (leaving the HTTP stack out, which costs more than
+the move itself when run in-process) and moves its own player back and forth between two rooms
+for --seconds:
+
+    python -m scripts.bench_tick_scheduler --clients 64 256 --tick-rates 20 50 --seconds 3
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from app.api.v1.player import PlayerMove, move_player
+from app.core.tick_scheduler import get_tick_scheduler, start_tick_scheduler, stop_tick_scheduler
+from app.db import connection_pool
+from app.db.async_repository import shutdown_db_executor
+from app.db.database import get_db_connection, init_db
+from app.db.models import NeighborRelationModel, PlayerModel, RoomModel
+
+
+# Players currently in the east room, carried over from one run to the next.
+in_east_room = set()
+
+
+async def client(connection, name, deadline, latencies):
+    while time.perf_counter() < deadline:
+        direction = "west" if name in in_east_room else "east"
+        started = time.perf_counter()
+        await move_player(PlayerMove(player_name=name, direction=direction), connection=connection)
+        latencies.append(time.perf_counter() - started)
+        in_east_room.symmetric_difference_update({name})
+
+
+async def measure(label, clients, seconds, tick_rate):
+    connection = get_db_connection()
+    if tick_rate:
+        await start_tick_scheduler(connection, tick_rate)
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(client(connection, f"player{i}", deadline, latencies) for i in range(clients)))
+    ticks = ""
+    if tick_rate:
+        stats = get_tick_scheduler().stats.as_dict()
+        ticks = f"{stats['mean_duration_ms']:>9.1f} {stats['max_queue_depth']:>9}"
+        await stop_tick_scheduler()
+    latencies.sort()
+    print(f"{label:<14} {clients:>7} {len(latencies) / seconds:>9.0f} {statistics.median(latencies) * 1000:>8.1f} "
+          f"{latencies[int(len(latencies) * 0.99) - 1] * 1000:>8.1f} {ticks}")
+
+
+def main():
+    logging.disable(logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[64, 256])
+    parser.add_argument("--tick-rates", type=float, nargs="+", default=[20, 50])
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        connection = get_db_connection()
+        RoomModel.create_room(connection, "east_room", "", 1, 0)
+        NeighborRelationModel.link_grid_neighbors(connection)
+        for i in range(max(args.clients)):
+            PlayerModel.create_player(connection, f"player{i}")
+
+        print(f"{'mode':<14} {'clients':>7} {'moves/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'tick ms':>9} {'max queue':>9}")
+        for clients in args.clients:
+            asyncio.run(measure("per request", clients, args.seconds, 0))
+            for tick_rate in args.tick_rates:
+                asyncio.run(measure(f"tick {tick_rate:g} Hz", clients, args.seconds, tick_rate))
+        shutdown_db_executor()
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
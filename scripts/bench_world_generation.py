@@ -0,0 +1,144 @@
+"""
+Benchmark world generation end to end against the local fake LLM provider: --explorers players
+each take --steps random steps from the start room, generating every cell they step into that
+does not exist yet, through the LLM scheduler, single-flight and streaming paths the app uses.
+Reports rooms saved per second, the latency of generating the cell an explorer is entering, and
+database write throughput:
+
+    python -m scripts.bench_world_generation --explorers 10 50 200 --steps 20 --latency 0.5 --jitter 0.2
+
+--mode full waits for whole answers (generate_connected_room) instead of streaming them.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.core.fake_llm import FakeLlmServer
+from app.core.gpt_service import close_gpt_client, start_gpt_client
+from app.core.grid import DIRECTION_OFFSETS, DIRECTIONS
+from app.core.llm_scheduler import LlmScheduler, set_llm_scheduler
+from app.core.services.world_generation_service import WorldGenerationService, room_generations
+from app.db import connection_pool
+from app.db.caches import clear_caches
+from app.db.database import get_db_connection, init_db
+from app.db.models import RoomModel
+
+
+class TimedWorldGenerationService(WorldGenerationService):
+    """Counts room inserts and the time spent on them."""
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.writes = 0
+        self.write_seconds = 0.0
+
+    def save_map_room_to_db(self, room_data: dict):
+        started = time.perf_counter()
+        super().save_map_room_to_db(room_data)
+        self.write_seconds += time.perf_counter() - started
+        self.writes += 1
+
+
+async def enter_full(service, x, y, direction):
+    """Generate with one whole answer, then save every location, as a non-streaming caller would."""
+    answer = await service.generate_connected_room({"x": x, "y": y}, direction, use_cache=False)
+    dx, dy = DIRECTION_OFFSETS[direction]
+    entered = {"error": "The requested room was not generated."}
+    for location in answer.get("locations", []):
+        room_data = {"name": location["name"], "description": location["description"],
+                     "grid_coordinates": {"x": int(location["coords"]["x"]), "y": int(location["coords"]["y"])}}
+        if service.get_existing_room(room_data["grid_coordinates"]) is None:
+            service.save_map_room_to_db(room_data)
+        if room_data["grid_coordinates"] == {"x": x + dx, "y": y + dy}:
+            entered = room_data
+    return entered, None
+
+
+async def explorer(service, rng, steps, mode, latencies, neighbor_tasks):
+    x, y = 0, 0
+    for _ in range(steps):
+        direction = rng.choice(DIRECTIONS)
+        dx, dy = DIRECTION_OFFSETS[direction]
+        if RoomModel.get_room_by_coordinates(service.connection, {"x": x + dx, "y": y + dy}) is None:
+            started = time.perf_counter()
+            if mode == "stream":
+                room, neighbors = await service.enter_connected_room({"x": x, "y": y}, direction, use_cache=False)
+            else:
+                room, neighbors = await enter_full(service, x, y, direction)
+            latencies.append(time.perf_counter() - started)
+            if neighbors is not None:
+                neighbor_tasks.append(neighbors)
+            if "error" in room:
+                continue
+        x, y = x + dx, y + dy
+
+
+async def measure(args, explorers):
+    connection = get_db_connection()
+    connection.execute("DELETE FROM neighbor_relations;")
+    connection.execute("DELETE FROM rooms WHERE name != 'start';")
+    clear_caches()
+    scheduler = LlmScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+                             backoff_base=0.1, backoff_max=2.0)
+    set_llm_scheduler(scheduler)
+    coalesced = room_generations.coalesced
+    service = TimedWorldGenerationService(connection)
+    latencies, neighbor_tasks = [], []
+
+    async with FakeLlmServer(seed=args.seed, latency=args.latency, jitter=args.jitter,
+                             tokens_per_second=args.tokens_per_second, error_rate=args.error_rate) as server:
+        await start_gpt_client(api_key="fake", model="fake", base_url=server.base_url,
+                               max_concurrency=args.concurrency)
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            explorer(service, random.Random(args.seed * 100003 + i), args.steps, args.mode, latencies, neighbor_tasks)
+            for i in range(explorers)
+        ))
+        await asyncio.gather(*neighbor_tasks, return_exceptions=True)
+        elapsed = time.perf_counter() - started
+        await close_gpt_client()
+        await scheduler.close()
+
+    rooms = connection.execute("SELECT COUNT(*) FROM rooms WHERE name != 'start';").fetchone()[0]
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000 if latencies else 0.0
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000 if latencies else 0.0
+    write_rate = service.writes / service.write_seconds if service.write_seconds else 0.0
+    print(f"{explorers:>9} {len(server.requests):>8} {room_generations.coalesced - coalesced:>9} "
+          f"{scheduler.stats.retries:>7} {rooms:>7} {rooms / elapsed:>9.1f} {p50:>8.0f} {p99:>8.0f} "
+          f"{service.writes:>7} {write_rate:>10.0f} {service.write_seconds / elapsed * 100:>7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--explorers", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--steps", type=int, default=20, help="random steps per explorer")
+    parser.add_argument("--mode", choices=["stream", "full"], default="stream")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake provider seconds to first byte")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=400, help="fake provider generation speed")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=64, help="LLM calls in flight (GPT_MAX_CONCURRENCY)")
+    parser.add_argument("--rpm", type=float, default=0, help="scheduler requests per minute (0 = unlimited)")
+    parser.add_argument("--tpm", type=float, default=0, help="scheduler tokens per minute (0 = unlimited)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        init_db()
+        print(f"{'explorers':>9} {'llm reqs':>8} {'coalesced':>9} {'retries':>7} {'rooms':>7} {'rooms/s':>9} "
+              f"{'p50 ms':>8} {'p99 ms':>8} {'writes':>7} {'writes/s':>10} {'db busy':>8}")
+        for explorers in args.explorers:
+            asyncio.run(measure(args, explorers))
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
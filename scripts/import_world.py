@@ -0,0 +1,32 @@
+"""
+Import a generated world file ({"locations": [...]}) into the game database.
+
+The file is streamed, so it may be far larger than memory:
+
+    python -m scripts.import_world scratch/example_generated_connected_grid.json --batch-size 1000
+"""
+import argparse
+
+from app.core.services.world_import_service import WorldImportService
+from app.db import connection_pool
+from app.db.database import get_db_connection, init_db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="world JSON file to import")
+    parser.add_argument("--batch-size", type=int, default=1000, help="locations per transaction")
+    args = parser.parse_args()
+
+    init_db()
+    stats = WorldImportService(get_db_connection(), batch_size=args.batch_size).import_file(args.path)
+    connection_pool.close_pool()
+    print(
+        f"Imported {stats['rooms']} rooms, {stats['features']} features, {stats['ambience']} sounds/smells "
+        f"and {stats['neighbor_relations']} neighbor relations in {stats['seconds']:.2f}s "
+        f"({stats['rows_per_second']:.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
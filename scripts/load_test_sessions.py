@@ -0,0 +1,192 @@
+"""
+Load test the WebSocket session endpoint with --sessions concurrent players, each making --actions
+moves and waiting for every reply before sending the next:
+
+    python -m scripts.load_test_sessions --sessions 2000 --actions 20 --size 30
+
+By default the app runs in this process behind a minimal ASGI WebSocket driver, against a fresh
+--size x --size world. Point --url at a running server instead to include the network and the
+server's WebSocket implementation (players are registered through the HTTP API first):
+
+    uvicorn app.main:app --ws websockets &
+    python -m scripts.load_test_sessions --url ws://127.0.0.1:8000/api/v1/session/ws --sessions 2000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import statistics
+import tempfile
+import time
+
+from app.core.tick_scheduler import start_tick_scheduler, stop_tick_scheduler
+from app.db import connection_pool
+from app.db.database import get_db_connection, init_db
+from app.db.models import NeighborRelationModel
+from app.db.occupancy import occupancy
+from scripts.bench_spatial_region import generate_grid
+
+SESSION_PATH = "/api/v1/session/ws"
+
+
+class InProcessWebSocket:
+    """Drive an ASGI app's WebSocket endpoint directly, the way a server would."""
+
+    def __init__(self, app, path: str):
+        self.app = app
+        self.path = path
+        self._to_app = asyncio.Queue()
+        self._from_app = asyncio.Queue()
+        self._task = None
+
+    async def connect(self):
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "http_version": "1.1",
+            "path": self.path, "raw_path": self.path.encode(), "root_path": "", "query_string": b"",
+            "headers": [], "subprotocols": [], "client": ("127.0.0.1", 0), "server": ("load-test", 80),
+        }
+        self._task = asyncio.create_task(self.app(scope, self._to_app.get, self._from_app.put))
+        await self._to_app.put({"type": "websocket.connect"})
+        message = await self._from_app.get()
+        if message["type"] != "websocket.accept":
+            raise ConnectionError(f"Refused: {message}")
+        return self
+
+    async def send(self, text: str):
+        await self._to_app.put({"type": "websocket.receive", "text": text})
+
+    async def recv(self) -> str:
+        message = await self._from_app.get()
+        if message["type"] == "websocket.close":
+            raise ConnectionError(f"Closed: {message.get('code')} {message.get('reason', '')}")
+        return message["text"]
+
+    async def close(self):
+        await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        await self._task
+
+
+async def _connect_remote(url: str):
+    import websockets
+    return await websockets.connect(url, max_queue=64)
+
+
+async def _close_remote(websocket):
+    await websocket.close()
+
+
+async def run_session(open_socket, close_socket, name: str, actions: int, seed: int, stats: dict):
+    websocket = await open_socket()
+    try:
+        await websocket.send(json.dumps({"player_name": name}))
+        exits = None
+        greeting = set()
+        while not {"welcome", "room", "inventory"} <= greeting:
+            message = json.loads(await websocket.recv())
+            greeting.add(message["type"])
+            if message["type"] == "room":
+                exits = message["exits"]
+            elif message["type"] == "presence":
+                stats["pushes"] += 1
+        stats["connected"] += 1
+        rng = random.Random(seed)
+        for action_id in range(actions):
+            sent = time.perf_counter()
+            await websocket.send(json.dumps({"id": action_id, "action": "move", "direction": rng.choice(exits)}))
+            while True:
+                message = json.loads(await websocket.recv())
+                if message["type"] == "result" and message["id"] == action_id:
+                    stats["latencies"].append(time.perf_counter() - sent)
+                    stats["failed"] += not message["success"]
+                    break
+                if message["type"] == "room":
+                    exits = message["exits"]
+                elif message["type"] == "presence":
+                    stats["pushes"] += 1
+            # The room entered follows its move's result.
+            if message["success"]:
+                room = json.loads(await websocket.recv())
+                while room["type"] != "room":
+                    stats["pushes"] += 1
+                    room = json.loads(await websocket.recv())
+                exits = room["exits"]
+    finally:
+        await close_socket(websocket)
+
+
+async def load_test(args, open_socket, close_socket, connection=None):
+    if args.tick_rate and connection is not None:
+        await start_tick_scheduler(connection, args.tick_rate)
+    stats = {"connected": 0, "failed": 0, "pushes": 0, "latencies": []}
+    names = [f"player{i}" for i in range(args.sessions)]
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        run_session(open_socket, close_socket, name, args.actions, i, stats) for i, name in enumerate(names)
+    ), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    errors = [result for result in results if isinstance(result, Exception)]
+    latencies = sorted(stats["latencies"])
+    print(f"{stats['connected']} sessions, {len(latencies)} moves in {elapsed:.2f}s: "
+          f"{len(latencies) / elapsed:.0f} moves/s, {stats['failed']} refused, {stats['pushes']} presence pushes")
+    if latencies:
+        print(f"Move latency: p50 {statistics.median(latencies) * 1000:.1f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+    if errors:
+        print(f"{len(errors)} sessions failed, e.g. {errors[0]!r}")
+    await stop_tick_scheduler()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--actions", type=int, default=20, help="moves per session")
+    parser.add_argument("--size", type=int, default=30, help="world edge length in rooms (in-process only)")
+    parser.add_argument("--tick-rate", type=float, default=0,
+                        help="apply actions on a fixed tick at this rate (in-process only; 0 = per action)")
+    parser.add_argument("--url", help="ws:// URL of a running server's session endpoint")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if args.url:
+        import httpx
+        base = args.url.replace("ws", "http", 1).split("/api/")[0]
+        with httpx.Client(base_url=base) as client:
+            for i in range(args.sessions):
+                client.post("/api/v1/player/register", json={"name": f"player{i}"})
+        asyncio.run(load_test(args, lambda: _connect_remote(args.url), _close_remote))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DB_PATH"] = os.path.join(directory, "bench.db")
+        os.environ.setdefault("SESSION_MAX_SESSIONS", str(args.sessions))
+        from app.core.game_session import sessions
+        from app.main import app
+
+        init_db()
+        connection = get_db_connection()
+        generate_grid(connection, args.size)
+        NeighborRelationModel.link_grid_neighbors(connection)
+        room_ids = [room_id for (room_id,) in connection.execute(
+            "SELECT id FROM rooms WHERE name LIKE 'room_%';").fetchall()]
+        rng = random.Random(0)
+        connection.executemany("INSERT INTO players (name, current_room_id) VALUES (?, ?);", [
+            (f"player{i}", rng.choice(room_ids)) for i in range(args.sessions)
+        ])
+        occupancy.rebuild(connection)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        asyncio.run(load_test(
+            args, lambda: InProcessWebSocket(app, SESSION_PATH).connect(), InProcessWebSocket.close, connection
+        ))
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(f"Peak RSS grew {(rss_after - rss_before) / 1024:.1f} MiB "
+              f"({(rss_after - rss_before) / max(args.sessions, 1):.1f} KiB per session, client included); "
+              f"server stats: {sessions.stats()}")
+        connection_pool.close_pool()
+
+
+if __name__ == "__main__":
+    main()
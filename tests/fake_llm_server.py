@@ -0,0 +1,18 @@
+# tests/fake_llm_server.py
+#
+# The app's fake LLM provider (app.core.fake_llm) answering every request with the same fixed text,
+# so tests can assert on exact answers while it records how many requests overlapped and how many
+# connections were opened.
+
+from app.core.fake_llm import FakeLlmServer
+
+GLADE = '{"name": "Fake Glade", "description": "A quiet glade."}'
+
+
+class FakeChatServer(FakeLlmServer):
+    def __init__(self, content: str = GLADE, delay: float = 0.0, chunk_size: int = 16, tokens_per_second: float = 0.0):
+        """
+        :param delay: Seconds before each answer.
+        :param tokens_per_second: Streaming and generation speed, at four characters per token (0 = instant).
+        """
+        super().__init__(latency=delay, content=content, chunk_size=chunk_size, tokens_per_second=tokens_per_second)
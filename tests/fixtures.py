@@ -3,8 +3,14 @@ import pytest
 from app.core.game_engine import GameEngine
 from app.core.inventory_handler import InventoryHandler
 from app.core.services.world_generation_service import WorldGenerationService
-from app.db.models import PlayerModel, RoomModel, InventoryModel, NeighborRelationModel
-from app.db.database import get_singleton_db_connection, init_db
+from app.core.fake_llm import FakeLlmServer
+from app.core.gpt_service import set_gpt_client
+from app.core.llm_cache import LlmResponseCache, set_llm_cache
+from app.core.llm_scheduler import LlmScheduler, set_llm_scheduler
+from app.db.models import RoomModel, NeighborRelationModel
+from app.db.caches import clear_caches
+from app.db.database import get_db_connection
+from app.db.migrations import migrate
 import logging
 import os
 
@@ -33,34 +39,36 @@ def game_engine():
 
 @pytest.fixture(scope="function")
 def setup_test_db():
-    """Sets up a persistent SQLite database for testing using the singleton connection."""
-    logger.info("Setting up a persistent SQLite database for testing using the singleton connection.")
-    connection = get_singleton_db_connection()
+    """Sets up a persistent SQLite database for testing using the pooled connection."""
+    logger.info("Setting up a persistent SQLite database for testing using the pooled connection.")
+    connection = get_db_connection()
 
     # Drop and recreate tables to ensure schema is up to date
     logger.info("Dropping existing tables if they exist.")
-    connection.execute("DROP TABLE IF EXISTS rooms;")
-    connection.execute("DROP TABLE IF EXISTS players;")
-    connection.execute("DROP TABLE IF EXISTS inventory;")
+    tables = connection.execute("""
+        SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%';
+    """).fetchall()
+    for table in tables:
+        connection.execute(f"DROP TABLE IF EXISTS {table[0]};")
 
-    # Initialize tables with the updated schema
+    # Initialize tables with the updated schema and forget anything cached from the old tables
     logger.info("Creating tables with the updated schema.")
-    PlayerModel.create_table(connection)
-    RoomModel.create_table(connection)
-    InventoryModel.create_table(connection)
-    NeighborRelationModel.create_table(connection)
+    migrate(connection)
+    clear_caches()
 
     # Clear any existing data to ensure a clean state
     logger.info("Clearing existing data from players, rooms, and inventory tables.")
     connection.execute("DELETE FROM players;")
     connection.execute("DELETE FROM rooms;")
     connection.execute("DELETE FROM inventory;")
+    connection.execute("DELETE FROM neighbor_relations;")
 
     # Create initial rooms with coordinates
     logger.info("Creating initial rooms: 'start', 'east_room', and 'west_room'.")
     RoomModel.create_room(connection, "start", "The starting point of your journey.", 0, 0)
     RoomModel.create_room(connection, "east_room", "You have entered the east room.", 1, 0)
     RoomModel.create_room(connection, "west_room", "You have entered the west room.", -1, 0)
+    NeighborRelationModel.link_grid_neighbors(connection)
 
     yield connection  # Provide the connection to the test function
 
@@ -83,4 +91,41 @@ def world_service(setup_test_db):
     """
     Fixture to set up the WorldGenerationService with a test database connection.
     """
-    return WorldGenerationService(setup_test_db)
\ No newline at end of file
+    return WorldGenerationService(setup_test_db)
+
+@pytest.fixture
+def llm_response_cache(tmp_path):
+    """Provides an empty LLM response cache in a temporary file, used by get_gpt_response for the test."""
+    cache = LlmResponseCache(str(tmp_path / "llm_cache.db"))
+    set_llm_cache(cache)
+    yield cache
+    set_llm_cache(None)
+    cache.close()
+
+
+@pytest.fixture
+def llm_scheduler():
+    """Provides an LLM scheduler with short backoffs, used by get_gpt_response for the test."""
+    scheduler = LlmScheduler(backoff_base=0.02, backoff_max=0.1)
+    set_llm_scheduler(scheduler)
+    yield scheduler
+    set_llm_scheduler(None)
+
+
+@pytest.fixture
+def llm_backend(monkeypatch, llm_response_cache):
+    """
+    Points the LLM client at the real API when OPENAI_API_KEY is set, otherwise at the seeded local
+    fake provider, served from its own thread so synchronous test clients can use it too.
+    """
+    if os.getenv("OPENAI_API_KEY"):
+        yield None
+        return
+    server = FakeLlmServer(seed=0).start_in_thread()
+    monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+    monkeypatch.setenv("OPENAI_API_KEY", "fake")
+    monkeypatch.setenv("AI_MODEL", "fake")
+    set_gpt_client(None)
+    yield server
+    set_gpt_client(None)
+    server.stop_thread()
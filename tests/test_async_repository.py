@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from app.db.async_repository import AsyncPlayerRepository, AsyncRoomRepository, AsyncInventoryRepository
+from tests.fixtures import setup_test_db
+
+logger = logging.getLogger(__name__)
+
+# Counts to a million in SQLite; takes a noticeable fraction of a second.
+SLOW_QUERY = """
+    WITH RECURSIVE counter(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM counter LIMIT 1000000)
+    SELECT COUNT(*) FROM counter;
+"""
+
+
+@pytest.mark.asyncio
+async def test_async_repositories_mirror_models(setup_test_db):
+    """Test the awaitable player, room and inventory methods against the test database."""
+    logger.info("Starting test: test_async_repositories_mirror_models")
+    # Given
+    players = AsyncPlayerRepository(setup_test_db)
+    rooms = AsyncRoomRepository(setup_test_db)
+    inventory = AsyncInventoryRepository(setup_test_db)
+    await players.create_player("TestPlayer")
+
+    # When
+    await players.update_player_location("TestPlayer", "east_room")
+    await inventory.add_item_to_player("TestPlayer", "Magic Sword")
+
+    # Then
+    player = await players.get_player_by_name("TestPlayer")
+    assert player["current_room"] == "east_room"
+    room = await rooms.get_room_by_coordinates({"x": 1, "y": 0})
+    assert room["name"] == "east_room"
+    assert await inventory.get_player_inventory("TestPlayer") == ["Magic Sword"]
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_slow_query(setup_test_db):
+    """Test that unrelated coroutines keep running while a long query is in flight."""
+    logger.info("Starting test: test_event_loop_stays_responsive_during_slow_query")
+    # Given
+    players = AsyncPlayerRepository(setup_test_db)
+    await players.create_player("TestPlayer")
+    gaps = []
+
+    async def heartbeat(stop):
+        last = time.perf_counter()
+        while not stop.is_set():
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    # When - a slow query runs alongside a heartbeat and an unrelated lookup
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stop))
+    started = time.perf_counter()
+    slow = asyncio.create_task(players.run(lambda connection: connection.execute(SLOW_QUERY).fetchone()[0]))
+    await asyncio.sleep(0.05)
+    lookup_started = time.perf_counter()
+    player = await players.get_player_by_name("TestPlayer")
+    lookup_latency = time.perf_counter() - lookup_started
+    count = await slow
+    slow_duration = time.perf_counter() - started
+    stop.set()
+    await beat
+
+    # Then
+    logger.info(f"Slow query took {slow_duration:.3f}s, lookup {lookup_latency:.4f}s, max gap {max(gaps):.4f}s")
+    assert count == 1000000
+    assert player["name"] == "TestPlayer"
+    assert lookup_latency < slow_duration / 2
+    assert max(gaps) < slow_duration / 2
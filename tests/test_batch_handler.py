@@ -0,0 +1,136 @@
+import logging
+
+import pytest
+
+from app.api.v1.player import PlayerBatch, run_batch
+from app.core.batch_handler import BatchHandler, ROLLBACK, STOP
+from app.db.models import InventoryModel, PlayerModel
+from tests.fixtures import setup_test_db
+
+logger = logging.getLogger(__name__)
+
+
+def _move(player_name, direction):
+    return {"player_name": player_name, "action": "move", "direction": direction}
+
+
+def _item(action, player_name, item_name, quantity=1):
+    return {"player_name": player_name, "action": action, "item_name": item_name, "quantity": quantity}
+
+
+def test_batch_runs_actions_in_order(setup_test_db):
+    """Test that a batch moves players and carries items between rooms as the actions are listed."""
+    logger.info("Starting test: test_batch_runs_actions_in_order")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    PlayerModel.create_player(setup_test_db, name="Bob")
+    InventoryModel.add_item_to_room(setup_test_db, "east_room", "Torch", quantity=2)
+
+    # When - Alice carries a torch from the east room to the west room; Bob steps west
+    result = BatchHandler().run(setup_test_db, [
+        _move("Alice", "east"),
+        _item("pick_up", "Alice", "Torch"),
+        _move("Bob", "west"),
+        _move("Alice", "west"),
+        _move("Alice", "west"),
+        _item("drop", "Alice", "Torch"),
+        _item("pick_up", "Alice", "Torch"),
+        {"player_name": "Alice", "action": "view_inventory"},
+    ])
+
+    # Then
+    assert result["committed"] is True
+    assert [r["success"] for r in result["results"]] == [True] * 8
+    assert result["results"][-1]["inventory"] == ["Torch"]
+    assert PlayerModel.get_player_by_name(setup_test_db, "Alice").current_room == "west_room"
+    assert PlayerModel.get_player_by_name(setup_test_db, "Bob").current_room == "west_room"
+    assert InventoryModel.is_item_in_room(setup_test_db, "east_room", "Torch") is True
+    assert InventoryModel.get_player_inventory_entries(setup_test_db, "Alice")[0].quantity == 1
+
+
+def test_batch_continues_past_failures(setup_test_db):
+    """Test that failed actions are reported without stopping the rest of the batch by default."""
+    logger.info("Starting test: test_batch_continues_past_failures")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+
+    # When
+    result = BatchHandler().run(setup_test_db, [
+        _move("Alice", "north"),
+        _move("Nobody", "east"),
+        {"player_name": "Alice", "action": "move"},
+        _item("pick_up", "Alice", "Torch", quantity=0),
+        _move("Alice", "east"),
+    ])
+
+    # Then
+    assert result["committed"] is True
+    assert [r["message"] for r in result["results"]] == [
+        "You can't move in that direction.",
+        "Player 'Nobody' not found.",
+        "Invalid 'move' action: missing 'direction'.",
+        "Invalid 'pick_up' action: Quantity must be positive.",
+        "You have moved to east_room.",
+    ]
+    assert PlayerModel.get_player_by_name(setup_test_db, "Alice").current_room == "east_room"
+
+
+def test_batch_stop_commits_actions_before_failure(setup_test_db):
+    """Test that the stop policy skips everything after the first failure but keeps what came before."""
+    logger.info("Starting test: test_batch_stop_commits_actions_before_failure")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+
+    # When
+    result = BatchHandler().run(setup_test_db, [
+        _move("Alice", "east"),
+        _item("drop", "Alice", "Torch"),
+        _move("Alice", "west"),
+    ], on_error=STOP)
+
+    # Then
+    assert result["committed"] is True
+    assert [r["success"] for r in result["results"]] == [True, False, False]
+    assert result["results"][2]["message"] == "Skipped after an earlier action failed."
+    assert PlayerModel.get_player_by_name(setup_test_db, "Alice").current_room == "east_room"
+
+
+def test_batch_rollback_undoes_whole_batch(setup_test_db):
+    """Test that the rollback policy leaves players and items as they were when any action fails."""
+    logger.info("Starting test: test_batch_rollback_undoes_whole_batch")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    InventoryModel.add_item_to_room(setup_test_db, "start", "Torch")
+
+    # When
+    result = BatchHandler().run(setup_test_db, [
+        _item("pick_up", "Alice", "Torch"),
+        _move("Alice", "east"),
+        _item("pick_up", "Alice", "Torch"),
+    ], on_error=ROLLBACK)
+
+    # Then
+    assert result["committed"] is False
+    assert [r["success"] for r in result["results"]] == [True, True, False]
+    assert PlayerModel.get_player_by_name(setup_test_db, "Alice").current_room == "start"
+    assert InventoryModel.is_item_in_room(setup_test_db, "start", "Torch") is True
+    assert InventoryModel.get_player_inventory(setup_test_db, "Alice") == []
+    with pytest.raises(ValueError):
+        BatchHandler().run(setup_test_db, [], on_error="ignore")
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoint(setup_test_db):
+    """Test the batch endpoint runs validated actions and returns one result per action."""
+    logger.info("Starting test: test_batch_endpoint")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    batch = PlayerBatch(actions=[_move("Alice", "east"), _move("Alice", "east")], on_error="continue")
+
+    # When
+    response = await run_batch(batch, connection=setup_test_db)
+
+    # Then
+    assert response["committed"] is True
+    assert [r["success"] for r in response["results"]] == [True, False]
+    assert PlayerModel.get_player_by_name(setup_test_db, "Alice").current_room == "east_room"
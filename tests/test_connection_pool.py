@@ -0,0 +1,144 @@
+import logging
+import sqlite3
+import threading
+
+import pytest
+
+from app.db.connection_pool import ConnectionPool
+from app.db.caches import clear_caches
+from app.db.models import PlayerModel, RoomModel
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """Provides a connection pool on a throwaway database file."""
+    pool = ConnectionPool(str(tmp_path / "pool_test.db"), read_connections=2)
+    PlayerModel.create_table(pool.connection)
+    RoomModel.ensure_start_room(pool.connection)
+    clear_caches()
+    yield pool
+    clear_caches()
+    pool.close()
+
+
+def test_pool_uses_wal_and_pragmas(pool):
+    """Test that the writer runs in WAL mode and readers get the configured pragmas."""
+    logger.info("Starting test: test_pool_uses_wal_and_pragmas")
+    # When
+    journal_mode = pool.write(lambda connection: connection.execute("PRAGMA journal_mode;").fetchone()[0])
+    cache_size = pool.read(lambda connection: connection.execute("PRAGMA cache_size;").fetchone()[0])
+
+    # Then
+    assert journal_mode == "wal"
+    assert cache_size == pool.cache_size
+
+
+def test_readers_are_read_only(pool):
+    """Test that statements run on a reader connection cannot modify the database."""
+    logger.info("Starting test: test_readers_are_read_only")
+    with pytest.raises(Exception):
+        pool.read(lambda connection: connection.execute("INSERT INTO players (name) VALUES ('x');"))
+
+
+def test_writes_are_visible_to_readers(pool):
+    """Test that a write through the facade is committed before the next read."""
+    logger.info("Starting test: test_writes_are_visible_to_readers")
+    # When
+    PlayerModel.create_player(pool.connection, name="TestPlayer")
+
+    # Then
+    player = PlayerModel.get_player_by_name(pool.connection, "TestPlayer")
+    assert player is not None
+    assert player["current_room"] == "start"
+
+
+def test_transaction_rolls_back_on_error(pool):
+    """Test that a failing ``with connection:`` block leaves no partial writes behind."""
+    logger.info("Starting test: test_transaction_rolls_back_on_error")
+    connection = pool.connection
+
+    # When
+    with pytest.raises(RuntimeError):
+        with connection:
+            PlayerModel.create_player(connection, name="TestPlayer")
+            # Reads inside the transaction see its own uncommitted writes
+            assert PlayerModel.get_player_by_name(connection, "TestPlayer") is not None
+            raise RuntimeError("abort")
+
+    # Then
+    assert PlayerModel.get_player_by_name(connection, "TestPlayer") is None
+
+
+def test_concurrent_writers_are_serialized(pool):
+    """Test that concurrent read-modify-write transactions never lose an update."""
+    logger.info("Starting test: test_concurrent_writers_are_serialized")
+    # Given
+    connection = pool.connection
+    connection.execute("CREATE TABLE counter (value INTEGER NOT NULL);")
+    connection.execute("INSERT INTO counter (value) VALUES (0);")
+
+    def increment():
+        for _ in range(50):
+            with connection:
+                value = connection.execute("SELECT value FROM counter;").fetchone()[0]
+                connection.execute("UPDATE counter SET value = ?;", (value + 1,))
+
+    # When
+    threads = [threading.Thread(target=increment) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Then
+    assert connection.execute("SELECT value FROM counter;").fetchone()[0] == 400
+
+
+def test_after_commit_callbacks(pool):
+    """Test that after-commit callbacks run on the writer once the transaction commits, and never on rollback."""
+    logger.info("Starting test: test_after_commit_callbacks")
+    connection = pool.connection
+    calls = []
+
+    # When
+    with connection:
+        connection.execute("INSERT INTO players (name, current_room_id) VALUES ('TestPlayer', 1);")
+        connection.after_commit(lambda: calls.append(("committed", threading.current_thread().name)))
+        assert calls == []
+    with pytest.raises(RuntimeError):
+        with connection:
+            connection.after_commit(lambda: calls.append("rolled back"))
+            raise RuntimeError("abort")
+    connection.after_commit(lambda: calls.append("immediate"))
+
+    # Then
+    assert calls == [("committed", pool._writer.name), "immediate"]
+
+
+def test_transaction_raises_when_database_is_locked(tmp_path):
+    """Test that ``with connection:`` raises instead of hanging when BEGIN IMMEDIATE cannot get the lock."""
+    logger.info("Starting test: test_transaction_raises_when_database_is_locked")
+    # Given - another process holds the write lock
+    pool = ConnectionPool(str(tmp_path / "pool_test.db"), read_connections=1, busy_timeout=50)
+    PlayerModel.create_table(pool.connection)
+    RoomModel.ensure_start_room(pool.connection)
+    clear_caches()
+    other = sqlite3.connect(pool.database, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE;")
+
+    # When / Then
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            with pool.connection:
+                pool.connection.execute("INSERT INTO players (name, current_room_id) VALUES ('TestPlayer', 1);")
+        assert not pool.connection.in_transaction
+        other.execute("ROLLBACK;")
+        with pool.connection:
+            PlayerModel.create_player(pool.connection, name="TestPlayer")
+        assert PlayerModel.get_player_by_name(pool.connection, "TestPlayer") is not None
+    finally:
+        other.close()
+        clear_caches()
+        pool.close()
@@ -1,5 +1,6 @@
 import logging
-from app.db.models import PlayerModel, RoomModel
+from app.db.models import PlayerModel, RoomModel, InventoryModel
+from app.db.records import PlayerRecord, RoomRecord
 from tests.fixtures import setup_test_db
 
 logger = logging.getLogger(__name__)
@@ -17,7 +18,9 @@ def test_create_player(setup_test_db):
 
     # Then
     logger.info("Asserting the player has been inserted into the database.")
-    player = setup_test_db.execute("SELECT * FROM players WHERE name = ?", (player_name,)).fetchone()
+    player = setup_test_db.execute("""
+        SELECT p.name, r.name AS current_room FROM players p JOIN rooms r ON r.id = p.current_room_id WHERE p.name = ?
+    """, (player_name,)).fetchone()
     assert player is not None
     assert player["name"] == player_name
     assert player["current_room"] == "start"
@@ -38,7 +41,9 @@ def test_update_player_location(setup_test_db):
 
     # Then
     logger.info("Asserting the player's location has been updated.")
-    updated_player = setup_test_db.execute("SELECT * FROM players WHERE name = ?", (player_dict["name"],)).fetchone()
+    updated_player = setup_test_db.execute("""
+        SELECT r.name AS current_room FROM players p JOIN rooms r ON r.id = p.current_room_id WHERE p.name = ?
+    """, (player_dict["name"],)).fetchone()
     player_dict = dict(updated_player)  # Convert Row object to dictionary
     assert player_dict["current_room"] == "east_room"
 
@@ -66,3 +71,50 @@ def test_create_room(setup_test_db):
     assert room["y_coordinate"] == y_coordinate
 
 
+def test_player_lookup_returns_record(setup_test_db):
+    logger.info("Starting test: test_player_lookup_returns_record")
+    """Test that player lookups return slotted records that still behave like rows."""
+    # Given
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+
+    # When
+    player = PlayerModel.get_player_by_name(setup_test_db, "TestPlayer")
+
+    # Then
+    assert isinstance(player, PlayerRecord)
+    assert not hasattr(player, "__dict__")
+    assert player.current_room == player["current_room"] == "start"
+    start = RoomModel.get_room_by_name(setup_test_db, "start")
+    assert dict(player) == {"id": player.id, "name": "TestPlayer", "current_room_id": start.id, "current_room": "start"}
+
+
+def test_room_description_loads_lazily(setup_test_db):
+    logger.info("Starting test: test_room_description_loads_lazily")
+    """Test that the room description is only fetched when accessed."""
+    # Given
+    room = RoomModel.get_room_by_coordinates(setup_test_db, {"x": 1, "y": 0})
+    assert isinstance(room, RoomRecord)
+    assert room._description is None
+
+    # When
+    description = room.description
+
+    # Then
+    assert description == "You have entered the east room."
+    assert room["description"] == description
+    assert room.name == "east_room"
+
+
+def test_inventory_entries_group_items(setup_test_db):
+    logger.info("Starting test: test_inventory_entries_group_items")
+    """Test that inventory entries report one entry per item with its count."""
+    # Given
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+    for item_name in ["Arrow", "Arrow", "Bow"]:
+        InventoryModel.add_item_to_player(setup_test_db, "TestPlayer", item_name)
+
+    # When
+    entries = InventoryModel.get_player_inventory_entries(setup_test_db, "TestPlayer")
+
+    # Then
+    assert {entry.item_name: entry.quantity for entry in entries} == {"Arrow": 2, "Bow": 1}
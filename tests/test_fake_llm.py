@@ -0,0 +1,84 @@
+import logging
+
+import pytest
+
+from app.core.fake_llm import FakeLlmServer, fake_answer
+from app.core.gpt_service import close_gpt_client, get_gpt_response, start_gpt_client
+from tests.fixtures import llm_response_cache, llm_scheduler, setup_test_db, world_service
+
+logger = logging.getLogger(__name__)
+
+CONNECTED_PROMPT = """
+    "origin_coords": {"x": 0, "y": 0},
+    "direction": "east",
+    "existing_neighbors": [{'x': 1, 'y': 1}, {'x': -1, 'y': 0}],
+"""
+
+
+def test_answers_are_seeded_by_prompt():
+    """Test that the same prompt and seed give the same answer and another seed a different one."""
+    logger.info("Starting test: test_answers_are_seeded_by_prompt")
+    # Given
+    prompt = 'Describe a room: {"name": "Room Name", "description": "Text", "sounds": ["a sound"]}'
+
+    # When
+    first, again, reseeded = fake_answer(prompt), fake_answer(prompt), fake_answer(prompt, seed=1)
+
+    # Then
+    assert first == again
+    assert first != reseeded
+    assert set(first) == {"name", "description", "sounds"}
+    assert isinstance(first["sounds"], list)
+
+
+def test_connected_room_locations_fill_free_cells():
+    """Test that a connected-room prompt gets the target cell first, then its neighbors not already taken."""
+    logger.info("Starting test: test_connected_room_locations_fill_free_cells")
+    # When
+    locations = fake_answer(CONNECTED_PROMPT)["locations"]
+    occupied = fake_answer(CONNECTED_PROMPT.replace('"east"', '"northeast"'))
+
+    # Then - (1, 0) is new; of its neighbors, the origin and (1, 1) already exist
+    cells = [(location["coords"]["x"], location["coords"]["y"]) for location in locations]
+    assert cells[0] == (1, 0)
+    assert len(cells) == 7 and (0, 0) not in cells and (1, 1) not in cells
+    for location in locations:
+        assert {"name", "description", "type", "features", "sounds", "smells"} <= set(location)
+    assert occupied == {"error": "Location occupied"}
+
+
+@pytest.mark.asyncio
+async def test_error_rate_is_retried(llm_scheduler, llm_response_cache):
+    """Test that injected errors reach the client as retryable failures the scheduler gets past."""
+    logger.info("Starting test: test_error_rate_is_retried")
+    async with FakeLlmServer(seed=3, error_rate=0.5) as server:
+        # Given
+        await start_gpt_client(api_key="fake", model="fake", base_url=server.base_url)
+
+        # When
+        responses = [await get_gpt_response(f'Room {i}: {{"name": "Room Name"}}', cache=False) for i in range(10)]
+        await close_gpt_client()
+
+    # Then
+    assert all(isinstance(response, dict) and "name" in response for response in responses)
+    assert server.errors_sent > 0
+    assert llm_scheduler.stats.retries == server.errors_sent
+
+
+@pytest.mark.asyncio
+async def test_streamed_generation_saves_rooms(world_service, llm_response_cache):
+    """Test that streaming a connected room from the fake provider saves it and its neighbors."""
+    logger.info("Starting test: test_streamed_generation_saves_rooms")
+    async with FakeLlmServer(tokens_per_second=5000) as server:
+        # Given
+        await start_gpt_client(api_key="fake", model="fake", base_url=server.base_url)
+
+        # When
+        room, neighbors_task = await world_service.enter_connected_room({"x": 0, "y": 0}, "north")
+        neighbors = await neighbors_task
+        await close_gpt_client()
+
+    # Then - start, east_room and west_room already surround (0, 1) from below
+    assert room["grid_coordinates"] == {"x": 0, "y": 1}
+    assert len(neighbors) == 5
+    assert world_service.connection.execute("SELECT COUNT(*) FROM rooms;").fetchone()[0] == 3 + 6
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import threading
+
+import pytest
+
+from app.core.fake_llm import FakeLlmServer
+from app.core.gpt_service import close_gpt_client, completion_cost, start_gpt_client
+from app.core.services.world_generation_service import cell_flight, frontier_claims, room_generations
+from app.db.models import RoomModel
+from app.db.room_graph import room_graph
+from tests.fixtures import llm_response_cache, setup_test_db, world_service
+
+logger = logging.getLogger(__name__)
+
+BLOCK = [(x, y) for y in range(1, 5) for x in range(4)]
+
+
+def requested_cells(server: FakeLlmServer) -> list:
+    """Every cell the fake provider was asked for, over all its requests."""
+    cells = []
+    for request in server.requests:
+        line = next(line for line in request["messages"][-1]["content"].splitlines()
+                    if line.startswith("Requested cells"))
+        cells += [tuple(map(int, cell.split(","))) for cell in line.split(":")[1].split()]
+    return cells
+
+
+def test_frontier_cells_lists_empty_cells_of_a_chunk(world_service):
+    """Test that the frontier of a chunk is its empty cells, optionally only those touching a room."""
+    logger.info("Starting test: test_frontier_cells_lists_empty_cells_of_a_chunk")
+    # When
+    empty = world_service.frontier_cells(0, 0)
+    adjacent = world_service.frontier_cells(0, 0, adjacent_only=True)
+
+    # Then - start (0, 0) and east_room (1, 0) are in chunk (0, 0); west_room (-1, 0) is west of it
+    assert len(empty) == 16 * 16 - 2
+    assert (0, 0) not in empty and (1, 0) not in empty
+    assert set(adjacent) == {(0, 1), (1, 1), (2, 1), (2, 0)}
+
+
+@pytest.mark.asyncio
+async def test_frontier_batch_is_one_call(world_service, llm_response_cache):
+    """Test that a block of cells is generated in one call, saved with terrain, and reported per room."""
+    logger.info("Starting test: test_frontier_batch_is_one_call")
+    async with FakeLlmServer(seed=1) as server:
+        # Given
+        await start_gpt_client(api_key="fake", model="fake", base_url=server.base_url)
+
+        # When
+        report = await world_service.generate_frontier(BLOCK)
+        again = await world_service.generate_frontier([(4, 1)], use_cache=False)
+        await close_gpt_client()
+
+    # Then
+    assert len(server.requests) == 2
+    prompt = server.requests[0]["messages"][-1]["content"]
+    assert "0,0 unknown: start" in prompt and "1,0 unknown: east_room" in prompt
+    assert report["calls"] == 1 and report["generated"] == report["saved"] == 16
+    rooms = RoomModel.get_rooms_in_region(world_service.connection, 0, 1, 3, 4)
+    assert len(rooms) == 16 and all(room.terrain_type for room in rooms)
+    assert report["prompt_tokens"] > 0 and report["completion_tokens"] > 0
+    assert report["tokens_per_room"] == (report["prompt_tokens"] + report["completion_tokens"]) / 16
+    assert report["cost_per_room"] == pytest.approx(completion_cost(report) / 16)
+    # The second batch sees the first one's rooms, terrain included, as its context
+    assert "3,1 " in server.requests[1]["messages"][-1]["content"]
+    assert again["saved"] == 1
+    assert frontier_claims == set()
+
+
+@pytest.mark.asyncio
+async def test_frontier_cells_are_generated_once(world_service, llm_response_cache):
+    """Test that existing cells, cells of a concurrent frontier request and cells being entered are skipped."""
+    logger.info("Starting test: test_frontier_cells_are_generated_once")
+    async with FakeLlmServer(seed=2, latency=0.1) as server:
+        # Given - a player is entering (5, 5)
+        await start_gpt_client(api_key="fake", model="fake", base_url=server.base_url)
+        entering = asyncio.Event()
+        entered = asyncio.create_task(room_generations.run(cell_flight(5, 5), entering.wait))
+        await asyncio.sleep(0)
+        cells = world_service.frontier_cells(0, 0)[:40] + [(1, 0), (5, 5)]
+
+        # When
+        first, second = await asyncio.gather(
+            world_service.generate_frontier(cells, batch_size=16),
+            world_service.generate_frontier(list(reversed(cells)), batch_size=16),
+        )
+        entering.set()
+        await entered
+        await close_gpt_client()
+
+    # Then - 40 new cells between them, in three calls
+    asked = requested_cells(server)
+    assert len(asked) == len(set(asked)) == 40
+    assert (1, 0) not in asked and (5, 5) not in asked
+    assert first["calls"] + second["calls"] == 3
+    assert first["saved"] + second["saved"] == 40
+    assert first["deduplicated"] == 2 and second["deduplicated"] == 42
+
+
+@pytest.mark.asyncio
+async def test_generation_uses_the_database_off_the_event_loop(world_service, llm_response_cache, monkeypatch):
+    """Test that frontier and connected-room generation read and save on the database executor, linking new rooms."""
+    logger.info("Starting test: test_generation_uses_the_database_off_the_event_loop")
+    # Given - every database call of the two generations records the thread it ran on
+    threads = []
+
+    def recorded(fn):
+        def wrapper(*args, **kwargs):
+            threads.append((fn.__name__, threading.current_thread()))
+            return fn(*args, **kwargs)
+        return wrapper
+
+    for name in ("get_room_ids_by_coordinates", "get_rooms_in_region"):
+        monkeypatch.setattr(RoomModel, name, recorded(getattr(RoomModel, name)))
+    for name in ("save_rooms_to_db", "get_existing_room", "_connected_room_prompt"):
+        monkeypatch.setattr(world_service, name, recorded(getattr(world_service, name)))
+
+    async with FakeLlmServer(seed=3) as server:
+        await start_gpt_client(api_key="fake", model="fake", base_url=server.base_url)
+
+        # When
+        report = await world_service.generate_frontier([(0, 1), (1, 1)])
+        answer = await world_service.generate_connected_room({"x": 0, "y": 0}, "south")
+        await close_gpt_client()
+
+    # Then
+    assert report["saved"] == 2 and "locations" in answer
+    assert {name for name, _ in threads} == {"get_room_ids_by_coordinates", "get_rooms_in_region", "save_rooms_to_db",
+                                             "get_existing_room", "_connected_room_prompt"}
+    assert threading.main_thread() not in {thread for _, thread in threads}
+    # The frontier rooms can be walked into
+    start = RoomModel.get_room_by_coordinates(world_service.connection, {"x": 0, "y": 0})
+    north = RoomModel.get_room_by_coordinates(world_service.connection, {"x": 0, "y": 1})
+    assert room_graph.neighbor(world_service.connection, start.id, "north") == north.id
+    assert room_graph.neighbor(world_service.connection, north.id, "east") is not None
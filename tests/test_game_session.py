@@ -0,0 +1,190 @@
+import json
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.game_session import GameSession, SessionLimitReached, SessionRegistry, sessions
+from app.db.models import InventoryModel, PlayerModel
+from app.main import app
+from tests.fixtures import game_engine, inventory_handler, setup_test_db
+
+logger = logging.getLogger(__name__)
+
+
+def _drain(session):
+    return [json.loads(session.outbox.get_nowait()) for _ in range(session.outbox.qsize())]
+
+
+def _open(connection, name, **kwargs):
+    session = GameSession(connection, PlayerModel.get_player_by_name(connection, name), **kwargs)
+    sessions.open(session)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_session_pushes_room_and_inventory(setup_test_db, game_engine, inventory_handler):
+    """Test that a session greets its player and pushes the rooms they enter and their inventory."""
+    logger.info("Starting test: test_session_pushes_room_and_inventory")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    InventoryModel.add_item_to_room(setup_test_db, "east_room", "torch")
+    session = _open(setup_test_db, "Alice", game_engine=game_engine, inventory_handler=inventory_handler)
+    try:
+        # When
+        await session.start()
+        greeting = _drain(session)
+        await session.handle(json.dumps({"id": 1, "action": "move", "direction": "east"}))
+        moved = _drain(session)
+        await session.handle(json.dumps({"id": 2, "action": "pick_up", "item_name": "torch"}))
+        picked_up = _drain(session)
+    finally:
+        sessions.close(session)
+
+    # Then
+    assert [message["type"] for message in greeting] == ["welcome", "room", "inventory"]
+    assert greeting[1]["room"] == "start" and greeting[1]["description"] == "The starting point of your journey."
+    assert set(greeting[1]["exits"]) == {"east", "west"}
+    assert greeting[2]["items"] == []
+    assert moved[0] == {"type": "result", "id": 1, "action": "move", "success": True,
+                        "message": "You have moved to east_room."}
+    assert moved[1]["type"] == "room" and moved[1]["room"] == "east_room"
+    assert [message["type"] for message in picked_up] == ["result", "inventory"]
+    assert picked_up[1]["items"] == [{"item_name": "torch", "quantity": 1}]
+
+
+@pytest.mark.asyncio
+async def test_presence_pushed_to_other_sessions(setup_test_db):
+    """Test that players in the rooms a player leaves and enters hear about it."""
+    logger.info("Starting test: test_presence_pushed_to_other_sessions")
+    # Given - Bob waits in the east room, Alice starts in the start room with Carol
+    for name in ("Alice", "Bob", "Carol"):
+        PlayerModel.create_player(setup_test_db, name=name)
+    PlayerModel.update_player_location(setup_test_db, "Bob", "east_room")
+    alice, bob, carol = (_open(setup_test_db, name) for name in ("Alice", "Bob", "Carol"))
+    try:
+        for session in (alice, bob, carol):
+            await session.start()
+            _drain(session)
+
+        # When
+        await alice.handle(json.dumps({"action": "move", "direction": "east"}))
+        alice_messages, bob_messages, carol_messages = _drain(alice), _drain(bob), _drain(carol)
+    finally:
+        for session in (alice, bob, carol):
+            sessions.close(session)
+
+    # Then
+    assert alice_messages[1]["players"] == ["Bob"]
+    assert bob_messages == [
+        {"type": "presence", "event": "entered", "player": "Alice", "room": "east_room", "from": "start"},
+    ]
+    assert carol_messages == [
+        {"type": "presence", "event": "left", "player": "Alice", "room": "start", "to": "east_room"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_malformed_actions_get_error_results(setup_test_db):
+    """Test that a bad direction or item name is answered with a failed result and the session carries on."""
+    logger.info("Starting test: test_malformed_actions_get_error_results")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    session = _open(setup_test_db, "Alice")
+    malformed = [
+        {"action": "move", "direction": ["north"]},
+        {"action": "move", "direction": "up"},
+        {"action": "move"},
+        {"action": "pick_up", "item_name": {"name": "torch"}},
+        {"action": "drop", "item_name": ""},
+    ]
+    try:
+        # When
+        replies = []
+        for action in malformed:
+            await session.handle(json.dumps(action))
+            replies += _drain(session)
+        await session.handle(json.dumps({"action": "move", "direction": "east"}))
+        moved = _drain(session)
+    finally:
+        sessions.close(session)
+
+    # Then
+    assert [(reply["type"], reply["success"]) for reply in replies] == [("result", False)] * len(malformed)
+    assert replies[0]["message"].startswith("Direction must be one of")
+    assert replies[3]["message"] == "Item name must be a non-empty string."
+    assert moved[0]["success"] is True and not session.closed.is_set()
+
+
+@pytest.mark.asyncio
+async def test_full_outbox_drops_pushes(setup_test_db):
+    """Test that pushes to a client that is not reading are dropped instead of queuing without bound."""
+    logger.info("Starting test: test_full_outbox_drops_pushes")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    session = GameSession(setup_test_db, PlayerModel.get_player_by_name(setup_test_db, "Alice"), send_queue_size=2)
+
+    # When
+    delivered = [session.push({"type": "presence", "n": n}) for n in range(3)]
+
+    # Then
+    assert delivered == [True, True, False]
+    assert session.pushes_dropped == 1
+    assert session.outbox.qsize() == 2
+
+
+def test_registry_limits_and_replaces_sessions(setup_test_db):
+    """Test that the registry refuses sessions past its limit but lets a player replace their own."""
+    logger.info("Starting test: test_registry_limits_and_replaces_sessions")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    PlayerModel.create_player(setup_test_db, name="Bob")
+    registry = SessionRegistry(max_sessions=1)
+    first = GameSession(setup_test_db, PlayerModel.get_player_by_name(setup_test_db, "Alice"))
+    second = GameSession(setup_test_db, PlayerModel.get_player_by_name(setup_test_db, "Alice"))
+
+    # When
+    registry.open(first)
+    previous = registry.open(second)
+    registry.close(first)
+
+    # Then
+    assert previous is first
+    assert registry.get("Alice") is second
+    with pytest.raises(SessionLimitReached):
+        registry.open(GameSession(setup_test_db, PlayerModel.get_player_by_name(setup_test_db, "Bob")))
+
+
+def test_websocket_session_endpoint(setup_test_db):
+    """Test a whole session over the WebSocket endpoint, including a rejected hello."""
+    logger.info("Starting test: test_websocket_session_endpoint")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    client = TestClient(app)
+
+    # When
+    with client.websocket_connect("/api/v1/session/ws") as websocket:
+        websocket.send_json({"player_name": "Alice"})
+        greeting = [websocket.receive_json() for _ in range(3)]
+        websocket.send_json({"id": 7, "action": "move", "direction": "west"})
+        reply, room = websocket.receive_json(), websocket.receive_json()
+        websocket.send_text("not json")
+        error = websocket.receive_json()
+    with client.websocket_connect("/api/v1/session/ws") as websocket:
+        websocket.send_json({"player_name": "Nobody"})
+        with pytest.raises(WebSocketDisconnect) as rejected:
+            websocket.receive_json()
+    with client.websocket_connect("/api/v1/session/ws") as websocket:
+        websocket.send_json({"player_name": ["Alice"]})
+        with pytest.raises(WebSocketDisconnect) as malformed:
+            websocket.receive_json()
+
+    # Then
+    assert [message["type"] for message in greeting] == ["welcome", "room", "inventory"]
+    assert reply["id"] == 7 and reply["success"] is True
+    assert room["room"] == "west_room"
+    assert error["type"] == "error"
+    assert rejected.value.code == malformed.value.code == 1008
+    assert PlayerModel.get_player_by_name(setup_test_db, "Alice").current_room == "west_room"
+    assert sessions.get("Alice") is None
@@ -1,16 +1,21 @@
 import pytest
 import logging
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.api.v1.gpt_interaction import router
+from app.main import app as main_app
+from tests.fixtures import llm_backend, llm_response_cache
 
 logger = logging.getLogger(__name__)
 
-client = TestClient(router)
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app)
 
 
 @pytest.mark.asyncio
-async def test_gpt_interaction_api():
+async def test_gpt_interaction_api(llm_backend):
     """Test GPT interaction API endpoint."""
     logger.info("Starting test: test_gpt_interaction_api")
 
@@ -54,3 +59,12 @@ async def test_gpt_interaction_api():
                       str), f"Expected 'response' to be a string, got {type(npc_response['response'])}"
 
 
+def test_gpt_stats_endpoint_is_mounted():
+    """Test that the app serves the LLM client, cache, generation and scheduler stats."""
+    logger.info("Starting test: test_gpt_stats_endpoint_is_mounted")
+    # When
+    response = TestClient(main_app).get("/api/v1/gpt/gpt_stats")
+
+    # Then
+    assert response.status_code == 200
+    assert set(response.json()) == {"client", "cache", "room_generations", "scheduler"}
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from app.core import gpt_service
+from app.core.gpt_service import GptClient, close_gpt_client, get_gpt_response, start_gpt_client
+from tests.fake_llm_server import FakeChatServer
+from tests.fixtures import llm_scheduler
+
+logger = logging.getLogger(__name__)
+
+DELAY = 0.3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_generations_overlap():
+    """Test that concurrent completions are in flight together instead of one after another."""
+    logger.info("Starting test: test_concurrent_generations_overlap")
+    async with FakeChatServer(delay=DELAY) as server:
+        # Given
+        client = GptClient(api_key="test", model="fake", base_url=server.base_url, max_concurrency=8, max_retries=0)
+        await client.complete_json("warm up")
+        server.max_in_flight = 0
+
+        # When
+        started = time.perf_counter()
+        results = await asyncio.gather(*(client.complete_json(f"room {i}") for i in range(6)))
+        elapsed = time.perf_counter() - started
+        await client.close()
+
+    # Then - six calls took about as long as one
+    assert all(result["name"] == "Fake Glade" for result in results)
+    assert server.max_in_flight == 6
+    assert elapsed < 3 * DELAY
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_connection_reuse():
+    """Test that the semaphore caps calls in flight and that calls share pooled connections."""
+    logger.info("Starting test: test_concurrency_limit_and_connection_reuse")
+    async with FakeChatServer(delay=0.05) as server:
+        # Given
+        client = GptClient(api_key="test", model="fake", base_url=server.base_url, max_concurrency=2, max_retries=0)
+
+        # When
+        await asyncio.gather(*(client.complete_json(f"room {i}") for i in range(6)))
+        for i in range(3):
+            await client.complete_json(f"sequential {i}")
+        await client.close()
+
+    # Then - never more than two requests at once, over no more than two kept-alive connections
+    assert server.max_in_flight == 2
+    assert client.max_in_flight == 2
+    assert len(server.requests) == 9
+    assert server.connections <= 2
+
+
+@pytest.mark.asyncio
+async def test_per_call_timeout():
+    """Test that a call exceeding its timeout fails without waiting for the slow response."""
+    logger.info("Starting test: test_per_call_timeout")
+    async with FakeChatServer(delay=5) as server:
+        # Given
+        client = GptClient(api_key="test", model="fake", base_url=server.base_url, max_retries=0)
+
+        # When
+        started = time.perf_counter()
+        with pytest.raises(Exception):
+            await client.complete_json("slow room", timeout=0.2)
+        elapsed = time.perf_counter() - started
+        await client.close()
+
+    # Then
+    assert elapsed < 2
+    assert client.failures == 1
+    assert client.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_shared_client_lifecycle(llm_scheduler):
+    """Test that get_gpt_response uses the started client and reports errors as before once closed."""
+    logger.info("Starting test: test_shared_client_lifecycle")
+    async with FakeChatServer() as server:
+        # Given
+        client = await start_gpt_client(api_key="test", model="fake", base_url=server.base_url, max_retries=0)
+
+        # When
+        response = await get_gpt_response("a room", cache=False)
+        await close_gpt_client()
+        await start_gpt_client(api_key="test", model="fake", base_url="http://127.0.0.1:9/v1", max_retries=0)
+        failed = await get_gpt_response("a room", cache=False)
+        await close_gpt_client()
+
+    # Then
+    assert response == {"name": "Fake Glade", "description": "A quiet glade."}
+    assert client.calls == 1
+    assert isinstance(failed, str) and failed.startswith("Error while getting response from GPT")
+    assert gpt_service._client is None
@@ -0,0 +1,107 @@
+import logging
+import threading
+
+import numpy as np
+
+from app.db.grid_index import grid_index, EMPTY
+from app.db.models import RoomModel
+from tests.fixtures import setup_test_db, world_service
+
+logger = logging.getLogger(__name__)
+
+
+def test_lookups_match_rooms_table(setup_test_db):
+    """Test that the index returns the same room ids as the rooms table, including negative coordinates."""
+    logger.info("Starting test: test_lookups_match_rooms_table")
+    # Given
+    start = RoomModel.get_room_by_name(setup_test_db, "start")
+    west = RoomModel.get_room_by_name(setup_test_db, "west_room")
+
+    # When
+    ids = grid_index.room_ids_at(setup_test_db, [0, -1, 5, -1000], [0, 0, 5, 1000])
+
+    # Then
+    assert ids.tolist() == [start.id, west.id, EMPTY, EMPTY]
+    assert grid_index.room_id_at(setup_test_db, 2, 0) is None
+
+
+def test_index_grows_as_rooms_are_added(setup_test_db):
+    """Test that rooms created far outside the indexed area are picked up and keep earlier rooms in place."""
+    logger.info("Starting test: test_index_grows_as_rooms_are_added")
+    # Given
+    assert grid_index.room_id_at(setup_test_db, 1, 0) is not None
+    bounds = grid_index.bounds
+
+    # When
+    RoomModel.create_room(setup_test_db, "far_room", "Far away.", -100, 250)
+
+    # Then
+    far = RoomModel.get_room_by_name(setup_test_db, "far_room")
+    assert grid_index.room_id_at(setup_test_db, -100, 250) == far.id
+    assert grid_index.room_id_at(setup_test_db, 1, 0) == RoomModel.get_room_by_name(setup_test_db, "east_room").id
+    x0, y0, x1, y1 = grid_index.bounds
+    assert x0 <= -100 < bounds[0] and y1 >= 250 > bounds[3]
+    assert x0 % 16 == 0 and y0 % 16 == 0
+
+
+def test_neighbor_and_unexplored_queries(setup_test_db):
+    """Test the vectorized eight-neighbor and unexplored-cell queries."""
+    logger.info("Starting test: test_neighbor_and_unexplored_queries")
+    # When
+    neighbors = grid_index.existing_neighbors(setup_test_db, 0, 0)
+    unexplored = grid_index.unexplored_in_region(setup_test_db, -1, -1, 1, 1)
+
+    # Then
+    assert neighbors == {"east": (1, 0), "west": (-1, 0)}
+    assert np.count_nonzero(grid_index.neighbor_ids(setup_test_db, 0, 0)) == 2
+    assert sorted(map(tuple, unexplored.tolist())) == [(-1, -1), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 1)]
+
+
+def test_world_generation_lists_occupied_neighbors(world_service):
+    """Test that the neighbors sent to the generator are the occupied cells around the room."""
+    logger.info("Starting test: test_world_generation_lists_occupied_neighbors")
+    # Given
+    RoomModel.create_room(world_service.connection, "north_room", "North.", 0, 1)
+    start = RoomModel.get_room_by_name(world_service.connection, "start")
+
+    # When
+    neighbors = world_service.get_existing_neighbors(start.id)
+
+    # Then
+    assert sorted((neighbor["x"], neighbor["y"]) for neighbor in neighbors) == [(-1, 0), (0, 1), (1, 0)]
+
+
+def test_far_apart_rooms_only_allocate_their_chunks(setup_test_db):
+    """Test that a room far from the others is indexed without allocating the cells in between."""
+    logger.info("Starting test: test_far_apart_rooms_only_allocate_their_chunks")
+    # Given
+    RoomModel.create_room(setup_test_db, "far_room", "Very far away.", 200000, 200000)
+
+    # When
+    far_id = grid_index.room_id_at(setup_test_db, 200000, 200000)
+    ids = grid_index.room_ids_at(setup_test_db, [200000, 0, 100000], [200000, 0, 100000])
+
+    # Then - chunks (0, 0) and (-1, 0) for the fixture rooms, plus the far room's
+    assert far_id == RoomModel.get_room_by_name(setup_test_db, "far_room").id
+    assert ids.tolist() == [far_id, RoomModel.get_room_by_name(setup_test_db, "start").id, EMPTY]
+    assert grid_index.chunk_count == 3
+    assert grid_index.existing_neighbors(setup_test_db, 200001, 200000) == {"west": (200000, 200000)}
+
+
+def test_rooms_written_in_a_transaction_are_indexed_after_commit(setup_test_db):
+    """Test that a lookup racing an open transaction does not hide the transaction's rooms once it commits."""
+    logger.info("Starting test: test_rooms_written_in_a_transaction_are_indexed_after_commit")
+    # Given
+    assert grid_index.room_id_at(setup_test_db, 0, 5) is None
+    looked_up = []
+
+    # When - another thread syncs the index after the insert, before the commit
+    with setup_test_db:
+        RoomModel.upsert_rooms(setup_test_db, [("north_room", "North.", 0, 5, "meadow")])
+        reader = threading.Thread(target=lambda: looked_up.append(grid_index.room_id_at(setup_test_db, 0, 5)))
+        reader.start()
+        reader.join()
+
+    # Then
+    assert looked_up == [None]
+    assert grid_index.room_id_at(setup_test_db, 0, 5) == RoomModel.get_room_by_name(setup_test_db, "north_room").id
@@ -1,4 +1,8 @@
 import logging
+import threading
+
+import pytest
+
 from app.db.models import PlayerModel, InventoryModel
 from tests.fixtures import setup_test_db, inventory_handler
 
@@ -69,3 +73,105 @@ def test_view_inventory(setup_test_db, inventory_handler):
     assert len(inventory) == 2
     assert "Magic Sword" in inventory
     assert "Healing Potion" in inventory
+
+
+def test_quantities_stack_in_one_row(setup_test_db, inventory_handler):
+    """Test that picking up part of a stack moves exactly that many units and keeps one row per holder."""
+    logger.info("Starting test: test_quantities_stack_in_one_row")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+    InventoryModel.add_item_to_room(setup_test_db, "start", "Arrow", quantity=500)
+
+    # When
+    first = inventory_handler.pick_up_item(setup_test_db, "TestPlayer", "Arrow", quantity=200)
+    second = inventory_handler.pick_up_item(setup_test_db, "TestPlayer", "Arrow", quantity=300)
+    too_many = inventory_handler.pick_up_item(setup_test_db, "TestPlayer", "Arrow")
+
+    # Then
+    assert first["success"] is True and second["success"] is True
+    assert too_many["success"] is False
+    entries = InventoryModel.get_player_inventory_entries(setup_test_db, "TestPlayer")
+    assert [(entry.item_name, entry.quantity) for entry in entries] == [("Arrow", 500)]
+    assert InventoryModel.is_item_in_room(setup_test_db, "start", "Arrow") is False
+    assert setup_test_db.execute("SELECT COUNT(*) FROM inventory;").fetchone()[0] == 1
+
+
+def test_drop_without_item_changes_nothing(setup_test_db, inventory_handler):
+    """Test that a failed transfer leaves both holders untouched."""
+    logger.info("Starting test: test_drop_without_item_changes_nothing")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+    InventoryModel.add_item_to_player(setup_test_db, "TestPlayer", "Arrow", quantity=2)
+
+    # When
+    result = inventory_handler.drop_item(setup_test_db, "TestPlayer", "Arrow", quantity=3)
+
+    # Then
+    assert result["success"] is False
+    assert InventoryModel.get_player_inventory_entries(setup_test_db, "TestPlayer")[0].quantity == 2
+    assert InventoryModel.is_item_in_room(setup_test_db, "start", "Arrow") is False
+
+
+def test_non_positive_quantities_are_rejected(setup_test_db):
+    """Test that adding or removing zero or negative units raises instead of changing the inventory."""
+    logger.info("Starting test: test_non_positive_quantities_are_rejected")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+    InventoryModel.add_item_to_player(setup_test_db, "TestPlayer", "Arrow", quantity=2)
+    holder = InventoryModel._player_holder(setup_test_db, "TestPlayer")
+
+    # When / Then
+    for quantity in (0, -3):
+        with pytest.raises(ValueError):
+            InventoryModel.give(setup_test_db, holder, "Arrow", quantity)
+        with pytest.raises(ValueError):
+            InventoryModel.take(setup_test_db, holder, "Arrow", quantity)
+    assert InventoryModel.get_quantity(setup_test_db, holder, "Arrow") == 2
+
+
+def test_give_item_between_players(setup_test_db, inventory_handler):
+    """Test that a player can hand units of an item to another player."""
+    logger.info("Starting test: test_give_item_between_players")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Giver")
+    PlayerModel.create_player(setup_test_db, name="Receiver")
+    InventoryModel.add_item_to_player(setup_test_db, "Giver", "Healing Potion", quantity=3)
+
+    # When
+    result = inventory_handler.give_item(setup_test_db, "Giver", "Receiver", "Healing Potion", quantity=2)
+
+    # Then
+    assert result["success"] is True
+    assert InventoryModel.get_player_inventory_entries(setup_test_db, "Giver")[0].quantity == 1
+    assert InventoryModel.get_player_inventory_entries(setup_test_db, "Receiver")[0].quantity == 2
+
+
+def test_concurrent_pickups_never_duplicate_items(setup_test_db, inventory_handler):
+    """Test that players racing for the same loot pick up exactly the units that exist."""
+    logger.info("Starting test: test_concurrent_pickups_never_duplicate_items")
+    # Given - 20 players in one room with 50 gold coins
+    players = [f"player{i}" for i in range(20)]
+    for name in players:
+        PlayerModel.create_player(setup_test_db, name=name)
+    InventoryModel.add_item_to_room(setup_test_db, "start", "Gold Coin", quantity=50)
+    successes = []
+
+    def loot(name):
+        for _ in range(10):
+            if inventory_handler.pick_up_item(setup_test_db, name, "Gold Coin")["success"]:
+                successes.append(name)
+
+    # When
+    threads = [threading.Thread(target=loot, args=(name,)) for name in players]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Then
+    assert len(successes) == 50
+    held = sum(
+        entry.quantity for name in players for entry in InventoryModel.get_player_inventory_entries(setup_test_db, name)
+    )
+    assert held == 50
+    assert InventoryModel.is_item_in_room(setup_test_db, "start", "Gold Coin") is False
@@ -0,0 +1,129 @@
+import logging
+import time
+
+import pytest
+
+from app.core.gpt_service import close_gpt_client, get_gpt_response, start_gpt_client
+from app.core.llm_cache import LlmResponseCache, cache_key
+from app.core.services.world_generation_service import WorldGenerationService
+from tests.fake_llm_server import FakeChatServer
+from tests.fixtures import llm_response_cache, llm_scheduler, setup_test_db
+
+logger = logging.getLogger(__name__)
+
+
+def test_cache_key_normalizes_prompt():
+    """Test that whitespace does not change the key but the model and response format do."""
+    logger.info("Starting test: test_cache_key_normalizes_prompt")
+    # Given
+    prompt = "Generate   a room\n    in the forest"
+
+    # Then
+    assert cache_key("gpt", prompt) == cache_key("gpt", "  Generate a room in the forest ")
+    assert cache_key("gpt", prompt) != cache_key("other", prompt)
+    assert cache_key("gpt", prompt) != cache_key("gpt", prompt, "text")
+
+
+def test_lru_eviction_and_ttl(tmp_path):
+    """Test that the least recently used entry is evicted and expired entries are misses."""
+    logger.info("Starting test: test_lru_eviction_and_ttl")
+    # Given
+    cache = LlmResponseCache(str(tmp_path / "llm_cache.db"), max_entries=2, ttl=0.2)
+    cache.put("a", {"name": "A"}, 1.0)
+    cache.put("b", {"name": "B"}, 1.0)
+
+    # When - "a" is used, so "b" is the one evicted by "c"
+    assert cache.get("a") == {"name": "A"}
+    cache.put("c", {"name": "C"}, 1.0)
+
+    # Then
+    assert cache.get("b") is None
+    assert cache.get("c") == {"name": "C"}
+    assert cache.evictions == 1
+    time.sleep(0.3)
+    assert cache.get("c") is None
+    assert cache.expired == 1
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_byte_limit_evicts_oldest_entries_off_the_loop(tmp_path):
+    """Test that entries past max_bytes are evicted oldest first and the counters follow every write."""
+    logger.info("Starting test: test_byte_limit_evicts_oldest_entries_off_the_loop")
+    # Given - room for about three 100-byte responses
+    cache = LlmResponseCache(str(tmp_path / "llm_cache.db"), max_bytes=350)
+    for key in "abc":
+        await cache.put_async(key, "x" * 98, 1.0)
+    await cache.put_async("a", "y" * 98, 1.0)
+
+    # When - a fourth entry goes over the limit, and "b" is the least recently used
+    await cache.put_async("d", "z" * 98, 1.0)
+
+    # Then
+    assert await cache.get_async("b") is None
+    assert await cache.get_async("a") == "y" * 98
+    assert len(cache) == 3 and cache.evictions == 1
+    assert cache.stats()["bytes"] == 300
+    cache.close()
+    reopened = LlmResponseCache(str(tmp_path / "llm_cache.db"))
+    assert len(reopened) == 3 and reopened.stats()["bytes"] == 300
+    reopened.close()
+
+
+def test_entries_survive_reopening(tmp_path):
+    """Test that responses are kept on disk across cache instances."""
+    logger.info("Starting test: test_entries_survive_reopening")
+    # Given
+    path = str(tmp_path / "llm_cache.db")
+    cache = LlmResponseCache(path)
+    cache.put("key", {"name": "Kept"}, 2.5)
+    cache.close()
+
+    # When
+    reopened = LlmResponseCache(path)
+
+    # Then
+    assert reopened.get("key") == {"name": "Kept"}
+    assert reopened.stats()["saved_seconds"] == 2.5
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_generation_uses_cache(setup_test_db, llm_response_cache):
+    """Test that generating the same room twice asks the model once unless the cache is bypassed."""
+    logger.info("Starting test: test_generation_uses_cache")
+    async with FakeChatServer(delay=0.1) as server:
+        # Given
+        await start_gpt_client(api_key="test", model="fake", base_url=server.base_url, max_retries=0)
+        world_service = WorldGenerationService(setup_test_db)
+
+        # When
+        first = await world_service.generate_map_room("A clearing at the edge of the map")
+        second = await world_service.generate_map_room("  A clearing at the edge\n of the map")
+        bypassed = await world_service.generate_map_room("A clearing at the edge of the map", use_cache=False)
+        await close_gpt_client()
+
+    # Then
+    assert first == second == bypassed
+    assert first["name"] == "Fake Glade"
+    assert len(server.requests) == 2
+    stats = llm_response_cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["saved_seconds"] >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached(llm_response_cache, llm_scheduler):
+    """Test that a failed completion is retried on the next call instead of being served from the cache."""
+    logger.info("Starting test: test_errors_are_not_cached")
+    # Given
+    await start_gpt_client(api_key="test", model="fake", base_url="http://127.0.0.1:9/v1", max_retries=0)
+
+    # When
+    failed = await get_gpt_response("a room")
+    await close_gpt_client()
+
+    # Then
+    assert isinstance(failed, str) and failed.startswith("Error while getting response from GPT")
+    assert len(llm_response_cache) == 0
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from app.core.gpt_service import close_gpt_client, get_gpt_response, start_gpt_client
+from app.core.llm_scheduler import BULK, INTERACTIVE, PREFETCH, LlmDeadlineExceeded, LlmScheduler
+from app.core.services.world_generation_service import WorldGenerationService
+from tests.fake_llm_server import FakeChatServer
+from tests.fixtures import llm_response_cache, llm_scheduler, setup_test_db
+
+logger = logging.getLogger(__name__)
+
+
+def drained(scheduler: LlmScheduler) -> LlmScheduler:
+    """Empty the request bucket, so every call waits for its refill."""
+    scheduler.requests.level = 0
+    return scheduler
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_calls_are_retried(llm_scheduler, llm_response_cache):
+    """Test that 429s from the provider are retried with backoff until the call succeeds."""
+    logger.info("Starting test: test_rate_limited_calls_are_retried")
+    async with FakeChatServer() as server:
+        # Given
+        await start_gpt_client(api_key="test", model="fake", base_url=server.base_url)
+        server.errors = [429, 429, 503]
+
+        # When
+        response = await get_gpt_response("a room", cache=False)
+        await close_gpt_client()
+
+    # Then
+    assert response == {"name": "Fake Glade", "description": "A quiet glade."}
+    assert len(server.requests) == 4
+    stats = llm_scheduler.as_dict()
+    assert stats["retries"] == 3
+    assert stats["rate_limited"] == 2
+    assert stats["queues"]["interactive"]["admitted"] == 4
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_respected(llm_scheduler, llm_response_cache):
+    """Test that the provider's Retry-After replaces the computed backoff."""
+    logger.info("Starting test: test_retry_after_is_respected")
+    async with FakeChatServer() as server:
+        # Given
+        await start_gpt_client(api_key="test", model="fake", base_url=server.base_url)
+        server.errors = [429]
+        server.retry_after = 0.3
+
+        # When
+        started = time.perf_counter()
+        response = await get_gpt_response("a room", cache=False)
+        elapsed = time.perf_counter() - started
+        await close_gpt_client()
+
+    # Then
+    assert response["name"] == "Fake Glade"
+    assert elapsed >= 0.3
+
+
+@pytest.mark.asyncio
+async def test_retries_give_up_and_other_errors_fail_at_once(llm_scheduler, setup_test_db, llm_response_cache):
+    """Test that retries stop after max_retries, a 400 is not retried, and generation reports both as errors."""
+    logger.info("Starting test: test_retries_give_up_and_other_errors_fail_at_once")
+    async with FakeChatServer() as server:
+        # Given
+        await start_gpt_client(api_key="test", model="fake", base_url=server.base_url)
+        world_service = WorldGenerationService(setup_test_db)
+
+        # When
+        server.errors = [429] * 10
+        exhausted = await world_service.generate_map_room("a room", use_cache=False)
+        requests_when_exhausted = len(server.requests)
+        server.errors = [400]
+        rejected = await world_service.generate_map_room("another room", use_cache=False)
+        await close_gpt_client()
+
+    # Then
+    assert "error" in exhausted and "error" in rejected
+    assert requests_when_exhausted == llm_scheduler.max_retries + 1
+    assert len(server.requests) == requests_when_exhausted + 1
+    assert llm_scheduler.stats.failures == 2
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_goes_first():
+    """Test that waiting interactive calls are admitted before background work queued earlier."""
+    logger.info("Starting test: test_higher_priority_goes_first")
+    # Given - ten requests a second
+    scheduler = drained(LlmScheduler(requests_per_minute=600))
+    order = []
+
+    async def call(name):
+        order.append(name)
+
+    # When
+    jobs = [asyncio.create_task(scheduler.run(lambda: call("bulk"), priority=BULK)) for _ in range(2)]
+    jobs += [asyncio.create_task(scheduler.run(lambda: call("prefetch"), priority=PREFETCH)) for _ in range(2)]
+    await asyncio.sleep(0)
+    jobs += [asyncio.create_task(scheduler.run(lambda: call("interactive"), priority=INTERACTIVE)) for _ in range(2)]
+    await asyncio.gather(*jobs)
+    await scheduler.close()
+
+    # Then
+    assert order == ["interactive"] * 2 + ["prefetch"] * 2 + ["bulk"] * 2
+    queues = scheduler.as_dict()["queues"]
+    assert queues["bulk"]["max_wait_ms"] > queues["interactive"]["max_wait_ms"] > 0
+    assert all(queue["depth"] == 0 for queue in queues.values())
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_throughput():
+    """Test that calls are spread out to stay within tokens per minute."""
+    logger.info("Starting test: test_token_bucket_limits_throughput")
+    # Given - 1000 tokens a second, 100 tokens a call, the bucket empty
+    scheduler = LlmScheduler(requests_per_minute=0, tokens_per_minute=60000, completion_tokens=100)
+    scheduler.tokens.level = 0
+
+    # When
+    started = time.perf_counter()
+    await asyncio.gather(*(scheduler.run(lambda: asyncio.sleep(0)) for _ in range(5)))
+    elapsed = time.perf_counter() - started
+    await scheduler.close()
+
+    # Then
+    assert 0.45 <= elapsed < 1.5
+
+
+@pytest.mark.asyncio
+async def test_stale_prefetch_is_dropped():
+    """Test that background work waiting past its deadline is dropped without being sent."""
+    logger.info("Starting test: test_stale_prefetch_is_dropped")
+    # Given - one request a second
+    scheduler = drained(LlmScheduler(requests_per_minute=60, max_wait={PREFETCH: 0.1}))
+    sent = []
+
+    async def call(name):
+        sent.append(name)
+        return name
+
+    # When
+    started = time.perf_counter()
+    prefetch = asyncio.create_task(scheduler.run(lambda: call("prefetch"), priority=PREFETCH))
+    with pytest.raises(LlmDeadlineExceeded):
+        await prefetch
+    dropped_after = time.perf_counter() - started
+    await scheduler.close()
+
+    # Then - dropped at its deadline rather than when the bucket refilled
+    assert sent == []
+    assert dropped_after < 0.5
+    assert scheduler.as_dict()["queues"]["prefetch"]["dropped"] == 1
+
+
+def test_zero_max_wait_from_env_never_drops(monkeypatch):
+    """Test that a max wait of 0 in the environment means no deadline, for prefetch and bulk alike."""
+    logger.info("Starting test: test_zero_max_wait_from_env_never_drops")
+    # Given
+    monkeypatch.setenv("LLM_PREFETCH_MAX_WAIT", "0")
+    monkeypatch.setenv("LLM_BULK_MAX_WAIT", "0")
+
+    # When
+    scheduler = LlmScheduler.from_env()
+
+    # Then
+    assert scheduler.max_wait == {INTERACTIVE: None, PREFETCH: None, BULK: None}
@@ -0,0 +1,152 @@
+import json
+import logging
+import threading
+import time
+
+import pytest
+
+from app.core.gpt_service import close_gpt_client, get_gpt_response, start_gpt_client, stream_locations
+from app.db.models import PlayerModel, RoomDetailModel, RoomModel
+from tests.fake_llm_server import FakeChatServer
+from tests.fixtures import game_engine, llm_response_cache, setup_test_db, world_service
+
+logger = logging.getLogger(__name__)
+
+# The room entered north of the start room, then its neighbors not already on the map.
+COORDINATES = [(0, 1), (-1, 2), (0, 2), (1, 2), (-1, 1), (1, 1)]
+
+
+def locations_document(coordinates=COORDINATES) -> str:
+    return json.dumps({"locations": [
+        {
+            "coords": {"x": str(x), "y": str(y)},
+            "name": f"Glade {x},{y}",
+            "description": f"A glade at {x},{y}. " + "Wind moves through the tall grass. " * 16,
+            "type": "outdoor: glade",
+            "features": [{"type": "stone", "description": "A mossy {stone}"}],
+            "sounds": ["wind"],
+            "smells": ["grass"],
+        }
+        for x, y in coordinates
+    ]}, indent=2)
+
+
+@pytest.mark.asyncio
+async def test_locations_stream_before_response_completes(llm_response_cache):
+    """Test that the first location is yielded long before the whole answer has arrived."""
+    logger.info("Starting test: test_locations_stream_before_response_completes")
+    async with FakeChatServer(content=locations_document(), chunk_size=16, tokens_per_second=2000) as server:
+        # Given
+        await start_gpt_client(api_key="test", model="fake", base_url=server.base_url, max_retries=0)
+        await get_gpt_response("warm up", cache=False)
+
+        # When
+        started = time.perf_counter()
+        arrivals = []
+        async for location in stream_locations("six glades"):
+            arrivals.append((time.perf_counter() - started, location))
+        await close_gpt_client()
+
+    # Then
+    first_room, full_response = arrivals[0][0], arrivals[-1][0]
+    logger.info(f"Time to first room {first_room * 1000:.0f} ms, to full response {full_response * 1000:.0f} ms")
+    assert [location["name"] for _, location in arrivals] == [f"Glade {x},{y}" for x, y in COORDINATES]
+    assert first_room < full_response / 3
+
+
+@pytest.mark.asyncio
+async def test_streamed_locations_are_cached(llm_response_cache):
+    """Test that a completed stream is cached and replayed, while an answer without locations is not cached."""
+    logger.info("Starting test: test_streamed_locations_are_cached")
+    async with FakeChatServer(content=locations_document()) as server:
+        # Given
+        await start_gpt_client(api_key="test", model="fake", base_url=server.base_url, max_retries=0)
+
+        # When
+        streamed = [location async for location in stream_locations("six glades")]
+        replayed = [location async for location in stream_locations("six glades")]
+        server.content = '{"error": "Location occupied"}'
+        occupied = [location async for location in stream_locations("an occupied glade")]
+        await close_gpt_client()
+
+    # Then
+    assert streamed == replayed and len(streamed) == len(COORDINATES)
+    assert occupied == []
+    assert len(server.requests) == 2
+    assert len(llm_response_cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_entered_room_is_saved_before_neighbors(world_service, llm_response_cache):
+    """Test that the entered room is saved and returned while its neighbors are still streaming."""
+    logger.info("Starting test: test_entered_room_is_saved_before_neighbors")
+    async with FakeChatServer(content=locations_document(), chunk_size=16, tokens_per_second=2000) as server:
+        # Given
+        await start_gpt_client(api_key="test", model="fake", base_url=server.base_url, max_retries=0)
+        saved_from, save = [], world_service.save_map_room_to_db
+        world_service.save_map_room_to_db = lambda room_data: (saved_from.append(threading.current_thread()),
+                                                               save(room_data))
+
+        # When
+        room, neighbors_task = await world_service.enter_connected_room({"x": 0, "y": 0}, "north")
+        saved_on_return = RoomModel.get_room_by_coordinates(world_service.connection, {"x": 0, "y": 1})
+        pending_on_return = not neighbors_task.done()
+        neighbors = await neighbors_task
+        await close_gpt_client()
+
+    # Then
+    assert room == {"name": "Glade 0,1", "description": room["description"], "grid_coordinates": {"x": 0, "y": 1}}
+    assert saved_on_return is not None and saved_on_return.name == "Glade 0,1"
+    assert pending_on_return
+    assert [neighbor["grid_coordinates"] for neighbor in neighbors] == [{"x": x, "y": y} for x, y in COORDINATES[1:]]
+    for x, y in COORDINATES[1:]:
+        assert RoomModel.get_room_by_coordinates(world_service.connection, {"x": x, "y": y}) is not None
+    # Saved on the database executor, not on the event loop's thread
+    assert len(saved_from) == len(COORDINATES) and threading.main_thread() not in saved_from
+
+
+@pytest.mark.asyncio
+async def test_entered_rooms_are_linked_with_their_details(world_service, llm_response_cache, game_engine):
+    """Test that generated rooms are saved with terrain, features and ambience, and can be walked into."""
+    logger.info("Starting test: test_entered_rooms_are_linked_with_their_details")
+    connection = world_service.connection
+    async with FakeChatServer(content=locations_document()) as server:
+        # Given - a player at the start room, whose exits are already cached
+        await start_gpt_client(api_key="test", model="fake", base_url=server.base_url, max_retries=0)
+        PlayerModel.create_player(connection, name="TestPlayer")
+        assert game_engine.move(connection, "TestPlayer", "north")["success"] is False
+
+        # When
+        room, neighbors_task = await world_service.enter_connected_room({"x": 0, "y": 0}, "north")
+        await neighbors_task
+        await close_gpt_client()
+
+    # Then
+    moves = [game_engine.move(connection, "TestPlayer", direction) for direction in ("north", "northeast", "south")]
+    assert [move["success"] for move in moves] == [True, True, True]
+    assert PlayerModel.get_player_by_name(connection, "TestPlayer").current_room == "Glade 1,1"
+    glade = RoomModel.get_room_by_coordinates(connection, {"x": 0, "y": 1})
+    assert RoomModel.get_rooms_in_region(connection, 0, 1, 0, 1)[0].terrain_type == "outdoor: glade"
+    assert RoomDetailModel.get_room_features(connection, glade.id) == [
+        {"type": "stone", "description": "A mossy {stone}"}
+    ]
+    assert RoomDetailModel.get_room_ambience(connection, glade.id, "sound") == ["wind"]
+    assert RoomDetailModel.get_room_ambience(connection, glade.id, "smell") == ["grass"]
+
+
+@pytest.mark.asyncio
+async def test_missing_room_is_an_error(world_service, llm_response_cache):
+    """Test that an answer without the requested room reports an error."""
+    logger.info("Starting test: test_missing_room_is_an_error")
+    async with FakeChatServer(content='{"error": "Location occupied"}') as server:
+        # Given
+        await start_gpt_client(api_key="test", model="fake", base_url=server.base_url, max_retries=0)
+
+        # When
+        room, neighbors_task = await world_service.enter_connected_room({"x": 0, "y": 0}, "north")
+        await close_gpt_client()
+
+    # Then
+    assert "error" in room
+    assert neighbors_task is None
+    assert RoomModel.get_room_by_coordinates(world_service.connection, {"x": 0, "y": 1}) is None
@@ -0,0 +1,154 @@
+import base64
+import json
+import logging
+import zlib
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.player import player_map
+from app.core.map_view import (
+    ZLIB, decode_room_ids, encode_room_ids, render_player_viewport, run_length_decode, run_length_encode,
+)
+from app.db.caches import clear_caches
+from app.db.map_tiles import map_tiles
+from app.db.models import PlayerModel, RoomModel
+from app.db.room_identity import room_identity
+from tests.fixtures import setup_test_db
+
+logger = logging.getLogger(__name__)
+
+
+def _grids(payload):
+    shape = (payload["height"], payload["width"])
+    return (run_length_decode(payload["terrain"]).reshape(shape),
+            decode_room_ids(payload["room_ids"]).reshape(shape))
+
+
+def test_run_length_round_trip():
+    """Test that terrain and room id encodings decode to what was encoded."""
+    logger.info("Starting test: test_run_length_round_trip")
+    # Given
+    terrain = np.array([[1, 1, 0], [0, 2, 2]])
+    room_ids = np.array([[5, 6, 7], [0, 0, 12]])
+
+    # When
+    terrain_runs = run_length_encode(terrain)
+    room_id_runs = encode_room_ids(room_ids)
+
+    # Then
+    assert terrain_runs == [1, 2, 0, 2, 2, 2]
+    assert run_length_decode(terrain_runs).tolist() == terrain.ravel().tolist()
+    assert decode_room_ids(room_id_runs).tolist() == room_ids.ravel().tolist()
+    assert run_length_encode(np.zeros((0,))) == []
+
+
+def test_viewport_around_player(setup_test_db):
+    """Test that the viewport is centred on the player, north up, with names of the visible rooms only."""
+    logger.info("Starting test: test_viewport_around_player")
+    # Given - a forest north of the start room and a room just outside the 3 x 3 viewport
+    RoomModel.upsert_rooms(setup_test_db, [
+        ("clearing", "", 0, 1, "forest"),
+        ("far_away", "", 5, 5, "desert"),
+    ])
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    ids = {name: room_identity.id_for_name(setup_test_db, name)
+           for name in ("start", "east_room", "west_room", "clearing")}
+
+    # When
+    payload = render_player_viewport(setup_test_db, "Alice", 3, 3)
+    terrain, room_ids = _grids(payload)
+
+    # Then
+    assert (payload["x0"], payload["y0"]) == (-1, -1)
+    assert room_ids.tolist() == [
+        [0, ids["clearing"], 0],
+        [ids["west_room"], ids["start"], ids["east_room"]],
+        [0, 0, 0],
+    ]
+    assert payload["legend"][int(terrain[0, 1])] == "forest"
+    assert terrain[2].tolist() == [0, 0, 0]
+    assert sorted(payload["names"].values()) == ["clearing", "east_room", "start", "west_room"]
+
+
+def test_tiles_rerender_after_room_saved(setup_test_db):
+    """Test that tiles are reused until a room is saved in their chunk."""
+    logger.info("Starting test: test_tiles_rerender_after_room_saved")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    render_player_viewport(setup_test_db, "Alice", 5, 5)
+    renders = map_tiles.renders
+
+    # When
+    render_player_viewport(setup_test_db, "Alice", 5, 5)
+    cached_renders = map_tiles.renders
+    RoomModel.create_room(setup_test_db, "north_room", "", 0, 1)
+    payload = render_player_viewport(setup_test_db, "Alice", 5, 5)
+
+    # Then
+    assert cached_renders == renders
+    assert map_tiles.renders > renders
+    assert "north_room" in payload["names"].values()
+
+
+def test_zlib_encoding_matches_rle(setup_test_db):
+    """Test that both encodings describe the same grids."""
+    logger.info("Starting test: test_zlib_encoding_matches_rle")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+
+    # When
+    rle = render_player_viewport(setup_test_db, "Alice", 8, 4)
+    packed = render_player_viewport(setup_test_db, "Alice", 8, 4, encoding=ZLIB, with_names=False)
+
+    # Then
+    terrain, room_ids = _grids(rle)
+    unpack = lambda data, dtype: np.frombuffer(zlib.decompress(base64.b64decode(data)), dtype=dtype).reshape(4, 8)
+    assert unpack(packed["terrain"], "<u2").tolist() == terrain.tolist()
+    assert unpack(packed["room_ids"], "<i4").tolist() == room_ids.tolist()
+    assert "names" not in packed
+
+
+@pytest.mark.asyncio
+async def test_map_endpoint_rejects_bad_requests(setup_test_db):
+    """Test that unknown players, oversized viewports and unknown encodings are refused."""
+    logger.info("Starting test: test_map_endpoint_rejects_bad_requests")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+
+    # When / Then
+    for kwargs, status in (
+        ({"player_name": "Nobody"}, 404),
+        ({"player_name": "Alice", "width": 100_000}, 400),
+        ({"player_name": "Alice", "encoding": "png"}, 400),
+    ):
+        with pytest.raises(HTTPException) as error:
+            await player_map(**{"width": 64, "height": 64, "encoding": "rle", "names": True, **kwargs},
+                             connection=setup_test_db)
+        assert error.value.status_code == status
+    response = await player_map("Alice", 64, 64, "rle", True, connection=setup_test_db)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body)["width"] == 64
+
+
+@pytest.mark.asyncio
+async def test_viewport_of_player_in_no_room(setup_test_db):
+    """Test that a player whose room is NULL or gone gets an error viewport instead of a crash."""
+    logger.info("Starting test: test_viewport_of_player_in_no_room")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    PlayerModel.create_player(setup_test_db, name="Bob")
+    setup_test_db.execute("UPDATE players SET current_room_id = NULL WHERE name = 'Alice';")
+    setup_test_db.execute("UPDATE players SET current_room_id = 999999 WHERE name = 'Bob';")
+    clear_caches()
+
+    # When
+    payloads = [render_player_viewport(setup_test_db, name, 5, 5) for name in ("Alice", "Bob")]
+
+    # Then
+    assert [payload["player"]["room_id"] for payload in payloads] == [None, 999999]
+    assert all("error" in payload and "terrain" not in payload for payload in payloads)
+    with pytest.raises(HTTPException) as error:
+        await player_map("Alice", 5, 5, "rle", True, connection=setup_test_db)
+    assert error.value.status_code == 409
@@ -0,0 +1,124 @@
+import logging
+import sqlite3
+
+import pytest
+
+from app.db.caches import clear_caches
+from app.db.migrations import MIGRATIONS, get_schema_version, migrate
+from app.db.models import PlayerModel, RoomModel, InventoryModel, NeighborRelationModel
+from app.db.room_graph import room_graph
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def raw_connection(tmp_path):
+    """Provides a plain sqlite3 connection so statements can be traced and explained."""
+    connection = sqlite3.connect(tmp_path / "migrations_test.db")
+    connection.row_factory = sqlite3.Row
+    yield connection
+    connection.close()
+
+
+def test_migrate_records_every_version(raw_connection):
+    """Test that a fresh database ends at the latest version and re-running is a no-op."""
+    logger.info("Starting test: test_migrate_records_every_version")
+    # When
+    version = migrate(raw_connection)
+
+    # Then
+    assert version == MIGRATIONS[-1][0]
+    assert get_schema_version(raw_connection) == version
+    assert migrate(raw_connection) == version
+    applied = raw_connection.execute("SELECT version FROM schema_version ORDER BY version;").fetchall()
+    assert [row["version"] for row in applied] == [migration[0] for migration in MIGRATIONS]
+
+
+def test_migrate_upgrades_legacy_database(raw_connection):
+    """Test upgrading a database created by the old create_table DDL, including duplicate names."""
+    logger.info("Starting test: test_migrate_upgrades_legacy_database")
+    # Given - the pre-versioning schema, rooms without the coordinate constraint
+    raw_connection.execute("""
+        CREATE TABLE players (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, current_room TEXT NOT NULL);
+    """)
+    raw_connection.execute("""
+        CREATE TABLE rooms (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, description TEXT NOT NULL,
+                            x_coordinate INTEGER NOT NULL, y_coordinate INTEGER NOT NULL);
+    """)
+    raw_connection.execute("""
+        INSERT INTO rooms (name, description, x_coordinate, y_coordinate) VALUES ('east_room', 'East.', 1, 0);
+    """)
+    raw_connection.execute("INSERT INTO players (name, current_room) VALUES ('TestPlayer', 'east_room');")
+    raw_connection.execute("INSERT INTO players (name, current_room) VALUES ('TestPlayer', 'start');")
+    raw_connection.commit()
+
+    # When
+    migrate(raw_connection)
+
+    # Then - the oldest duplicate survives, its room name became the room id and coordinates are unique
+    players = raw_connection.execute("SELECT * FROM players;").fetchall()
+    assert len(players) == 1
+    assert players[0]["current_room_id"] == RoomModel.get_room_by_name(raw_connection, "east_room").id
+    RoomModel.create_room(raw_connection, "start", "The starting point of your journey.", 0, 0)
+    with pytest.raises(sqlite3.IntegrityError):
+        RoomModel.create_room(raw_connection, "copy", "Same cell.", 0, 0)
+
+
+def test_migrate_merges_inventory_rows_into_quantities(raw_connection):
+    """Test that one-row-per-item inventories become one row per holder and item with a quantity."""
+    logger.info("Starting test: test_migrate_merges_inventory_rows_into_quantities")
+    # Given - a database at version 5 with duplicated item rows for a player and a room
+    clear_caches()
+    get_schema_version(raw_connection)
+    for version, description, apply in MIGRATIONS[:5]:
+        apply(raw_connection)
+    raw_connection.execute("INSERT INTO rooms (name, description, x_coordinate, y_coordinate) VALUES ('start', '', 0, 0);")
+    raw_connection.execute("INSERT INTO players (name, current_room_id) VALUES ('TestPlayer', 1);")
+    raw_connection.executemany("INSERT INTO inventory (player_name, item_name) VALUES (?, ?);", [
+        ("TestPlayer", "Arrow"), ("TestPlayer", "Arrow"), ("TestPlayer", "Magic Sword"),
+    ])
+    raw_connection.executemany("INSERT INTO inventory (room_id, item_name) VALUES (?, ?);", [(1, "Arrow")] * 3)
+    raw_connection.executemany("INSERT INTO schema_version (version, description) VALUES (?, ?);", [
+        (version, description) for version, description, apply in MIGRATIONS[:5]
+    ])
+    raw_connection.commit()
+
+    # When
+    migrate(raw_connection)
+
+    # Then
+    entries = InventoryModel.get_player_inventory_entries(raw_connection, "TestPlayer")
+    assert sorted((entry.item_name, entry.quantity) for entry in entries) == [("Arrow", 2), ("Magic Sword", 1)]
+    assert InventoryModel.get_quantity(raw_connection, (InventoryModel.ROOM, 1), "Arrow") == 3
+
+
+def test_hot_queries_use_indexes(raw_connection):
+    """Test that no per-request model query falls back to a full table scan."""
+    logger.info("Starting test: test_hot_queries_use_indexes")
+    # Given
+    clear_caches()
+    migrate(raw_connection)
+    RoomModel.ensure_start_room(raw_connection)
+    statements = []
+    raw_connection.set_trace_callback(statements.append)
+
+    # When - run every hot-path lookup, capturing the SQL actually sent to SQLite
+    PlayerModel.get_player_by_name(raw_connection, "TestPlayer")
+    RoomModel.get_room_by_name(raw_connection, "start")
+    RoomModel.get_room_by_coordinates(raw_connection, {"x": 0, "y": 0})
+    InventoryModel.is_item_in_room(raw_connection, "start", "Magic Sword")
+    InventoryModel.is_item_with_player(raw_connection, "TestPlayer", "Magic Sword")
+    InventoryModel.get_player_inventory(raw_connection, "TestPlayer")
+    InventoryModel.get_quantity(raw_connection, (InventoryModel.ROOM, 1), "Magic Sword")
+    NeighborRelationModel.get_neighbors_with_coordinates(raw_connection, 1)
+    RoomModel.get_rooms_in_chunk(raw_connection, 0, 0)
+    room_graph.neighbors(raw_connection, 1)
+    raw_connection.set_trace_callback(None)
+
+    # Then
+    queries = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+    assert len(queries) >= 10
+    for sql in queries:
+        plan = [row["detail"] for row in raw_connection.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+        logger.info(f"Plan for {' '.join(sql.split())}: {plan}")
+        assert not any(step.startswith("SCAN") for step in plan), f"Full scan in plan {plan} for query: {sql}"
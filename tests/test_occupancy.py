@@ -0,0 +1,120 @@
+import logging
+
+import pytest
+
+from app.api.v1.player import nearby_players, room_occupants
+from app.core.batch_handler import BatchHandler, ROLLBACK
+from app.db.caches import clear_caches
+from app.db.database import enable_location_write_behind, disable_location_write_behind
+from app.db.models import PlayerModel, RoomModel
+from app.db.occupancy import occupancy
+from app.db.room_identity import room_identity
+from tests.fixtures import game_engine, setup_test_db
+
+logger = logging.getLogger(__name__)
+
+
+def _room_id(connection, name):
+    return room_identity.id_for_name(connection, name)
+
+
+def test_occupancy_follows_registration_and_moves(setup_test_db, game_engine):
+    """Test that new players and successful moves update the index, failed moves do not."""
+    logger.info("Starting test: test_occupancy_follows_registration_and_moves")
+    # Given
+    occupancy.rebuild(setup_test_db)
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    PlayerModel.create_player(setup_test_db, name="Bob")
+
+    # When
+    game_engine.move(setup_test_db, "Alice", "east")
+    game_engine.move(setup_test_db, "Bob", "north")
+
+    # Then
+    assert occupancy.occupants(setup_test_db, _room_id(setup_test_db, "start")) == ["Bob"]
+    assert occupancy.occupants(setup_test_db, _room_id(setup_test_db, "east_room")) == ["Alice"]
+    assert occupancy.room_of(setup_test_db, "Alice") == _room_id(setup_test_db, "east_room")
+
+
+def test_players_near_crosses_chunks(setup_test_db):
+    """Test radius queries across chunk boundaries and negative coordinates, however large the radius."""
+    logger.info("Starting test: test_players_near_crosses_chunks")
+    # Given - rooms either side of the chunk boundaries at x = 0 and x = 16
+    for name, x in (("far_west", -20), ("edge", 15), ("over", 16), ("far_east", 40)):
+        RoomModel.create_room(setup_test_db, name, "", x, 0)
+        PlayerModel.create_player(setup_test_db, name=name.title(), current_room=name)
+    PlayerModel.create_player(setup_test_db, name="Me")
+    PlayerModel.create_player(setup_test_db, name="Roommate")
+
+    # When
+    near = occupancy.players_near(setup_test_db, "Me", 16)
+    everyone = occupancy.players_near(setup_test_db, "Me", 10_000)
+
+    # Then
+    assert [(distance, name) for distance, name, _ in near] == [(0, "Roommate"), (15, "Edge"), (16, "Over")]
+    assert [name for _, name, _ in everyone] == ["Roommate", "Edge", "Over", "Far_West", "Far_East"]
+    assert occupancy.players_near(setup_test_db, "Nobody", 5) == []
+
+
+def test_rebuild_matches_database(setup_test_db, game_engine):
+    """Test that a rebuild after a restart (caches dropped) indexes what the database holds."""
+    logger.info("Starting test: test_rebuild_matches_database")
+    # Given - one player written behind the models' back, another moved normally
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    game_engine.move(setup_test_db, "Alice", "west")
+    setup_test_db.execute("INSERT INTO players (name, current_room_id) VALUES ('Bob', ?);",
+                          (_room_id(setup_test_db, "west_room"),))
+
+    # When
+    clear_caches()
+    indexed = occupancy.rebuild(setup_test_db)
+
+    # Then
+    assert indexed == 2
+    assert occupancy.occupants(setup_test_db, _room_id(setup_test_db, "west_room")) == ["Alice", "Bob"]
+
+
+def test_rolled_back_and_buffered_moves(setup_test_db):
+    """Test that rolled-back moves never reach the index and buffered moves do, also across a rebuild."""
+    logger.info("Starting test: test_rolled_back_and_buffered_moves")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    BatchHandler().run(setup_test_db, [
+        {"player_name": "Alice", "action": "move", "direction": "east"},
+        {"player_name": "Alice", "action": "move", "direction": "north"},
+    ], on_error=ROLLBACK)
+    assert occupancy.room_of(setup_test_db, "Alice") == _room_id(setup_test_db, "start")
+
+    # When
+    buffer = enable_location_write_behind(max_pending=100, flush_interval=60)
+    try:
+        PlayerModel.update_player_location(setup_test_db, "Alice", "east_room")
+        moved = occupancy.room_of(setup_test_db, "Alice")
+        occupancy.rebuild(setup_test_db)
+        rebuilt = occupancy.room_of(setup_test_db, "Alice")
+        assert buffer.flush() == 1
+    finally:
+        disable_location_write_behind()
+
+    # Then
+    assert moved == rebuilt == _room_id(setup_test_db, "east_room")
+
+
+@pytest.mark.asyncio
+async def test_presence_endpoints(setup_test_db):
+    """Test the occupants and nearby endpoints."""
+    logger.info("Starting test: test_presence_endpoints")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    PlayerModel.create_player(setup_test_db, name="Bob", current_room="east_room")
+
+    # When
+    occupants = await room_occupants("start", connection=setup_test_db)
+    nearby = await nearby_players("Alice", radius=1, connection=setup_test_db)
+
+    # Then
+    assert occupants == {"room": "start", "players": ["Alice"]}
+    assert nearby == {"players": [{"name": "Bob", "room": "east_room", "distance": 1}]}
+    with pytest.raises(Exception) as error:
+        await nearby_players("Alice", radius=1000, connection=setup_test_db)
+    assert error.value.status_code == 400
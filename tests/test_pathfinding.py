@@ -0,0 +1,120 @@
+import logging
+
+import pytest
+
+from app.api.v1.player import PlayerTravel, travel_player
+from app.core.game_engine import GameEngine
+from app.core.pathfinding import distance_fields, find_path, plan_route
+from app.core.services.world_generation_service import WorldGenerationService
+from app.db.models import PlayerModel, RoomModel, NeighborRelationModel
+from tests.fixtures import setup_test_db
+
+logger = logging.getLogger(__name__)
+
+WALL = {(2, -2), (2, -1), (2, 0), (2, 1)}
+
+
+@pytest.fixture
+def walled_world(setup_test_db):
+    """Extends the test rooms to a grid from (-1, -2) to (4, 2) split by a wall at x = 2 with a gap at the top."""
+    RoomModel.upsert_rooms(setup_test_db, [
+        (f"room_{x}_{y}", "", x, y, "plains")
+        for x in range(-1, 5) for y in range(-2, 3)
+        if (x, y) not in WALL and (x, y) not in {(0, 0), (1, 0), (-1, 0)}
+    ])
+    NeighborRelationModel.link_grid_neighbors(setup_test_db)
+    return setup_test_db
+
+
+def _room_id(connection, x, y):
+    return RoomModel.get_room_by_coordinates(connection, {"x": x, "y": y}).id
+
+
+def test_a_star_routes_around_walls(walled_world):
+    """Test that A* finds a shortest route through the gap and every step is a real exit."""
+    logger.info("Starting test: test_a_star_routes_around_walls")
+    # Given
+    start, goal = _room_id(walled_world, 0, 0), _room_id(walled_world, 4, 0)
+
+    # When
+    route = find_path(walled_world, start, goal)
+
+    # Then - (0,0) -> (1,1) -> (2,2) -> (3,1) -> (4,0)
+    assert [direction for direction, _ in route] == ["northeast", "northeast", "southeast", "southeast"]
+    assert route[-1][1] == goal
+    assert NeighborRelationModel.route_exists(walled_world, start, route) is True
+    assert find_path(walled_world, start, goal, max_expansions=1) is None
+
+
+def test_distance_field_matches_a_star(walled_world):
+    """Test that routes to a popular destination come from its distance field and are as short as A*."""
+    logger.info("Starting test: test_distance_field_matches_a_star")
+    # Given
+    start = _room_id(walled_world, 0, 0)
+    far = _room_id(walled_world, 4, -2)
+
+    # When
+    route = plan_route(walled_world, far, start)
+
+    # Then
+    field = distance_fields.get(walled_world, start)
+    assert distance_fields.builds == 1
+    assert len(route) == field.distances[far] == len(find_path(walled_world, far, start))
+    assert route[-1][1] == start
+
+
+def test_distance_field_updates_when_rooms_are_connected(walled_world):
+    """Test that connecting a new room extends an existing field without rebuilding it."""
+    logger.info("Starting test: test_distance_field_updates_when_rooms_are_connected")
+    # Given
+    start = _room_id(walled_world, 0, 0)
+    distance_fields.get(walled_world, start)
+    RoomModel.create_room(walled_world, "tower", "A lonely tower.", 0, 3)
+    tower, below = _room_id(walled_world, 0, 3), _room_id(walled_world, 0, 2)
+
+    # When
+    service = WorldGenerationService(walled_world)
+    service.connect_rooms(below, tower, "north")
+    service.connect_rooms(tower, below, "south")
+
+    # Then
+    field = distance_fields.get(walled_world, start)
+    assert field.distances[tower] == 3
+    assert distance_fields.builds == 1
+    assert [room_id for _, room_id in field.route_from(walled_world, tower)][-1] == start
+
+
+def test_travel_applies_whole_route(walled_world):
+    """Test that travelling moves the player to the destination in one action."""
+    logger.info("Starting test: test_travel_applies_whole_route")
+    # Given
+    PlayerModel.create_player(walled_world, name="TestPlayer")
+
+    # When
+    result = GameEngine().travel(walled_world, "TestPlayer", "room_4_0")
+    missing = GameEngine().travel(walled_world, "TestPlayer", "nowhere")
+
+    # Then
+    assert result["success"] is True
+    assert result["message"] == "You have travelled to room_4_0 in 4 steps."
+    assert result["path"] == ["room_1_1", "room_2_2", "room_3_1", "room_4_0"]
+    assert PlayerModel.get_player_by_name(walled_world, "TestPlayer").current_room == "room_4_0"
+    assert missing["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_travel_endpoint(walled_world):
+    """Test the travel endpoint returns the path and rejects unreachable destinations."""
+    logger.info("Starting test: test_travel_endpoint")
+    # Given - a room with no exits
+    PlayerModel.create_player(walled_world, name="TestPlayer")
+    RoomModel.create_room(walled_world, "island", "Cut off from everything.", 10, 10)
+
+    # When
+    response = await travel_player(PlayerTravel(player_name="TestPlayer", destination="room_3_1"), connection=walled_world)
+
+    # Then
+    assert response["path"] == ["room_1_1", "room_2_2", "room_3_1"]
+    with pytest.raises(Exception) as error:
+        await travel_player(PlayerTravel(player_name="TestPlayer", destination="island"), connection=walled_world)
+    assert "no known route" in str(error.value.detail)
@@ -0,0 +1,109 @@
+import logging
+
+from app.core.batch_handler import BatchHandler, ROLLBACK
+from app.db.models import InventoryModel, PlayerModel
+from app.db.player_cache import PlayerCache, player_cache, player_request_scope
+from tests.fixtures import game_engine, inventory_handler, setup_test_db
+
+logger = logging.getLogger(__name__)
+
+
+class _Connection:
+    in_transaction = False
+
+
+def test_request_scope_loads_each_player_once(setup_test_db):
+    """Test that a request reads a player from the cache layer only once, however often it asks."""
+    logger.info("Starting test: test_request_scope_loads_each_player_once")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+
+    # When
+    with player_request_scope():
+        first = PlayerModel.get_player_by_name(setup_test_db, "TestPlayer")
+        second = PlayerModel.get_player_by_name(setup_test_db, "TestPlayer")
+    third = PlayerModel.get_player_by_name(setup_test_db, "TestPlayer")
+
+    # Then
+    assert first == second == third and first is not second
+    assert (player_cache.misses, player_cache.request_hits, player_cache.hits) == (1, 1, 1)
+
+
+def test_location_updates_write_through(setup_test_db, game_engine):
+    """Test that moves update the cached location instead of forcing a reload."""
+    logger.info("Starting test: test_location_updates_write_through")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+    PlayerModel.get_player_by_name(setup_test_db, "TestPlayer")
+
+    # When
+    game_engine.move(setup_test_db, "TestPlayer", "east")
+    player = PlayerModel.get_player_by_name(setup_test_db, "TestPlayer")
+
+    # Then
+    assert player.current_room == "east_room"
+    assert player_cache.misses == 1
+
+
+def test_rolled_back_writes_do_not_reach_cache(setup_test_db):
+    """Test that the cache keeps committed values when a batch is rolled back."""
+    logger.info("Starting test: test_rolled_back_writes_do_not_reach_cache")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+    InventoryModel.add_item_to_room(setup_test_db, "start", "Torch")
+    assert InventoryModel.get_player_inventory(setup_test_db, "TestPlayer") == []
+
+    # When
+    result = BatchHandler().run(setup_test_db, [
+        {"player_name": "TestPlayer", "action": "pick_up", "item_name": "Torch"},
+        {"player_name": "TestPlayer", "action": "move", "direction": "north"},
+    ], on_error=ROLLBACK)
+
+    # Then
+    assert result["committed"] is False
+    assert InventoryModel.get_player_inventory(setup_test_db, "TestPlayer") == []
+    assert PlayerModel.get_player_by_name(setup_test_db, "TestPlayer").current_room == "start"
+
+
+def test_inventory_changes_write_through(setup_test_db, inventory_handler):
+    """Test that committed inventory changes are applied to the cached inventory."""
+    logger.info("Starting test: test_inventory_changes_write_through")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+    InventoryModel.add_item_to_room(setup_test_db, "start", "Arrow", quantity=5)
+    InventoryModel.add_item_to_player(setup_test_db, "TestPlayer", "Torch")
+    InventoryModel.get_player_inventory_entries(setup_test_db, "TestPlayer")
+    misses = player_cache.misses
+
+    # When
+    inventory_handler.pick_up_item(setup_test_db, "TestPlayer", "Arrow", quantity=3)
+    inventory_handler.drop_item(setup_test_db, "TestPlayer", "Torch")
+    InventoryModel.add_item_to_player(setup_test_db, "TestPlayer", "Arrow")
+    entries = InventoryModel.get_player_inventory_entries(setup_test_db, "TestPlayer")
+
+    # Then
+    assert [(entry.item_name, entry.quantity) for entry in entries] == [("Arrow", 4)]
+    assert player_cache.misses == misses
+
+
+def test_lru_evicts_and_skips_racing_loads():
+    """Test that the LRU is bounded and does not store a load that overlapped a write."""
+    logger.info("Starting test: test_lru_evicts_and_skips_racing_loads")
+    # Given
+    cache = PlayerCache(max_players=2)
+    connection = _Connection()
+
+    # When - the third player evicts the least recently used one
+    for player_id, name in enumerate(["a", "b", "c"]):
+        cache.get_player(connection, name, lambda: (player_id, 1))
+    cache.get_player(connection, "a", lambda: (0, 1))
+
+    def racing_load():
+        cache.location_changed(connection, "d", 2)
+        return 3, 1
+    cache.get_player(connection, "d", racing_load)
+    cache.get_player(connection, "d", lambda: (3, 2))
+
+    # Then
+    assert (cache.hits, cache.misses) == (0, 6)
+    assert cache.get_player(connection, "d", lambda: None) == (3, 2)
@@ -0,0 +1,89 @@
+import logging
+
+import pytest
+
+from app.core.game_engine import GameEngine
+from app.core.services.world_generation_service import WorldGenerationService
+from app.db.models import NeighborRelationModel, PlayerModel, RoomModel
+from app.db.room_graph import room_graph
+from tests.fixtures import setup_test_db
+
+logger = logging.getLogger(__name__)
+
+
+def test_moves_follow_neighbor_relations(setup_test_db):
+    """Test that moves resolve against neighbor_relations, loading the room graph once per chunk."""
+    logger.info("Starting test: test_moves_follow_neighbor_relations")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+    game_engine = GameEngine()
+
+    # When - walk west, back east, east again and then into the void
+    results = [game_engine.move(setup_test_db, "TestPlayer", direction) for direction in ("west", "east", "east")]
+    blocked = game_engine.move(setup_test_db, "TestPlayer", "north")
+
+    # Then
+    assert [result["message"] for result in results] == [
+        "You have moved to west_room.", "You have moved to start.", "You have moved to east_room.",
+    ]
+    assert blocked["success"] is False
+    assert PlayerModel.get_player_by_name(setup_test_db, "TestPlayer").current_room == "east_room"
+    assert room_graph.chunk_loads == 2  # chunks (0, 0) and (-1, 0)
+
+
+def test_connect_rooms_updates_loaded_graph(setup_test_db):
+    """Test that an edge added by world generation is usable without reloading the graph."""
+    logger.info("Starting test: test_connect_rooms_updates_loaded_graph")
+    # Given - the graph around the start room is loaded and a room appears to the north
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+    game_engine = GameEngine()
+    assert game_engine.move(setup_test_db, "TestPlayer", "north")["success"] is False
+    RoomModel.create_room(setup_test_db, "north_room", "You have entered the north room.", 0, 1)
+    start = RoomModel.get_room_by_name(setup_test_db, "start")
+    north = RoomModel.get_room_by_name(setup_test_db, "north_room")
+    chunk_loads = room_graph.chunk_loads
+
+    # When
+    WorldGenerationService(setup_test_db).connect_rooms(start.id, north.id, "north")
+
+    # Then
+    result = game_engine.move(setup_test_db, "TestPlayer", "north")
+    assert result["message"] == "You have moved to north_room."
+    assert room_graph.chunk_loads == chunk_loads
+
+
+def test_warm_loads_every_room(setup_test_db):
+    """Test that warming the graph makes every room's exits available without chunk loads."""
+    logger.info("Starting test: test_warm_loads_every_room")
+    # When
+    loaded = room_graph.warm(setup_test_db)
+
+    # Then
+    start = RoomModel.get_room_by_name(setup_test_db, "start")
+    east = RoomModel.get_room_by_name(setup_test_db, "east_room")
+    assert loaded == 3
+    assert room_graph.neighbor(setup_test_db, start.id, "east") == east.id
+    assert room_graph.neighbor(setup_test_db, start.id, "up") is None
+    assert room_graph.chunk_loads == 0
+
+
+def test_rolled_back_relations_do_not_reach_graph(setup_test_db):
+    """Test that rooms and exits written by a transaction that rolls back never become walkable."""
+    logger.info("Starting test: test_rolled_back_relations_do_not_reach_graph")
+    # Given - the graph around the start room is loaded
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+    game_engine = GameEngine()
+    start = RoomModel.get_room_by_name(setup_test_db, "start")
+    assert room_graph.neighbor(setup_test_db, start.id, "north") is None
+
+    # When - a batch adds a room and an exit, then fails
+    with pytest.raises(RuntimeError):
+        with setup_test_db:
+            RoomModel.create_room(setup_test_db, "north_room", "You have entered the north room.", 0, 1)
+            north = RoomModel.get_room_by_name(setup_test_db, "north_room")
+            NeighborRelationModel.add_neighbor_relation(setup_test_db, start.id, north.id, "north")
+            raise RuntimeError("batch failed")
+
+    # Then
+    assert room_graph.neighbor(setup_test_db, start.id, "north") is None
+    assert game_engine.move(setup_test_db, "TestPlayer", "north")["success"] is False
@@ -0,0 +1,73 @@
+import logging
+
+import pytest
+
+from app.db.caches import clear_caches
+from app.db.models import PlayerModel, InventoryModel, RoomModel
+from app.db.room_graph import room_graph
+from app.db.room_identity import room_identity
+from tests.fixtures import setup_test_db
+
+logger = logging.getLogger(__name__)
+
+
+def test_interning_maps_names_and_coordinates_to_ids(setup_test_db):
+    """Test that names and coordinates resolve to the same rooms.id."""
+    logger.info("Starting test: test_interning_maps_names_and_coordinates_to_ids")
+    # Given
+    east_room = RoomModel.get_room_by_name(setup_test_db, "east_room")
+
+    # When
+    by_name = room_identity.id_for_name(setup_test_db, "east_room")
+    by_coordinates = room_identity.id_for_coordinates(setup_test_db, 1, 0)
+
+    # Then
+    assert by_name == by_coordinates == east_room.id
+    assert room_identity.name_for_id(setup_test_db, east_room.id) == "east_room"
+    assert room_identity.coordinates_for_id(setup_test_db, east_room.id) == (1, 0)
+    assert room_identity.id_for_name(setup_test_db, "no_such_room") is None
+
+
+def test_players_and_room_items_reference_room_ids(setup_test_db):
+    """Test that the legacy string API stores integer room ids."""
+    logger.info("Starting test: test_players_and_room_items_reference_room_ids")
+    # Given
+    east_room = RoomModel.get_room_by_name(setup_test_db, "east_room")
+    PlayerModel.create_player(setup_test_db, name="TestPlayer", current_room="east_room")
+
+    # When
+    InventoryModel.add_item_to_room(setup_test_db, "east_room", "Magic Sword")
+
+    # Then
+    player_row = setup_test_db.execute("SELECT current_room_id FROM players WHERE name = 'TestPlayer'").fetchone()
+    item_row = setup_test_db.execute("""
+        SELECT holder_id FROM inventory WHERE holder_kind = 'room' AND item_name = 'Magic Sword';
+    """).fetchone()
+    assert player_row[0] == item_row[0] == east_room.id
+    assert InventoryModel.is_item_in_room(setup_test_db, east_room.id, "Magic Sword") is True
+
+
+def test_unknown_room_name_is_rejected(setup_test_db):
+    """Test that writing a room name that does not exist raises instead of storing a dangling reference."""
+    logger.info("Starting test: test_unknown_room_name_is_rejected")
+    with pytest.raises(ValueError):
+        PlayerModel.create_player(setup_test_db, name="TestPlayer", current_room="nowhere")
+
+
+def test_duplicate_name_resolves_to_oldest_room_after_bulk_load(setup_test_db):
+    """Test that caching a newer room with a duplicate name does not make it the one the name resolves to."""
+    logger.info("Starting test: test_duplicate_name_resolves_to_oldest_room_after_bulk_load")
+    # Given - two rooms called "hall" in different chunks, and only the newer one's chunk loaded
+    RoomModel.create_room(setup_test_db, "hall", "The first hall.", 40, 40)
+    RoomModel.create_room(setup_test_db, "hall", "Another hall.", 2, 2)
+    oldest = RoomModel.get_room_by_coordinates(setup_test_db, {"x": 40, "y": 40}).id
+    newest = RoomModel.get_room_by_coordinates(setup_test_db, {"x": 2, "y": 2}).id
+    clear_caches()
+    room_graph.neighbors(setup_test_db, newest)
+
+    # When
+    room_id = room_identity.id_for_name(setup_test_db, "hall")
+
+    # Then
+    assert room_id == oldest < newest
+    assert room_identity.id_for_coordinates(setup_test_db, 2, 2) == newest
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+
+import pytest
+
+from app.core.gpt_service import close_gpt_client, start_gpt_client
+from app.core.services.world_generation_service import room_generations
+from app.core.single_flight import SingleFlight
+from app.db.models import RoomModel
+from tests.fake_llm_server import FakeChatServer
+from tests.fixtures import llm_response_cache, setup_test_db, world_service
+from tests.test_llm_streaming import locations_document
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    """Test that callers arriving while a call is in flight get its result without calling again."""
+    logger.info("Starting test: test_concurrent_callers_share_one_call")
+    # Given
+    flights = SingleFlight()
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"name": "Shared"}
+
+    # When
+    results = await asyncio.gather(*(flights.run(("cell", 0, 1), generate) for _ in range(5)))
+    again = await flights.run(("cell", 0, 1), generate)
+
+    # Then - the key was released, so the later call ran again
+    assert results == [{"name": "Shared"}] * 5
+    assert again == {"name": "Shared"}
+    assert len(calls) == 2
+    assert flights.stats() == {"executions": 2, "coalesced": 4, "coalesced_ratio": 4 / 6, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_error_is_shared_and_releases_key():
+    """Test that every waiting caller gets the error and the next call starts afresh."""
+    logger.info("Starting test: test_error_is_shared_and_releases_key")
+    # Given
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("upstream failed")
+
+    # When
+    results = await asyncio.gather(*(flights.run("key", fail) for _ in range(3)), return_exceptions=True)
+
+    # Then
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert not flights.in_flight("key")
+    assert await flights.run("key", lambda: asyncio.sleep(0)) is None
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    """Test that cancelling the caller that started a call leaves it running for the others."""
+    logger.info("Starting test: test_cancelled_caller_does_not_cancel_others")
+    # Given
+    flights = SingleFlight()
+
+    async def generate():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.create_task(flights.run("key", generate))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(flights.run("key", generate))
+    await asyncio.sleep(0)
+
+    # When
+    first.cancel()
+
+    # Then
+    assert await second == "done"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_one_upstream_call_per_cell(world_service, llm_response_cache):
+    """Test that players converging on one cell from different rooms cause one LLM call."""
+    logger.info("Starting test: test_one_upstream_call_per_cell")
+    async with FakeChatServer(delay=0.1) as server:
+        # Given - (0, 1) is north of start, northwest of east_room and northeast of west_room
+        await start_gpt_client(api_key="test", model="fake", base_url=server.base_url, max_retries=0)
+        coalesced = room_generations.coalesced
+        requests = [({"x": 0, "y": 0}, "north"), ({"x": 1, "y": 0}, "northwest"), ({"x": -1, "y": 0}, "northeast")]
+
+        # When
+        results = await asyncio.gather(*(
+            world_service.generate_connected_room(coordinates, direction, use_cache=False)
+            for coordinates, direction in requests * 3
+        ))
+        other_cell = await world_service.generate_connected_room({"x": 0, "y": 0}, "south", use_cache=False)
+        await close_gpt_client()
+
+    # Then
+    assert all(result == results[0] for result in results)
+    assert other_cell == results[0]
+    assert len(server.requests) == 2
+    assert room_generations.coalesced - coalesced == 8
+    assert room_generations.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_entering_one_cell_together_saves_it_once(world_service, llm_response_cache):
+    """Test that players entering the same new cell at once share one generation and one saved room."""
+    logger.info("Starting test: test_entering_one_cell_together_saves_it_once")
+    async with FakeChatServer(content=locations_document(), tokens_per_second=4000) as server:
+        # Given
+        await start_gpt_client(api_key="test", model="fake", base_url=server.base_url, max_retries=0)
+
+        # When
+        entered = await asyncio.gather(
+            world_service.enter_connected_room({"x": 0, "y": 0}, "north", use_cache=False),
+            world_service.enter_connected_room({"x": 1, "y": 0}, "northwest", use_cache=False),
+        )
+        neighbors = await entered[0][1]
+        await close_gpt_client()
+
+    # Then
+    assert entered[0] == entered[1]
+    assert entered[0][0]["grid_coordinates"] == {"x": 0, "y": 1}
+    assert len(neighbors) == 5
+    assert len(server.requests) == 1
+    count = world_service.connection.execute(
+        "SELECT COUNT(*) FROM rooms WHERE x_coordinate = 0 AND y_coordinate = 1;").fetchone()[0]
+    assert count == 1
+    assert RoomModel.get_room_by_coordinates(world_service.connection, {"x": 0, "y": 1}).name == "Glade 0,1"
+
+
+@pytest.mark.asyncio
+async def test_generating_and_entering_one_cell_share_one_call(world_service, llm_response_cache):
+    """Test that whole-answer and streamed generations of one cell, with or without the cache, share one call."""
+    logger.info("Starting test: test_generating_and_entering_one_cell_share_one_call")
+    async with FakeChatServer(content=locations_document(), delay=0.1, tokens_per_second=4000) as server:
+        # Given
+        await start_gpt_client(api_key="test", model="fake", base_url=server.base_url, max_retries=0)
+
+        # When - the whole answer is asked for first, so the players entering join it
+        generated, entered, entered_uncached = await asyncio.gather(
+            world_service.generate_connected_room({"x": 0, "y": 0}, "north"),
+            world_service.enter_connected_room({"x": 1, "y": 0}, "northwest"),
+            world_service.enter_connected_room({"x": -1, "y": 0}, "northeast", use_cache=False),
+        )
+        await close_gpt_client()
+
+    # Then - the first player to join saves the rooms
+    assert len(server.requests) == 1
+    assert [location["name"] for location in generated["locations"]][0] == "Glade 0,1"
+    assert entered[0] == entered_uncached[0] == {"name": "Glade 0,1", "description": entered[0]["description"],
+                                                 "grid_coordinates": {"x": 0, "y": 1}}
+    assert sorted([len(await entered[1]), len(await entered_uncached[1])]) == [0, 5]
+    assert world_service.connection.execute("SELECT COUNT(*) FROM rooms;").fetchone()[0] == 3 + 6
+
+
+@pytest.mark.asyncio
+async def test_generating_joins_a_streamed_generation(world_service, llm_response_cache):
+    """Test that asking for the whole answer while the cell is being entered gets the entered rooms."""
+    logger.info("Starting test: test_generating_joins_a_streamed_generation")
+    async with FakeChatServer(content=locations_document(), tokens_per_second=4000) as server:
+        # Given
+        await start_gpt_client(api_key="test", model="fake", base_url=server.base_url, max_retries=0)
+
+        # When
+        entered, generated = await asyncio.gather(
+            world_service.enter_connected_room({"x": 0, "y": 0}, "north"),
+            world_service.generate_connected_room({"x": 0, "y": 0}, "north", use_cache=False),
+        )
+        await close_gpt_client()
+
+    # Then
+    assert len(server.requests) == 1
+    cells = [(location["coords"]["x"], location["coords"]["y"]) for location in generated["locations"]]
+    assert cells == [(0, 1), (-1, 2), (0, 2), (1, 2), (-1, 1), (1, 1)]
+    assert generated["locations"][0]["name"] == entered[0]["name"] == "Glade 0,1"
@@ -0,0 +1,91 @@
+import logging
+import threading
+
+from app.db.models import RoomModel
+from app.db.spatial import chunk_cache
+from tests.fixtures import setup_test_db
+
+logger = logging.getLogger(__name__)
+
+
+def _create_grid(connection, x0, y0, x1, y1):
+    RoomModel.upsert_rooms(connection, [
+        (f"room_{x}_{y}", "", x, y, "plains")
+        for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)
+        if (x, y) not in {(0, 0), (1, 0), (-1, 0)}
+    ])
+
+
+def test_region_spans_chunks_and_negative_coordinates(setup_test_db):
+    """Test that a region query returns exactly the rooms inside the rectangle across chunk borders."""
+    logger.info("Starting test: test_region_spans_chunks_and_negative_coordinates")
+    # Given - a 40x40 block of rooms centred on the origin, covering 3x3 or more chunks
+    _create_grid(setup_test_db, -20, -20, 19, 19)
+
+    # When
+    rooms = RoomModel.get_rooms_in_region(setup_test_db, 17, 3, -17, -5)
+
+    # Then
+    coordinates = {(room.x_coordinate, room.y_coordinate) for room in rooms}
+    assert coordinates == {(x, y) for x in range(-17, 18) for y in range(-5, 4)}
+    assert len(rooms) == len(coordinates)
+    start = next(room for room in rooms if (room.x_coordinate, room.y_coordinate) == (0, 0))
+    assert start["name"] == "start"
+
+
+def test_chunks_are_cached_until_rooms_change(setup_test_db):
+    """Test that repeated viewports hit the chunk cache and writes invalidate the affected chunk."""
+    logger.info("Starting test: test_chunks_are_cached_until_rooms_change")
+    # Given
+    RoomModel.get_rooms_in_region(setup_test_db, -1, 0, 1, 0)
+    misses = chunk_cache.misses
+
+    # When - the same viewport again, then a new room in one of its chunks
+    RoomModel.get_rooms_in_region(setup_test_db, -1, 0, 1, 0)
+    assert chunk_cache.misses == misses
+    RoomModel.create_room(setup_test_db, "north_room", "You have entered the north room.", 0, 1)
+
+    # Then
+    rooms = RoomModel.get_rooms_in_region(setup_test_db, -1, 0, 1, 1)
+    assert {room.name for room in rooms} == {"start", "east_room", "west_room", "north_room"}
+    assert chunk_cache.misses == misses + 1
+
+
+def test_chunk_cache_evicts_least_recently_used(setup_test_db):
+    """Test that the cache keeps at most max_chunks chunks, dropping the least recently used."""
+    logger.info("Starting test: test_chunk_cache_evicts_least_recently_used")
+    # Given
+    max_chunks = chunk_cache.max_chunks
+    chunk_cache.max_chunks = 2
+    try:
+        RoomModel.get_rooms_in_chunk(setup_test_db, 0, 0)
+        RoomModel.get_rooms_in_chunk(setup_test_db, -1, 0)
+        RoomModel.get_rooms_in_chunk(setup_test_db, 0, 0)
+
+        # When
+        RoomModel.get_rooms_in_chunk(setup_test_db, 5, 5)
+
+        # Then - chunk (-1, 0) was the least recently used one
+        assert len(chunk_cache) == 2
+        misses = chunk_cache.misses
+        RoomModel.get_rooms_in_chunk(setup_test_db, 0, 0)
+        assert chunk_cache.misses == misses
+        RoomModel.get_rooms_in_chunk(setup_test_db, -1, 0)
+        assert chunk_cache.misses == misses + 1
+    finally:
+        chunk_cache.max_chunks = max_chunks
+
+
+def test_chunk_loaded_during_a_transaction_is_reloaded_after_commit(setup_test_db):
+    """Test that a chunk cached from before a commit is not served once the commit lands."""
+    logger.info("Starting test: test_chunk_loaded_during_a_transaction_is_reloaded_after_commit")
+    # When - another thread caches the chunk after the insert, before the commit
+    with setup_test_db:
+        RoomModel.upsert_rooms(setup_test_db, [("north_room", "North.", 0, 1, "meadow")])
+        reader = threading.Thread(target=lambda: RoomModel.get_rooms_in_chunk(setup_test_db, 0, 0))
+        reader.start()
+        reader.join()
+
+    # Then
+    rooms = RoomModel.get_rooms_in_chunk(setup_test_db, 0, 0)
+    assert {room.name for room in rooms} == {"start", "east_room", "north_room"}
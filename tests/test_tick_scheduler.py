@@ -0,0 +1,114 @@
+import asyncio
+import logging
+
+import pytest
+
+from app.api.v1.player import PlayerMove, move_player, tick_stats
+from app.core.tick_scheduler import (
+    TickQueueFull, TickScheduler, start_tick_scheduler, stop_tick_scheduler, tick_order,
+)
+from app.db.models import InventoryModel, PlayerModel
+from tests.fixtures import setup_test_db
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.asyncio
+async def test_tick_applies_queued_actions_together(setup_test_db):
+    """Test that one tick applies every queued action and resolves each handler's future."""
+    logger.info("Starting test: test_tick_applies_queued_actions_together")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="Alice")
+    PlayerModel.create_player(setup_test_db, name="Bob")
+    scheduler = TickScheduler(setup_test_db)
+    alice = scheduler.submit({"player_name": "Alice", "action": "move", "direction": "east"})
+    bob = scheduler.submit({"player_name": "Bob", "action": "move", "direction": "north"})
+
+    # When
+    await scheduler.run_tick()
+
+    # Then
+    assert (await alice)["message"] == "You have moved to east_room."
+    assert (await bob)["success"] is False
+    assert PlayerModel.get_player_by_name(setup_test_db, "Alice").current_room == "east_room"
+    assert (scheduler.stats.ticks, scheduler.stats.actions, scheduler.stats.last_queue_depth) == (1, 2, 2)
+    assert scheduler.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_failing_action_does_not_fail_its_tick(setup_test_db):
+    """Test that an action raising an unexpected error fails alone while the rest of its tick applies."""
+    logger.info("Starting test: test_failing_action_does_not_fail_its_tick")
+    # Given
+    for name in ("Alice", "Bob", "Carol"):
+        PlayerModel.create_player(setup_test_db, name=name)
+    scheduler = TickScheduler(setup_test_db)
+    bad_move = scheduler.submit({"player_name": "Bob", "action": "move", "direction": ["north"]})
+    bad_pick_up = scheduler.submit({"player_name": "Carol", "action": "pick_up", "item_name": {"name": "Crown"}})
+    good = scheduler.submit({"player_name": "Alice", "action": "move", "direction": "east"})
+
+    # When
+    await scheduler.run_tick()
+
+    # Then
+    assert (await bad_move)["success"] is False and (await bad_pick_up)["success"] is False
+    assert (await good)["success"] is True
+    assert PlayerModel.get_player_by_name(setup_test_db, "Alice").current_room == "east_room"
+
+
+@pytest.mark.asyncio
+async def test_contested_item_goes_to_first_player_in_tick_order(setup_test_db):
+    """Test that two players grabbing the last item resolve by tick order, not arrival order."""
+    logger.info("Starting test: test_contested_item_goes_to_first_player_in_tick_order")
+    # Given
+    for name in ("Alice", "Bob"):
+        PlayerModel.create_player(setup_test_db, name=name)
+    InventoryModel.add_item_to_room(setup_test_db, "start", "Crown")
+    scheduler = TickScheduler(setup_test_db)
+    futures = {
+        name: scheduler.submit({"player_name": name, "action": "pick_up", "item_name": "Crown"})
+        for name in ("Bob", "Alice")
+    }
+
+    # When
+    await scheduler.run_tick()
+
+    # Then
+    winner = min(futures, key=lambda name: tick_order(0, name))
+    assert {name: (await future)["success"] for name, future in futures.items()} == {
+        name: name == winner for name in futures
+    }
+    assert InventoryModel.get_player_inventory(setup_test_db, winner) == ["Crown"]
+
+
+@pytest.mark.asyncio
+async def test_queue_is_bounded():
+    """Test that submit refuses actions beyond max_pending."""
+    logger.info("Starting test: test_queue_is_bounded")
+    scheduler = TickScheduler(None, max_pending=1)
+    scheduler.submit({"player_name": "Alice", "action": "view_inventory"})
+    with pytest.raises(TickQueueFull):
+        scheduler.submit({"player_name": "Alice", "action": "view_inventory"})
+
+
+@pytest.mark.asyncio
+async def test_move_endpoint_waits_for_tick(setup_test_db):
+    """Test that with the scheduler running, moves are applied by the tick loop and reported in its stats."""
+    logger.info("Starting test: test_move_endpoint_waits_for_tick")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+    await start_tick_scheduler(setup_test_db, tick_rate=100)
+
+    # When
+    try:
+        response = await asyncio.wait_for(
+            move_player(PlayerMove(player_name="TestPlayer", direction="east"), connection=setup_test_db), 5
+        )
+        stats = await tick_stats()
+    finally:
+        await stop_tick_scheduler()
+
+    # Then
+    assert response == {"message": "You have moved to east_room."}
+    assert stats["enabled"] is True and stats["actions"] == 1
+    assert (await tick_stats()) == {"enabled": False}
@@ -7,7 +7,7 @@ import json
 
 from app.core.services.world_generation_service import WorldGenerationService
 from app.db.models import RoomModel
-from tests.fixtures import setup_test_db
+from tests.fixtures import llm_backend, llm_response_cache, setup_test_db
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +21,7 @@ def world_service(setup_test_db):
 
 
 @pytest.mark.asyncio
-async def test_generate_map_room(world_service):
+async def test_generate_map_room(world_service, llm_backend):
     """
     Test generating a map room using GPT response.
     """
@@ -60,7 +60,7 @@ async def test_generate_map_room(world_service):
 
 
 @pytest.mark.asyncio
-async def test_generate_connected_room(world_service):
+async def test_generate_connected_room(world_service, llm_backend):
     """
     Test generating a connected map room or handling location-occupied errors.
     """
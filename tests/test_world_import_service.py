@@ -0,0 +1,98 @@
+import json
+import logging
+
+from app.core.json_stream import LocationStreamParser
+from app.core.services.world_import_service import WorldImportService
+from app.db.models import RoomModel, RoomDetailModel, NeighborRelationModel
+from app.db.room_identity import room_identity
+from tests.fixtures import setup_test_db
+
+logger = logging.getLogger(__name__)
+
+WORLD_FILE = "scratch/example_generated_connected_grid.json"
+
+
+def test_stream_parser_handles_arbitrary_chunking():
+    """Test that locations split across any chunk boundary parse the same as json.load."""
+    logger.info("Starting test: test_stream_parser_handles_arbitrary_chunking")
+    # Given
+    with open(WORLD_FILE) as f:
+        text = f.read()
+    expected = json.loads(text)["locations"]
+
+    for chunk_size in (1, 7, 4096):
+        # When
+        parser = LocationStreamParser()
+        parsed = []
+        for start in range(0, len(text), chunk_size):
+            parsed.extend(parser.feed(text[start:start + chunk_size]))
+        parser.close()
+
+        # Then
+        assert parser.done
+        assert parsed == expected
+
+
+def test_import_world_file(setup_test_db):
+    """Test importing the example world: rooms upserted by coordinates, details kept and neighbors derived."""
+    logger.info("Starting test: test_import_world_file")
+    # Given
+    service = WorldImportService(setup_test_db, batch_size=3)
+
+    # When
+    stats = service.import_file(WORLD_FILE)
+
+    # Then - (1, 0) already held east_room and is updated in place
+    assert stats["rooms"] == 8
+    assert stats["features"] == 8
+    assert stats["ambience"] == 32
+    assert stats["rows_per_second"] > 0
+    room_count = setup_test_db.execute("SELECT COUNT(*) FROM rooms").fetchone()[0]
+    assert room_count == 10
+    edge = RoomModel.get_room_by_coordinates(setup_test_db, {"x": 1, "y": 0})
+    assert edge.name == "Whispering Forest Edge"
+    assert RoomDetailModel.get_room_ambience(setup_test_db, edge.id, "sound") == ["rustling leaves", "distant bird songs"]
+    assert RoomDetailModel.get_room_features(setup_test_db, edge.id)[0]["type"] == "path"
+
+    # The pre-existing start room at (0, 0) is linked both ways to the imported rooms
+    start = RoomModel.get_room_by_name(setup_test_db, "start")
+    start_neighbors = {n.direction: (n.x, n.y) for n in NeighborRelationModel.get_neighbors_with_coordinates(setup_test_db, start.id)}
+    assert start_neighbors["east"] == (1, 0)
+    assert start_neighbors["north"] == (0, 1)
+    edge_neighbors = {n.direction: (n.x, n.y) for n in NeighborRelationModel.get_neighbors_with_coordinates(setup_test_db, edge.id)}
+    assert edge_neighbors["west"] == (0, 0)
+    assert len(edge_neighbors) == 8
+
+
+def test_reimport_is_idempotent(setup_test_db):
+    """Test that importing the same file twice does not duplicate rooms, details or relations."""
+    logger.info("Starting test: test_reimport_is_idempotent")
+    # Given
+    service = WorldImportService(setup_test_db)
+    service.import_file(WORLD_FILE)
+
+    # When
+    stats = service.import_file(WORLD_FILE)
+
+    # Then
+    assert stats["neighbor_relations"] == 0
+    assert setup_test_db.execute("SELECT COUNT(*) FROM rooms").fetchone()[0] == 10
+    assert setup_test_db.execute("SELECT COUNT(*) FROM room_ambience").fetchone()[0] == 32
+
+
+def test_import_renames_interned_rooms(setup_test_db):
+    """Test that a room renamed by an import is known by its new name only."""
+    logger.info("Starting test: test_import_renames_interned_rooms")
+    # Given
+    east_id = room_identity.id_for_name(setup_test_db, "east_room")
+    assert room_identity.name_for_id(setup_test_db, east_id) == "east_room"
+
+    # When
+    WorldImportService(setup_test_db).import_locations([
+        {"coords": {"x": 1, "y": 0}, "name": "Sunlit Ford", "description": "Shallow water over stones."},
+    ])
+
+    # Then
+    assert room_identity.name_for_id(setup_test_db, east_id) == "Sunlit Ford"
+    assert room_identity.id_for_name(setup_test_db, "Sunlit Ford") == east_id
+    assert room_identity.id_for_name(setup_test_db, "east_room") is None
@@ -0,0 +1,75 @@
+import logging
+import time
+
+import pytest
+
+from app.db.database import enable_location_write_behind, disable_location_write_behind
+from app.db.models import PlayerModel
+from tests.fixtures import setup_test_db
+
+logger = logging.getLogger(__name__)
+
+
+def stored_room(connection, player_name):
+    return connection.execute("""
+        SELECT r.name FROM players p JOIN rooms r ON r.id = p.current_room_id WHERE p.name = ?
+    """, (player_name,)).fetchone()[0]
+
+
+@pytest.fixture
+def location_buffer(setup_test_db):
+    """Enables location write-behind with a long durability window for the duration of a test."""
+    buffer = enable_location_write_behind(max_pending=3, flush_interval=60)
+    yield buffer
+    disable_location_write_behind()
+
+
+def test_buffered_location_is_read_back(setup_test_db, location_buffer):
+    """Test that a buffered move is visible through the model before it reaches the table."""
+    logger.info("Starting test: test_buffered_location_is_read_back")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+
+    # When
+    PlayerModel.update_player_location(setup_test_db, "TestPlayer", "east_room")
+    PlayerModel.update_player_location(setup_test_db, "TestPlayer", "west_room")
+
+    # Then - latest write wins and is read back, the row is untouched until a flush
+    assert PlayerModel.get_player_by_name(setup_test_db, "TestPlayer")["current_room"] == "west_room"
+    assert stored_room(setup_test_db, "TestPlayer") == "start"
+    assert location_buffer.flush() == 1
+    assert stored_room(setup_test_db, "TestPlayer") == "west_room"
+
+
+def test_flush_on_size_threshold(setup_test_db, location_buffer):
+    """Test that reaching max_pending buffered players triggers a flush without waiting for the window."""
+    logger.info("Starting test: test_flush_on_size_threshold")
+    # Given
+    names = ["Alice", "Bob", "Carol"]
+    for name in names:
+        PlayerModel.create_player(setup_test_db, name=name)
+
+    # When
+    for name in names:
+        PlayerModel.update_player_location(setup_test_db, name, "east_room")
+
+    # Then
+    deadline = time.monotonic() + 5
+    while location_buffer.flush_count == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert location_buffer.flushed_rows == 3
+    assert all(stored_room(setup_test_db, name) == "east_room" for name in names)
+
+
+def test_disable_flushes_pending_locations(setup_test_db, location_buffer):
+    """Test that shutting write-behind down persists everything still buffered."""
+    logger.info("Starting test: test_disable_flushes_pending_locations")
+    # Given
+    PlayerModel.create_player(setup_test_db, name="TestPlayer")
+    PlayerModel.update_player_location(setup_test_db, "TestPlayer", "east_room")
+
+    # When
+    disable_location_write_behind()
+
+    # Then
+    assert stored_room(setup_test_db, "TestPlayer") == "east_room"